@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark suite for the task operations in src/tasks.py.
+
+Builds synthetic stores with realistic priority, tag, due-date and recurrence
+distributions, times every public operation and writes machine-readable JSON.
+A stored baseline can be compared against to flag regressions.
+
+Usage:
+    python benchmarks/bench_tasks.py --sizes 1000,100000 --output results.json
+    python benchmarks/bench_tasks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_tasks.py --baseline benchmarks/baseline.json --tolerance 0.25
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import clock
+import export
+import importer
+import tasks
+import ui
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+PRIORITY_WEIGHTS = (("High", 0.2), ("Medium", 0.5), ("Low", 0.3))
+TAG_POOL = ["work", "home", "errands", "urgent", "health", "finance", "reading", "travel",
+            "family", "learning", "shopping", "meetings", "someday", "garden", "car", "pets"]
+WORDS = ["report", "meeting", "email", "review", "plan", "call", "groceries", "invoice", "draft",
+         "update", "fix", "book", "clean", "pay", "renew", "prepare", "schedule", "backup"]
+RECURRENCES = [
+    {'interval': 'daily', 'every': 1},
+    {'interval': 'weekly', 'every': 1},
+    {'interval': 'weekly', 'every': 1, 'days': ['Monday', 'Thursday']},
+    {'interval': 'monthly', 'every': 1},
+    {'interval': 'custom', 'every': 3},
+]
+
+# Stop repeating an operation once it has used this much time
+TIME_BUDGET_SECONDS = 2.0
+
+
+def synthetic_task(rng, index, now):
+    """
+    Builds the arguments for one synthetic task.
+
+    Args:
+        rng (random.Random): Seeded random generator
+        index (int): Sequence number of the task
+        now (datetime.datetime): Reference time for due dates
+
+    Returns:
+        dict: Keyword arguments for tasks.create_task
+    """
+    # Tags follow a skewed distribution: a few tags are very common
+    tag_count = rng.choices((0, 1, 2, 3), weights=(0.25, 0.4, 0.25, 0.1))[0]
+    tags = list(dict.fromkeys(TAG_POOL[min(int(rng.paretovariate(1.2)) - 1, len(TAG_POOL) - 1)]
+                              for _ in range(tag_count)))
+
+    due_date = None
+    if rng.random() < 0.6:
+        due = now + datetime.timedelta(days=rng.randint(-30, 60))
+        if rng.random() < 0.5:
+            due = due.replace(hour=0, minute=0, second=0, microsecond=0)
+        else:
+            due = due.replace(hour=rng.randint(8, 18), minute=rng.choice((0, 15, 30, 45)), second=0, microsecond=0)
+        due_date = due
+
+    return {
+        "title": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {index}",
+        "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8))),
+        "completed": rng.random() < 0.3,
+        "priority": rng.choices([p for p, _ in PRIORITY_WEIGHTS], weights=[w for _, w in PRIORITY_WEIGHTS])[0],
+        "tags": tags,
+        "due_date": due_date,
+        "recurring": dict(rng.choice(RECURRENCES)) if due_date and rng.random() < 0.15 else None,
+    }
+
+
+def build_store(size, seed=42):
+    """
+    Replaces the task store with a synthetic store of the given size.
+
+    Args:
+        size (int): Number of tasks
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        float: Seconds spent building the store
+    """
+    rng = random.Random(seed)
+    now = clock.now()
+    tasks.clear_tasks()
+    start = time.perf_counter()
+    for index in range(size):
+        tasks.add_task(tasks.create_task(**synthetic_task(rng, index, now)))
+    return time.perf_counter() - start
+
+
+def time_calls(func, args_list):
+    """
+    Times one call per argument tuple, stopping early when the time budget is used up.
+
+    Args:
+        func (callable): The operation to time
+        args_list (list): Argument tuples, one per call
+
+    Returns:
+        list: Per-call durations in seconds
+    """
+    durations = []
+    budget_start = time.perf_counter()
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - start)
+        if time.perf_counter() - budget_start > TIME_BUDGET_SECONDS:
+            break
+    return durations
+
+
+def summarize(size, operation, durations):
+    """
+    Summarizes the durations of one operation.
+
+    Args:
+        size (int): Store size
+        operation (str): Operation name
+        durations (list): Per-call durations in seconds
+
+    Returns:
+        dict: Result row with call count and latency figures in microseconds
+    """
+    ordered = sorted(durations)
+    return {
+        "size": size,
+        "operation": operation,
+        "calls": len(ordered),
+        "mean_us": round(statistics.fmean(ordered) * 1e6, 3),
+        "p50_us": round(ordered[len(ordered) // 2] * 1e6, 3),
+        "p99_us": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6, 3),
+        "min_us": round(ordered[0] * 1e6, 3),
+    }
+
+
+def run_size(size, seed=42, repeats=200):
+    """
+    Benchmarks every operation against a store of the given size.
+    Read-only operations run first; mutating ones run last so they see the full store.
+
+    Args:
+        size (int): Store size
+        seed (int): Random seed
+        repeats (int): Maximum calls per operation (linear-time operations are limited by the time budget)
+
+    Returns:
+        list: Result rows
+    """
+    rng = random.Random(seed + 1)
+    results = []
+
+    build_seconds = build_store(size, seed)
+    results.append({"size": size, "operation": "build_store", "calls": size,
+                     "mean_us": round(build_seconds / size * 1e6, 3), "total_s": round(build_seconds, 3)})
+
+    ids = [rng.randint(1, size) for _ in range(repeats)]
+    scans = max(3, min(repeats, 20))
+
+    read_ops = [
+        ("get_task_by_id", tasks.get_task_by_id, [(i,) for i in ids]),
+        ("filter_tasks[status]", tasks.filter_tasks, [("incomplete",)] * scans),
+        ("filter_tasks[priority]", lambda: tasks.filter_tasks(priority="High"), [()] * scans),
+        ("filter_tasks[tag]", lambda: tasks.filter_tasks(tag="urgent"), [()] * scans),
+        ("filter_tasks[status+priority+tag]",
+         lambda: tasks.filter_tasks(status="incomplete", priority="High", tag="work"), [()] * scans),
+        ("filter_tasks[recurring]", lambda: tasks.filter_tasks(recurring=True), [()] * scans),
+        ("search_tasks", tasks.search_tasks, [(rng.choice(WORDS),) for _ in range(scans)]),
+        ("sort_tasks[priority]", lambda: tasks.sort_tasks(sort_by="priority"), [()] * scans),
+        ("sort_tasks[title]", lambda: tasks.sort_tasks(sort_by="title"), [()] * scans),
+        ("sort_tasks[due_date]", lambda: tasks.sort_tasks(sort_by="due_date"), [()] * scans),
+        ("filter_overdue_tasks", tasks.filter_overdue_tasks, [()] * scans),
+        ("filter_upcoming_tasks", tasks.filter_upcoming_tasks, [()] * scans),
+        ("filter_recurring_tasks", tasks.filter_recurring_tasks, [()] * scans),
+    ]
+    for name, func, args_list in read_ops:
+        results.append(summarize(size, name, time_calls(func, args_list)))
+
+    # Rendering is timed against a null device so it measures formatting, not the terminal
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        results.append(summarize(size, "render_task_listing", time_calls(
+            lambda: ui.render_task_listing(tasks.tasks_storage, out=devnull), [()] * max(3, scans // 4))))
+
+        # Streaming export throughput over the whole store
+        for fmt in export.FORMATS:
+            row = summarize(size, f"export_tasks[{fmt}]", time_calls(
+                lambda: export.export_tasks(devnull, fmt), [()] * max(3, scans // 4)))
+            row["rows_per_sec"] = round(size / (row["mean_us"] / 1e6)) if row["mean_us"] else None
+            results.append(row)
+
+    # Creating and adding is timed on top of the full store
+    now = clock.now()
+    new_tasks = [synthetic_task(rng, size + i, now) for i in range(repeats)]
+    results.append(summarize(size, "create_task+add_task", time_calls(
+        lambda kwargs: tasks.add_task(tasks.create_task(**kwargs)), [(kwargs,) for kwargs in new_tasks])))
+
+    results.append(summarize(size, "update_task", time_calls(
+        lambda task_id: tasks.update_task(task_id, title="Updated", priority="Low"), [(i,) for i in ids])))
+    results.append(summarize(size, "toggle_task_status", time_calls(tasks.toggle_task_status, [(i,) for i in ids])))
+    results.append(summarize(size, "delete_task", time_calls(
+        tasks.delete_task, [(i,) for i in rng.sample(range(1, size + 1), min(repeats, size))])))
+
+    # Import throughput: export the store, then load it back into an empty store
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in export.FORMATS:
+            path = os.path.join(tmp, f"tasks.{fmt}")
+            rows = export.export_to_file(path, fmt)
+            tasks.clear_tasks()
+            report = importer.import_tasks(path, fmt)
+            results.append({"size": size, "operation": f"import_tasks[{fmt}]", "calls": rows,
+                            "mean_us": round(report["seconds"] / max(rows, 1) * 1e6, 3),
+                            "total_s": report["seconds"], "rows_per_sec": report["rows_per_sec"]})
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results against a baseline.
+
+    Args:
+        results (list): Result rows from this run
+        baseline (list): Result rows from the baseline run
+        tolerance (float): Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        list: One row per operation found in both runs, with ratio and regression flag
+    """
+    baseline_rows = {(row["size"], row["operation"]): row for row in baseline}
+    comparison = []
+    for row in results:
+        base = baseline_rows.get((row["size"], row["operation"]))
+        if not base or not base.get("mean_us"):
+            continue
+        ratio = row["mean_us"] / base["mean_us"]
+        comparison.append({
+            "size": row["size"],
+            "operation": row["operation"],
+            "baseline_mean_us": base["mean_us"],
+            "mean_us": row["mean_us"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > 1 + tolerance,
+        })
+    return comparison
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list, optional): Command line arguments
+
+    Returns:
+        int: Exit status (1 if any regression against the baseline was found)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the task operations at scale.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated store sizes (default: 1000,100000,1000000)")
+    parser.add_argument("--repeats", type=int, default=200, help="Maximum calls per operation")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic stores")
+    parser.add_argument("--output", help="Write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against a baseline JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before flagging (default 0.25)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Also write this run as a baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    for size in sizes:
+        print(f"Benchmarking {size} tasks...", file=sys.stderr)
+        # Freeze time per size so due-date classifications can't shift mid-run
+        with clock.frozen():
+            results.extend(run_size(size, args.seed, args.repeats))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    exit_status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            comparison = compare(results, json.load(f)["results"], args.tolerance)
+        report["comparison"] = comparison
+        regressions = [row for row in comparison if row["regression"]]
+        for row in regressions:
+            print(f"REGRESSION {row['operation']} @ {row['size']}: {row['baseline_mean_us']}us -> "
+                  f"{row['mean_us']}us (x{row['ratio']})", file=sys.stderr)
+        exit_status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    return exit_status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
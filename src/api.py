@@ -0,0 +1,600 @@
+"""
+API module for the console todo application.
+Exposes the task operations by name so non-interactive front ends
+(the HTTP server, batch tools) can drive them with plain JSON-style parameters.
+"""
+
+import datetime
+from tasks import *
+import clock
+import dependencies
+import fuzzy
+import history
+import namespaces
+import parallel
+import undo
+import urgency
+
+
+class OperationError(Exception):
+    """
+    Raised when an operation is unknown or is called with invalid parameters.
+    """
+
+
+# Parameters that take a boolean. Batch lines and query strings pass them as text,
+# so execute() converts them here for every front end
+BOOLEAN_PARAMETERS = {"completed", "overdue", "upcoming", "create", "actionable", "fuzzy"}
+
+
+def parse_bool(value, name):
+    """
+    Parses a boolean parameter given as a bool, 0/1 or text.
+
+    Args:
+        value (bool, int or str): True/False, 1/0, or 'true'/'false', 'yes'/'no', '1'/'0'
+        name (str): The parameter name, for the error message
+
+    Returns:
+        bool: The parsed value
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "yes", "1"):
+            return True
+        if lowered in ("false", "no", "0"):
+            return False
+    raise OperationError(f"Parameter '{name}' must be true or false, got '{value}'")
+
+
+def _convert_booleans(params):
+    """
+    Converts the boolean parameters given as text, leaving the caller's dict unchanged.
+
+    Args:
+        params (dict): The operation parameters
+
+    Returns:
+        dict: The parameters with booleans parsed
+    """
+    names = [name for name in BOOLEAN_PARAMETERS
+             if name in params and params[name] is not None and not isinstance(params[name], bool)]
+    if not names:
+        return params
+    converted = dict(params)
+    for name in names:
+        converted[name] = parse_bool(params[name], name)
+    return converted
+
+
+def _require(params, name):
+    """
+    Returns a required parameter or raises OperationError if it is missing.
+
+    Args:
+        params (dict): The operation parameters
+        name (str): The name of the required parameter
+
+    Returns:
+        Any: The parameter value
+    """
+    if name not in params or params[name] in (None, ""):
+        raise OperationError(f"Missing required parameter '{name}'")
+    return params[name]
+
+
+def _task_id(params):
+    """
+    Extracts and validates the 'id' parameter.
+
+    Args:
+        params (dict): The operation parameters
+
+    Returns:
+        int: The task ID
+    """
+    try:
+        return int(_require(params, "id"))
+    except (TypeError, ValueError):
+        raise OperationError("Parameter 'id' must be an integer")
+
+
+def _priority(value):
+    """
+    Validates and normalizes a priority parameter.
+
+    Args:
+        value (str): The priority value
+
+    Returns:
+        str: The normalized priority
+    """
+    if not isinstance(value, str) or not validate_priority(value):
+        raise OperationError(f"Invalid priority '{value}'")
+    return normalize_priority(value)
+
+
+def _tags(value):
+    """
+    Accepts tags either as a list or as a comma-separated string.
+
+    Args:
+        value (list or str): The tags value
+
+    Returns:
+        list: List of normalized tags
+    """
+    if isinstance(value, list):
+        return [str(tag).strip() for tag in value if str(tag).strip()]
+    if isinstance(value, str):
+        return normalize_tags(value)
+    raise OperationError("Parameter 'tags' must be a list or a comma-separated string")
+
+
+def _due_date(value):
+    """
+    Parses a due date parameter into an ISO string, like the interactive UI does.
+
+    Args:
+        value (str): The due date in any format accepted by parse_datetime_input or ISO format
+
+    Returns:
+        str: The due date in ISO format
+    """
+    if not isinstance(value, str):
+        raise OperationError("Parameter 'due_date' must be a string")
+    # ISO dates parse the same either way; trying them first skips the format loop
+    try:
+        parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = parse_datetime_input(value)
+        if parsed is None:
+            raise OperationError(f"Invalid due date '{value}'")
+    # Due dates are stored and compared as naive local times
+    if parsed.tzinfo:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.isoformat()
+
+
+def _time(params, name):
+    """
+    Parses an optional ISO date/time parameter.
+
+    Args:
+        params (dict): The operation parameters
+        name (str): The parameter name
+
+    Returns:
+        datetime.datetime or None: The time as a naive local time, or None if the parameter is missing
+    """
+    value = params.get(name)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise OperationError(f"Parameter '{name}' must be an ISO date/time string")
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise OperationError(f"Invalid time '{value}'")
+    # Due dates are compared as naive local times
+    return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+
+
+def _now(params):
+    """
+    Gets the reference time for a request: the optional 'now' parameter, or the clock.
+    Due-date criteria are evaluated at this one time for every task.
+
+    Args:
+        params (dict): The operation parameters
+
+    Returns:
+        datetime.datetime: The reference time
+    """
+    now = _time(params, "now")
+    return now if now is not None else clock.now()
+
+
+def _recurring(value):
+    """
+    Validates a recurrence pattern parameter.
+
+    Args:
+        value (dict): The recurrence pattern
+
+    Returns:
+        dict: The recurrence pattern
+    """
+    if not isinstance(value, dict):
+        raise OperationError("Parameter 'recurring' must be an object")
+    return value
+
+
+def task_fields(params):
+    """
+    Validates 'add' parameters and normalizes them into task fields.
+
+    Args:
+        params (dict): The operation parameters
+
+    Returns:
+        dict: Keyword arguments for create_task (title, description, priority, tags, due_date, recurring)
+    """
+    return {
+        "title": _require(params, "title"),
+        "description": params.get("description", ""),
+        "priority": _priority(params["priority"]) if params.get("priority") else "Medium",
+        "tags": _tags(params["tags"]) if params.get("tags") is not None else None,
+        "due_date": _due_date(params["due_date"]) if params.get("due_date") else None,
+        "recurring": _recurring(params["recurring"]) if params.get("recurring") else None,
+    }
+
+
+def build_task(params):
+    """
+    Validates 'add' parameters and creates (but does not store) the task.
+
+    Args:
+        params (dict): The operation parameters
+
+    Returns:
+        dict: The new task dictionary
+    """
+    return create_task(**task_fields(params))
+
+
+def _op_add(params):
+    """Creates and stores a new task."""
+    task = build_task(params)
+    add_task(task)
+    return task
+
+
+def _op_get(params):
+    """Returns a single task by ID."""
+    return get_task_by_id(_task_id(params))
+
+
+def _op_list(params):
+    """Returns all tasks."""
+    return get_all_tasks()
+
+
+def _op_update(params):
+    """Updates the fields given in the parameters."""
+    task_id = _task_id(params)
+    return update_task(
+        task_id,
+        title=params.get("title"),
+        description=params.get("description"),
+        completed=params.get("completed"),
+        priority=_priority(params["priority"]) if params.get("priority") else None,
+        tags=_tags(params["tags"]) if params.get("tags") is not None else None,
+        due_date=_due_date(params["due_date"]) if params.get("due_date") else None,
+        recurring=_recurring(params["recurring"]) if params.get("recurring") else None,
+    )
+
+
+def _op_delete(params):
+    """Deletes a task by ID."""
+    return delete_task(_task_id(params))
+
+
+def _op_toggle(params):
+    """Toggles a task's completion status."""
+    return toggle_task_status(_task_id(params))
+
+
+def _op_filter(params):
+    """Filters tasks by the given criteria (in worker processes for very large stores)."""
+    # 'recurring' is a pattern for add and update, so execute() doesn't parse it as a boolean
+    recurring = params.get("recurring")
+    return parallel.parallel_filter_tasks(
+        status=params.get("status"),
+        priority=params.get("priority"),
+        tag=params.get("tag"),
+        overdue=params.get("overdue"),
+        upcoming=params.get("upcoming"),
+        recurring=parse_bool(recurring, "recurring") if recurring not in (None, "") else None,
+        now=_now(params),
+    )
+
+
+def _op_search(params):
+    """Searches tasks by keyword (in worker processes for very large stores); with 'fuzzy', searches titles
+    tolerating up to 'max_distance' typos per word."""
+    if not params.get("fuzzy"):
+        return parallel.parallel_search_tasks(params.get("keyword", ""))
+    max_distance = params.get("max_distance")
+    if max_distance not in (None, ""):
+        try:
+            max_distance = int(max_distance)
+        except (TypeError, ValueError):
+            raise OperationError("Parameter 'max_distance' must be an integer")
+        if max_distance < 0:
+            raise OperationError("Parameter 'max_distance' must not be negative")
+    else:
+        max_distance = None
+    return [task for task, _distance in fuzzy.fuzzy_search(params.get("keyword", ""), max_distance)]
+
+
+def _op_sort(params):
+    """Returns all tasks sorted by the given criteria."""
+    return sort_tasks(sort_by=params.get("sort_by", "priority"))
+
+
+def _op_overdue(params):
+    """Returns overdue tasks."""
+    return filter_overdue_tasks(_now(params))
+
+
+def _op_upcoming(params):
+    """Returns upcoming tasks."""
+    return filter_upcoming_tasks(_now(params))
+
+
+def _op_recurring(params):
+    """Returns recurring tasks."""
+    return filter_recurring_tasks()
+
+
+def _op_catch_up(params):
+    """Catches up recurring series that missed occurrences."""
+    policy = params.get("policy", "all")
+    if policy not in CATCH_UP_POLICIES:
+        raise OperationError(f"Invalid policy '{policy}' (expected one of {', '.join(CATCH_UP_POLICIES)})")
+    return catch_up_recurrences(policy, _now(params))
+
+
+def _task_history():
+    """
+    Gets the task history, or raises OperationError if it isn't being recorded.
+    """
+    task_history = history.get_history()
+    if task_history is None:
+        raise OperationError("Task history is not enabled")
+    return task_history
+
+
+def _op_history(params):
+    """Returns recorded changes, optionally of one task ('id') in a time range ('start' to 'end')."""
+    task_history = _task_history()
+    task_id = _task_id(params) if params.get("id") not in (None, "") else None
+    changes = task_history.changes(_time(params, "start"), _time(params, "end"), task_id)
+    return [dict(change, at=change["at"].isoformat()) for change in changes]
+
+
+def _op_as_of(params):
+    """Returns a task as it was at time 'at', or None if it didn't exist then."""
+    task_history = _task_history()
+    task_id = _task_id(params)
+    at = _time(params, "at")
+    if at is None:
+        raise OperationError("Missing required parameter 'at'")
+    try:
+        return task_history.as_of(task_id, at)
+    except ValueError as e:
+        raise OperationError(str(e))
+
+
+def _op_undo(params):
+    """Undoes the most recent change; returns its description, or None if there was nothing to undo."""
+    if not undo.is_enabled():
+        raise OperationError("Undo is not enabled")
+    return undo.undo()
+
+
+def _op_redo(params):
+    """Redoes the most recently undone change; returns its description, or None if there was nothing to redo."""
+    if not undo.is_enabled():
+        raise OperationError("Undo is not enabled")
+    return undo.redo()
+
+
+def _other_id(params, name):
+    """
+    Extracts and validates a task ID parameter other than 'id'.
+
+    Args:
+        params (dict): The operation parameters
+        name (str): The parameter name
+
+    Returns:
+        int: The task ID
+    """
+    try:
+        return int(_require(params, name))
+    except (TypeError, ValueError):
+        raise OperationError(f"Parameter '{name}' must be an integer")
+
+
+def _op_add_dependency(params):
+    """Makes task 'id' wait for task 'depends_on'; False if either task doesn't exist."""
+    try:
+        return dependencies.add_dependency(_task_id(params), _other_id(params, "depends_on"))
+    except ValueError as e:
+        raise OperationError(str(e))
+
+
+def _op_remove_dependency(params):
+    """Stops task 'id' from waiting for task 'depends_on'; False if it didn't."""
+    return dependencies.remove_dependency(_task_id(params), _other_id(params, "depends_on"))
+
+
+def _op_set_parent(params):
+    """Makes task 'id' a subtask of task 'parent_id' (omitted or null for a top-level task)."""
+    task_id = _task_id(params)
+    parent_id = _other_id(params, "parent_id") if params.get("parent_id") not in (None, "") else None
+    try:
+        return dependencies.set_parent(task_id, parent_id)
+    except ValueError as e:
+        raise OperationError(str(e))
+
+
+def _op_actionable(params):
+    """Returns the incomplete tasks that aren't waiting for other tasks."""
+    return dependencies.actionable_tasks()
+
+
+def _op_subtasks(params):
+    """Returns the subtasks of task 'id'."""
+    return dependencies.get_subtasks(_task_id(params))
+
+
+def _op_next(params):
+    """Returns the 'k' most pressing incomplete tasks with their scores ('actionable' skips blocked tasks)."""
+    try:
+        k = int(params.get("k", 5))
+    except (TypeError, ValueError):
+        raise OperationError("Parameter 'k' must be an integer")
+    results = urgency.next_actions(k, _now(params), params.get("actionable") or False)
+    return [dict(task, score=round(score, 3)) for task, score in results]
+
+
+def _op_urgency_weights(params):
+    """Sets any of the 'priority', 'urgency' and 'undated_days' score weights; returns the weights."""
+    try:
+        urgency.set_weights(**{name: float(params[name]) for name in ("priority", "urgency", "undated_days")
+                               if params.get(name) not in (None, "")})
+    except (TypeError, ValueError) as e:
+        raise OperationError(f"Invalid weight: {e}")
+    return urgency.get_weights()
+
+
+def _namespace_name(params):
+    """
+    Extracts and validates the 'name' parameter of the namespace operations.
+    """
+    name = _require(params, "name")
+    if not isinstance(name, str):
+        raise OperationError("Parameter 'name' must be a string")
+    return name
+
+
+def _op_list_namespaces(params):
+    """Returns every namespace (task list) with its size and state."""
+    return namespaces.list_namespaces()
+
+
+def _op_use_namespace(params):
+    """Makes a namespace the active one, creating it unless 'create' is false; returns its name."""
+    name = _namespace_name(params)
+    try:
+        namespaces.use_namespace(name, create=params.get("create", True))
+    except (KeyError, ValueError, RuntimeError) as e:
+        raise OperationError(e.args[0])
+    return namespaces.active_namespace()
+
+
+def _op_unload_namespace(params):
+    """Unloads an inactive namespace to disk; returns the number of tasks written."""
+    try:
+        return namespaces.unload_namespace(_namespace_name(params))
+    except (KeyError, ValueError) as e:
+        raise OperationError(e.args[0])
+
+
+def _op_delete_namespace(params):
+    """Deletes an inactive namespace and its tasks."""
+    try:
+        namespaces.delete_namespace(_namespace_name(params))
+    except (KeyError, ValueError) as e:
+        raise OperationError(e.args[0])
+    return True
+
+
+# Operation name -> handler taking a parameter dictionary
+OPERATIONS = {
+    "add": _op_add,
+    "get": _op_get,
+    "list": _op_list,
+    "update": _op_update,
+    "delete": _op_delete,
+    "toggle": _op_toggle,
+    "filter": _op_filter,
+    "search": _op_search,
+    "sort": _op_sort,
+    "overdue": _op_overdue,
+    "upcoming": _op_upcoming,
+    "recurring": _op_recurring,
+    "catch_up": _op_catch_up,
+    "history": _op_history,
+    "as_of": _op_as_of,
+    "undo": _op_undo,
+    "redo": _op_redo,
+    "add_dependency": _op_add_dependency,
+    "remove_dependency": _op_remove_dependency,
+    "set_parent": _op_set_parent,
+    "actionable": _op_actionable,
+    "subtasks": _op_subtasks,
+    "next": _op_next,
+    "urgency_weights": _op_urgency_weights,
+    "list_namespaces": _op_list_namespaces,
+    "use_namespace": _op_use_namespace,
+    "unload_namespace": _op_unload_namespace,
+    "delete_namespace": _op_delete_namespace,
+}
+
+# Operations whose result is a list of tasks
+LISTING_OPERATIONS = {"list", "filter", "search", "sort", "overdue", "upcoming", "recurring", "actionable", "subtasks", "next"}
+
+
+def execute(op, params=None):
+    """
+    Executes a single named operation.
+
+    Args:
+        op (str): The operation name (see OPERATIONS)
+        params (dict, optional): The operation parameters; a 'namespace' parameter runs the
+                                 operation on that (existing) task list instead of the active one
+
+    Returns:
+        Any: The operation result (a task, a list of tasks, a bool or None)
+
+    Raises:
+        OperationError: If the operation is unknown or the parameters are invalid
+    """
+    handler = OPERATIONS.get(op)
+    if handler is None:
+        raise OperationError(f"Unknown operation '{op}'")
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        raise OperationError("Operation parameters must be an object")
+    params = _convert_booleans(params)
+    namespace = params.get("namespace")
+    if namespace in (None, "") or namespace == namespaces.active_namespace():
+        return handler(params)
+    if not isinstance(namespace, str) or namespace not in namespaces.list_names():
+        raise OperationError(f"Unknown namespace '{namespace}'")
+    with namespaces.using(namespace):
+        return handler(params)
+
+
+def execute_batch(operations):
+    """
+    Executes many operations in order, collecting a result or error for each one.
+    A failing operation does not abort the rest of the batch. The changes the batch
+    makes are one event bus transaction, so they are undone together.
+
+    Args:
+        operations (list): List of {"op": str, "params": dict} entries
+
+    Returns:
+        list: One {"ok": True, "result": ...} or {"ok": False, "error": str} entry per operation
+    """
+    results = []
+    with event_bus.transaction():
+        for entry in operations:
+            try:
+                if not isinstance(entry, dict):
+                    raise OperationError("Batch entries must be objects")
+                result = execute(entry.get("op"), entry.get("params"))
+                results.append({"ok": True, "result": result})
+            except OperationError as e:
+                results.append({"ok": False, "error": str(e)})
+    return results
@@ -0,0 +1,242 @@
+"""
+Batch command mode for the console todo application.
+Runs task operations from the command line, a command file or stdin without
+the interactive menu, and writes one JSON result per command (JSON Lines),
+so scripts can drive the app and feed it large workloads in one process.
+
+Commands use the operation names from api.py, either as JSON objects
+({"op": "add", "params": {"title": "Buy milk"}}) or as shell-style lines:
+
+    add title="Buy milk" priority=High tags=home,errands due_date=tomorrow
+    toggle id=1
+    filter status=incomplete priority=High
+    sort sort_by=due_date
+    export path=open.csv status=incomplete sort_by=due_date
+    import path=backup.jsonl
+
+Usage:
+    python main.py batch add title="Buy milk"
+    python main.py batch -f commands.txt
+    generate_commands | python main.py batch --summary
+"""
+
+import argparse
+import json
+import shlex
+import sys
+import time
+
+import api
+import export
+import importer
+import tasks
+
+# Result lines are written out in chunks of this many lines
+OUTPUT_CHUNK_LINES = 1000
+
+
+def _parse_json(value):
+    """
+    Parses a JSON command value (e.g. a recurrence pattern).
+
+    Args:
+        value (str): The JSON text
+
+    Returns:
+        Any: The decoded value
+    """
+    try:
+        return json.loads(value)
+    except ValueError:
+        raise api.OperationError(f"Invalid JSON value '{value}'")
+
+
+# Parameters that aren't plain strings; everything else is passed through as text
+# (boolean parameters are converted by api.execute, see api.BOOLEAN_PARAMETERS)
+PARAMETER_TYPES = {
+    "recurring": _parse_json,
+}
+
+
+def _op_export(params):
+    """
+    Streams tasks to a file; filter criteria and sort_by select and order them.
+    Only available in batch mode, since it writes to the local file system.
+    """
+    path = params.get("path")
+    if not path:
+        raise api.OperationError("Missing required parameter 'path'")
+    criteria = {key: params[key] for key in ("status", "priority", "tag") if key in params}
+    # Batch operations don't go through api.execute, so the boolean criteria are parsed here
+    for key in ("overdue", "upcoming", "recurring"):
+        if params.get(key) is not None:
+            criteria[key] = api.parse_bool(params[key], key)
+    source = tasks.iter_filter_tasks(**criteria) if criteria else tasks.tasks_storage
+    if params.get("sort_by"):
+        source = tasks.iter_sorted_tasks(source, params["sort_by"])
+    try:
+        return export.export_to_file(path, params.get("format"), source)
+    except (OSError, ValueError) as e:
+        raise api.OperationError(f"Export failed: {e}")
+
+
+def _op_import(params):
+    """
+    Imports tasks from a JSON Lines or CSV file, reporting bad rows.
+    Only available in batch mode, since it reads from the local file system.
+    """
+    path = params.get("path")
+    if not path:
+        raise api.OperationError("Missing required parameter 'path'")
+    try:
+        workers = int(params["workers"]) if "workers" in params else None
+        return importer.import_tasks(path, params.get("format"), workers)
+    except (OSError, ValueError) as e:
+        raise api.OperationError(f"Import failed: {e}")
+
+
+# Operations handled by batch mode itself rather than api.py
+BATCH_OPERATIONS = {
+    "export": _op_export,
+    "import": _op_import,
+}
+
+
+def parse_command(line):
+    """
+    Parses one command line.
+
+    Args:
+        line (str): A JSON object or a shell-style 'op key=value ...' line
+
+    Returns:
+        tuple: (operation name, parameter dict), or None for blank lines and comments
+
+    Raises:
+        api.OperationError: If the line can't be parsed
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    if line.startswith("{"):
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            raise api.OperationError(f"Invalid JSON command: {e}")
+        if not isinstance(entry, dict):
+            raise api.OperationError("JSON commands must be objects")
+        return entry.get("op"), entry.get("params") or {}
+
+    try:
+        tokens = shlex.split(line)
+    except ValueError as e:
+        raise api.OperationError(f"Invalid command: {e}")
+    return tokens[0], parse_arguments(tokens[1:])
+
+
+def parse_arguments(tokens):
+    """
+    Parses 'key=value' tokens into operation parameters.
+
+    Args:
+        tokens (list): The tokens after the operation name
+
+    Returns:
+        dict: The parameters
+    """
+    params = {}
+    for token in tokens:
+        key, separator, value = token.partition("=")
+        if not separator or not key:
+            raise api.OperationError(f"Expected key=value, got '{token}'")
+        convert = PARAMETER_TYPES.get(key)
+        params[key] = convert(value) if convert else value
+    return params
+
+
+def run_commands(lines, out, stop_on_error=False):
+    """
+    Executes commands and writes one JSON result line per command.
+
+    Args:
+        lines (iterable): Command lines
+        out (file): Where to write the results
+        stop_on_error (bool): Stop at the first failing command
+
+    Returns:
+        dict: Summary with 'commands', 'errors', 'seconds' and 'commands_per_sec'
+    """
+    buffer = []
+    commands = 0
+    errors = 0
+    started = time.perf_counter()
+
+    for line_number, line in enumerate(lines, 1):
+        try:
+            command = parse_command(line)
+            if command is None:
+                continue
+            op, params = command
+            handler = BATCH_OPERATIONS.get(op)
+            outcome = handler(params) if handler else api.execute(op, params)
+            result = {"ok": True, "op": op, "result": outcome}
+        except api.OperationError as e:
+            result = {"ok": False, "line": line_number, "error": str(e)}
+            errors += 1
+        except Exception as e:
+            # A bug in one command is reported on its line instead of ending the run
+            result = {"ok": False, "line": line_number, "error": f"Unexpected {type(e).__name__}: {e}"}
+            errors += 1
+        commands += 1
+        buffer.append(json.dumps(result, default=str))
+        if len(buffer) >= OUTPUT_CHUNK_LINES:
+            out.write("\n".join(buffer) + "\n")
+            buffer = []
+        if stop_on_error and not result["ok"]:
+            break
+
+    if buffer:
+        out.write("\n".join(buffer) + "\n")
+    out.flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "commands": commands,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "commands_per_sec": round(commands / elapsed, 1) if elapsed else None,
+    }
+
+
+def run_batch_cli(argv=None):
+    """
+    Parses the command line for 'main.py batch' and runs the commands.
+
+    Args:
+        argv (list, optional): Command line arguments after 'batch'
+
+    Returns:
+        int: Exit status (1 if any command failed)
+    """
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Run task operations without the interactive menu.")
+    parser.add_argument("command", nargs=argparse.REMAINDER,
+                        help="A single command, e.g. add title=\"Buy milk\" priority=High")
+    parser.add_argument("-f", "--file", help="Read commands from this file ('-' for stdin, the default)")
+    parser.add_argument("--stop-on-error", action="store_true", help="Stop at the first failing command")
+    parser.add_argument("--summary", action="store_true", help="Print a JSON summary with throughput to stderr")
+    args = parser.parse_args(argv)
+
+    if args.command:
+        lines = [shlex.join(args.command)]
+        summary = run_commands(lines, sys.stdout, args.stop_on_error)
+    elif args.file and args.file != "-":
+        with open(args.file, encoding="utf-8") as f:
+            summary = run_commands(f, sys.stdout, args.stop_on_error)
+    else:
+        summary = run_commands(sys.stdin, sys.stdout, args.stop_on_error)
+
+    if args.summary:
+        print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["errors"] else 0
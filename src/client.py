@@ -0,0 +1,270 @@
+"""
+Client module for the todo HTTP/JSON server.
+Provides a keep-alive client and a small load generator for the server mode.
+
+Usage:
+    python client.py load --requests 10000 --concurrency 8 --batch 50
+    python client.py load --unix /tmp/todo.sock --op search --keyword report
+"""
+
+import argparse
+import http.client
+import json
+import socket
+import sys
+import threading
+import time
+import urllib.parse
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """
+    HTTP connection over a Unix domain socket.
+    """
+
+    def __init__(self, path, timeout=30):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class TaskClient:
+    """
+    Client for the todo server that reuses one keep-alive connection for all requests.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None, timeout=30):
+        if unix_path:
+            self.connection = UnixHTTPConnection(unix_path, timeout=timeout)
+        else:
+            self.connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def request(self, method, path, payload=None):
+        """
+        Sends a request and decodes the JSON response.
+
+        Args:
+            method (str): The HTTP method
+            path (str): The request path
+            payload (Any, optional): JSON-serializable request body
+
+        Returns:
+            tuple: (status code, decoded JSON body)
+        """
+        body = None
+        headers = {}
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+
+    def call(self, op, **params):
+        """
+        Runs a single operation on the server.
+
+        Args:
+            op (str): The operation name
+            **params: The operation parameters
+
+        Returns:
+            Any: The operation result
+
+        Raises:
+            RuntimeError: If the server reports an error
+        """
+        status, data = self.request("POST", "/api", {"op": op, "params": params})
+        if status != 200:
+            raise RuntimeError(data.get("error", f"HTTP {status}"))
+        return data["result"]
+
+    def batch(self, operations):
+        """
+        Runs many operations in one round trip.
+
+        Args:
+            operations (list): List of {"op": str, "params": dict} entries
+
+        Returns:
+            list: The per-operation results
+        """
+        status, data = self.request("POST", "/batch", {"operations": operations})
+        if status != 200:
+            raise RuntimeError(data.get("error", f"HTTP {status}"))
+        return data["results"]
+
+    def list_tasks(self, **params):
+        """
+        Fetches a (streamed) task listing.
+
+        Args:
+            **params: Listing parameters (op, status, priority, tag, keyword, sort_by, ...)
+
+        Returns:
+            list: The tasks
+        """
+        query = urllib.parse.urlencode({name: str(value).lower() if isinstance(value, bool) else value
+                                        for name, value in params.items()})
+        status, data = self.request("GET", "/tasks" + (f"?{query}" if query else ""))
+        if status != 200:
+            raise RuntimeError(data.get("error", f"HTTP {status}"))
+        return data
+
+    def close(self):
+        """
+        Closes the underlying connection.
+        """
+        self.connection.close()
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the value at the given fraction of a sorted list.
+
+    Args:
+        sorted_values (list): Values in ascending order
+        fraction (float): The percentile as a fraction (e.g. 0.99)
+
+    Returns:
+        float: The percentile value, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def build_operation(op, index, keyword):
+    """
+    Builds the parameters for one generated load operation.
+
+    Args:
+        op (str): The operation name
+        index (int): Sequence number of the operation
+        keyword (str): Keyword used for search operations
+
+    Returns:
+        dict: A {"op": str, "params": dict} entry
+    """
+    if op == "add":
+        priorities = ("High", "Medium", "Low")
+        return {"op": "add", "params": {"title": f"Load task {index}", "priority": priorities[index % 3],
+                                        "tags": [f"tag{index % 10}"]}}
+    if op == "search":
+        return {"op": "search", "params": {"keyword": keyword}}
+    if op == "toggle":
+        return {"op": "toggle", "params": {"id": index + 1}}
+    return {"op": op, "params": {}}
+
+
+def run_load(host, port, unix_path, op, total, concurrency, batch_size, keyword):
+    """
+    Sends generated operations from several keep-alive connections and reports throughput.
+
+    Args:
+        host (str): Server host
+        port (int): Server port
+        unix_path (str): Server Unix socket path, if any
+        op (str): The operation to generate
+        total (int): Total number of operations
+        concurrency (int): Number of concurrent connections
+        batch_size (int): Operations per request (1 uses /api, more uses /batch)
+        keyword (str): Keyword used for search operations
+
+    Returns:
+        dict: Summary with operations, requests, seconds, ops_per_sec, latency percentiles (ms) and the
+        errors that stopped workers
+    """
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    # The first total % concurrency workers send one operation more than the others
+    share, extra = divmod(total, concurrency)
+    counts = [share + (1 if i < extra else 0) for i in range(concurrency)]
+    completed = [0] * concurrency
+
+    def worker(worker_index):
+        local = []
+        count = counts[worker_index]
+        base = sum(counts[:worker_index])
+        try:
+            client = TaskClient(host, port, unix_path)
+            try:
+                while completed[worker_index] < count:
+                    sent = completed[worker_index]
+                    size = min(batch_size, count - sent)
+                    operations = [build_operation(op, base + sent + i, keyword) for i in range(size)]
+                    start = time.perf_counter()
+                    if size == 1:
+                        client.call(operations[0]["op"], **operations[0]["params"])
+                    else:
+                        client.batch(operations)
+                    local.append(time.perf_counter() - start)
+                    completed[worker_index] += size
+            finally:
+                client.close()
+        except Exception as e:
+            # A failed worker stops; its error is reported instead of being lost with the thread
+            with lock:
+                errors.append(f"worker {worker_index}: {type(e).__name__}: {e}")
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency) if counts[i]]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    operations = sum(completed)
+    return {
+        "operations": operations,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 4),
+        "ops_per_sec": round(operations / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "errors": errors,
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point for the load client.
+
+    Args:
+        argv (list, optional): Command line arguments
+
+    Returns:
+        int: Exit status (1 if a worker failed)
+    """
+    parser = argparse.ArgumentParser(description="Client and load generator for the todo server.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    load = subparsers.add_parser("load", help="Generate load against a running server")
+    load.add_argument("--host", default="127.0.0.1")
+    load.add_argument("--port", type=int, default=8765)
+    load.add_argument("--unix", metavar="PATH", help="Connect to a Unix socket instead of TCP")
+    load.add_argument("--op", default="add", help="Operation to generate (add, search, toggle, list, ...)")
+    load.add_argument("--requests", type=int, default=1000, help="Total number of operations")
+    load.add_argument("--concurrency", type=int, default=4, help="Number of concurrent connections")
+    load.add_argument("--batch", type=int, default=1, help="Operations per request (uses /batch when > 1)")
+    load.add_argument("--keyword", default="task", help="Keyword for search operations")
+
+    args = parser.parse_args(argv)
+    summary = run_load(args.host, args.port, args.unix, args.op, args.requests,
+                       max(1, args.concurrency), max(1, args.batch), args.keyword)
+    print(json.dumps(summary, indent=2))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Clock module for the console todo application.
+Every "what time is it" question in the app goes through now() and today(),
+so time can be frozen or fast-forwarded in tests and benchmarks.
+
+Queries and renders capture one timestamp up front and pass it down to the
+due-date predicates, instead of asking the clock once per task: this keeps a
+large listing from classifying tasks inconsistently across midnight.
+"""
+
+import contextlib
+import datetime
+
+# Fixed time returned while the clock is frozen, or None when it follows the system clock
+_frozen_at = None
+
+# Added to the system clock while it isn't frozen (set by advance)
+_offset = datetime.timedelta(0)
+
+
+def now():
+    """
+    Gets the current time.
+
+    Returns:
+        datetime.datetime: The frozen time, or the system time plus any fast-forward offset
+    """
+    if _frozen_at is not None:
+        return _frozen_at
+    if _offset:
+        return datetime.datetime.now() + _offset
+    return datetime.datetime.now()
+
+
+def today():
+    """
+    Gets the current date.
+
+    Returns:
+        datetime.date: The date part of now()
+    """
+    return now().date()
+
+
+def freeze(at=None):
+    """
+    Stops the clock.
+
+    Args:
+        at (datetime.datetime, optional): The time to freeze at (defaults to the current time)
+
+    Returns:
+        datetime.datetime: The frozen time
+    """
+    global _frozen_at
+    _frozen_at = at if at is not None else now()
+    return _frozen_at
+
+
+def advance(delta):
+    """
+    Fast-forwards the clock, whether or not it is frozen.
+
+    Args:
+        delta (datetime.timedelta): How far to move (negative to move back)
+
+    Returns:
+        datetime.datetime: The new current time
+    """
+    global _frozen_at, _offset
+    if _frozen_at is not None:
+        _frozen_at += delta
+    else:
+        _offset += delta
+    return now()
+
+
+def reset():
+    """
+    Returns the clock to the system time, dropping any freeze or offset.
+    """
+    global _frozen_at, _offset
+    _frozen_at = None
+    _offset = datetime.timedelta(0)
+
+
+def is_frozen():
+    """
+    Checks whether the clock is frozen.
+
+    Returns:
+        bool: True if now() returns a fixed time
+    """
+    return _frozen_at is not None
+
+
+@contextlib.contextmanager
+def frozen(at=None):
+    """
+    Freezes the clock for the duration of a with block, restoring the previous state afterwards.
+
+    Args:
+        at (datetime.datetime, optional): The time to freeze at (defaults to the current time)
+
+    Yields:
+        datetime.datetime: The frozen time
+    """
+    global _frozen_at, _offset
+    previous = (_frozen_at, _offset)
+    try:
+        yield freeze(at)
+    finally:
+        _frozen_at, _offset = previous
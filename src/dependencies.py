@@ -0,0 +1,417 @@
+"""
+Dependency module for the console todo application.
+Relates tasks to each other: a task can depend on other tasks ('depends_on',
+a list of task IDs) and can be a subtask of a parent ('parent_id'). A task is
+blocked until every task it depends on and every one of its subtasks is
+complete; the tasks that are incomplete and not blocked are actionable.
+
+Relations are stored on the tasks and changed through 'update' events, so undo
+and the change history cover them. The dependency graph keeps, for each task,
+the number of incomplete tasks blocking it, and the set of actionable tasks:
+completing a task (toggle_task_status, or an update of 'completed') only
+decrements the counters of the tasks that depend on it, instead of walking
+the graph again. Relations that would create a cycle are rejected.
+"""
+
+import memory
+import tasks
+
+
+class DependencyGraph:
+    """
+    Task relations with incrementally maintained blocker counts and actionable set.
+    """
+
+    def __init__(self, bus=None, storage=None):
+        self.bus = bus if bus is not None else tasks.event_bus
+        self._storage = storage if storage is not None else tasks.tasks_storage
+        self.rebuild()
+        self.subscription = self.bus.subscribe(callback=self._on_event)
+
+    def rebuild(self):
+        """
+        Recomputes the graph from the store (only needed if the store was modified behind the bus).
+        """
+        # Task ID -> stored task
+        self._tasks = {}
+        # Task ID -> IDs it depends on, and the reverse (prerequisite ID -> IDs depending on it)
+        self._depends = {}
+        self._required_by = {}
+        # Subtask ID -> parent ID, and parent ID -> subtask IDs
+        self._parent = {}
+        self._children = {}
+        # IDs of incomplete tasks
+        self._open = set()
+        # Task ID -> number of incomplete tasks blocking it
+        self._blockers = {}
+        self.ready = set()
+
+        for task in self._storage:
+            self._tasks[task["id"]] = task
+            self._link(task["id"], task.get("depends_on"), task.get("parent_id"))
+            if not task["completed"]:
+                self._open.add(task["id"])
+        for task_id in self._tasks:
+            self._refresh(task_id)
+
+    def _link(self, task_id, depends_on, parent_id):
+        """
+        Records a task's own relations.
+        """
+        if depends_on:
+            self._depends[task_id] = set(depends_on)
+            for prerequisite in depends_on:
+                self._required_by.setdefault(prerequisite, set()).add(task_id)
+        if parent_id is not None:
+            self._parent[task_id] = parent_id
+            self._children.setdefault(parent_id, set()).add(task_id)
+
+    def _unlink_depends(self, task_id):
+        """
+        Forgets the tasks a task depends on.
+        """
+        for prerequisite in self._depends.pop(task_id, ()):
+            dependents = self._required_by.get(prerequisite)
+            if dependents is not None:
+                dependents.discard(task_id)
+                if not dependents:
+                    del self._required_by[prerequisite]
+
+    def _unlink_parent(self, task_id):
+        """
+        Forgets a task's parent.
+
+        Returns:
+            int or None: The former parent ID
+        """
+        parent_id = self._parent.pop(task_id, None)
+        if parent_id is not None:
+            children = self._children[parent_id]
+            children.discard(task_id)
+            if not children:
+                del self._children[parent_id]
+        return parent_id
+
+    def prerequisites(self, task_id):
+        """
+        Gets the IDs that must be complete before a task is actionable: what it depends on and its subtasks.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            set: The prerequisite IDs (they may include deleted tasks)
+        """
+        return self._depends.get(task_id, set()) | self._children.get(task_id, set())
+
+    def dependents(self, task_id):
+        """
+        Gets the IDs of the stored tasks a task blocks: the tasks depending on it and its parent.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            set: The dependent IDs
+        """
+        dependents = set(self._required_by.get(task_id, ()))
+        parent_id = self._parent.get(task_id)
+        if parent_id in self._tasks:
+            dependents.add(parent_id)
+        return dependents
+
+    def _refresh(self, task_id):
+        """
+        Recounts one task's blockers and updates its actionable state.
+        """
+        count = sum(1 for prerequisite in self.prerequisites(task_id) if prerequisite in self._open)
+        self._blockers[task_id] = count
+        if count == 0 and task_id in self._open:
+            self.ready.add(task_id)
+        else:
+            self.ready.discard(task_id)
+
+    def _opened(self, task_id):
+        """
+        Marks a task incomplete, blocking the tasks that depend on it.
+        """
+        self._open.add(task_id)
+        for dependent in self.dependents(task_id):
+            self._blockers[dependent] += 1
+            self.ready.discard(dependent)
+        self._refresh(task_id)
+
+    def _closed(self, task_id):
+        """
+        Marks a task complete (or gone), unblocking the tasks that depend on it.
+        """
+        self._open.discard(task_id)
+        self.ready.discard(task_id)
+        for dependent in self.dependents(task_id):
+            self._blockers[dependent] -= 1
+            if self._blockers[dependent] == 0 and dependent in self._open:
+                self.ready.add(dependent)
+
+    def _on_event(self, event):
+        """
+        Applies one mutation event to the graph.
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        kind = event["type"]
+        if kind == "add":
+            task = event["task"]
+            task_id = event["task_id"]
+            self._tasks[task_id] = tasks.find_task(task_id, self._storage) or task
+            self._link(task_id, task.get("depends_on"), task.get("parent_id"))
+            self._blockers[task_id] = 0
+            if task["completed"]:
+                self._refresh(task_id)
+            else:
+                self._opened(task_id)
+        elif kind in ("update", "toggle"):
+            task_id = event["task_id"]
+            if task_id not in self._tasks:
+                return
+            changes = event["changes"]
+            if "depends_on" in changes:
+                self._unlink_depends(task_id)
+                self._link(task_id, changes["depends_on"][1], None)
+                self._refresh(task_id)
+            if "parent_id" in changes:
+                old_parent = self._unlink_parent(task_id)
+                self._link(task_id, None, changes["parent_id"][1])
+                for parent_id in (old_parent, changes["parent_id"][1]):
+                    if parent_id in self._tasks:
+                        self._refresh(parent_id)
+            if "completed" in changes:
+                completed = changes["completed"][1]
+                if completed and task_id in self._open:
+                    self._closed(task_id)
+                elif not completed and task_id not in self._open:
+                    self._opened(task_id)
+        elif kind == "delete":
+            task_id = event["task_id"]
+            if task_id not in self._tasks:
+                return
+            if task_id in self._open:
+                self._closed(task_id)
+            self._unlink_depends(task_id)
+            parent_id = self._unlink_parent(task_id)
+            if parent_id in self._tasks:
+                self._refresh(parent_id)
+            del self._tasks[task_id]
+            del self._blockers[task_id]
+        elif kind == "clear":
+            self.rebuild()
+
+    def would_cycle(self, task_id, prerequisite_id):
+        """
+        Checks whether making a task wait for another would create a cycle.
+
+        Args:
+            task_id (int): The task that would wait
+            prerequisite_id (int): The task it would wait for
+
+        Returns:
+            bool: True if the prerequisite already waits (directly or not) for the task
+        """
+        stack = [prerequisite_id]
+        seen = set()
+        while stack:
+            current = stack.pop()
+            if current == task_id:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.prerequisites(current))
+        return False
+
+    def blockers(self, task_id):
+        """
+        Gets the incomplete tasks a task is waiting for.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            list: The blocking task IDs, sorted
+        """
+        return sorted(prerequisite for prerequisite in self.prerequisites(task_id) if prerequisite in self._open)
+
+    def is_blocked(self, task_id):
+        """
+        Checks whether a task is waiting for incomplete tasks.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            bool: True if at least one prerequisite is incomplete
+        """
+        return self._blockers.get(task_id, 0) > 0
+
+    def actionable(self):
+        """
+        Gets the tasks that are incomplete and not blocked.
+
+        Returns:
+            list: The actionable tasks, by ID
+        """
+        return [self._tasks[task_id] for task_id in sorted(self.ready)]
+
+    def subtasks(self, task_id):
+        """
+        Gets a task's subtasks.
+
+        Args:
+            task_id (int): The parent task ID
+
+        Returns:
+            list: The subtasks, by ID
+        """
+        return [self._tasks[child] for child in sorted(self._children.get(task_id, ()))]
+
+    def close(self):
+        """
+        Stops tracking events.
+        """
+        self.subscription.close()
+
+
+_graph = None
+
+
+def get_dependency_graph():
+    """
+    Gets the shared dependency graph, creating it (with one pass over the store) on first use.
+
+    Returns:
+        DependencyGraph: The graph
+    """
+    global _graph
+    if _graph is None:
+        _graph = DependencyGraph()
+    return _graph
+
+
+memory.register_index("dependency_graph",
+                      lambda: [value for key, value in vars(_graph).items()
+                               if key not in ("bus", "_storage", "subscription", "_tasks")] if _graph else None)
+
+
+def _set_relation(task, field, value):
+    """
+    Sets a relation field and publishes the change as an 'update' event.
+    """
+    old = task.get(field)
+    if old != value:
+        task[field] = value
+        tasks.event_bus.publish("update", task["id"], changes={field: (old, value)})
+
+
+def add_dependency(task_id, prerequisite_id):
+    """
+    Makes a task wait for another task to be completed.
+
+    Args:
+        task_id (int): The task that waits
+        prerequisite_id (int): The task it waits for
+
+    Returns:
+        bool: True if the dependency was added (or already existed), False if either task doesn't exist
+
+    Raises:
+        ValueError: If the dependency would create a cycle
+    """
+    graph = get_dependency_graph()
+    task = tasks.get_task_by_id(task_id)
+    if task is None or tasks.get_task_by_id(prerequisite_id) is None:
+        return False
+    depends_on = task.get("depends_on") or []
+    if prerequisite_id in depends_on:
+        return True
+    if graph.would_cycle(task_id, prerequisite_id):
+        raise ValueError(f"Task {task_id} cannot depend on task {prerequisite_id}: it would create a cycle")
+    _set_relation(task, "depends_on", depends_on + [prerequisite_id])
+    return True
+
+
+def remove_dependency(task_id, prerequisite_id):
+    """
+    Stops a task from waiting for another task.
+
+    Args:
+        task_id (int): The task that waits
+        prerequisite_id (int): The task it waits for
+
+    Returns:
+        bool: True if the dependency was removed, False if it didn't exist
+    """
+    task = tasks.get_task_by_id(task_id)
+    depends_on = (task.get("depends_on") or []) if task is not None else []
+    if prerequisite_id not in depends_on:
+        return False
+    _set_relation(task, "depends_on", [other for other in depends_on if other != prerequisite_id])
+    return True
+
+
+def set_parent(task_id, parent_id):
+    """
+    Makes a task a subtask of another task, or a top-level task again.
+
+    Args:
+        task_id (int): The subtask ID
+        parent_id (int or None): The parent task ID (None to detach the task from its parent)
+
+    Returns:
+        bool: True if the parent was set, False if either task doesn't exist
+
+    Raises:
+        ValueError: If the relation would create a cycle
+    """
+    graph = get_dependency_graph()
+    task = tasks.get_task_by_id(task_id)
+    if task is None or (parent_id is not None and tasks.get_task_by_id(parent_id) is None):
+        return False
+    if parent_id is not None and task.get("parent_id") != parent_id and graph.would_cycle(parent_id, task_id):
+        raise ValueError(f"Task {task_id} cannot be a subtask of task {parent_id}: it would create a cycle")
+    _set_relation(task, "parent_id", parent_id)
+    return True
+
+
+def actionable_tasks():
+    """
+    Gets the tasks that are incomplete and not waiting for other tasks.
+
+    Returns:
+        list: The actionable tasks, by ID
+    """
+    return get_dependency_graph().actionable()
+
+
+def get_subtasks(task_id):
+    """
+    Gets a task's subtasks.
+
+    Args:
+        task_id (int): The parent task ID
+
+    Returns:
+        list: The subtasks, by ID
+    """
+    return get_dependency_graph().subtasks(task_id)
+
+
+def get_blockers(task_id):
+    """
+    Gets the incomplete tasks a task is waiting for.
+
+    Args:
+        task_id (int): The task ID
+
+    Returns:
+        list: The blocking task IDs, sorted
+    """
+    return get_dependency_graph().blockers(task_id)
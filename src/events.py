@@ -0,0 +1,208 @@
+"""
+Event bus module for the console todo application.
+Publishes task mutations to subscribers so indexes, caches, persistence and
+external consumers can update incrementally instead of re-reading the whole store.
+
+Every event is a dictionary with a monotonically increasing sequence number:
+
+    {"seq": 42, "type": "update", "task_id": 7, "changes": {"title": ("Old", "New")}}
+
+Event types:
+    add     - "task": copy of the new task ("source_id" is set for spawned recurrences)
+    update  - "changes": {field: (old value, new value)} for the fields that changed
+    toggle  - "changes": {"completed": (old, new)}, "spawned_id": ID of the spawned recurrence or None
+    delete  - "task": the removed task, "position": its index in the store
+    clear   - "tasks": the removed tasks (all of them), "last_task_id": the highest ID issued before
+
+Events published inside an EventBus.transaction() block also carry a "txn"
+number shared by the whole block (e.g. a toggle and the recurrence it spawned),
+so consumers such as the undo history can treat them as one change.
+"""
+
+import collections
+import contextlib
+import threading
+
+
+class Subscription:
+    """
+    A subscriber to the event bus.
+
+    Callback subscriptions are invoked synchronously on every publish and should
+    be cheap (in-process indexes and caches). Buffered subscriptions keep up to
+    buffer_size events for the consumer to poll; when the buffer is full the
+    overflow policy applies:
+
+        "lag"   - drop the oldest event and count it in `lagged`; the consumer
+                  should resynchronise from the store when lagged is non-zero
+        "block" - make the publisher wait (up to block_timeout seconds) for the
+                  consumer to drain, then fall back to "lag"
+    """
+
+    def __init__(self, bus, callback=None, buffer_size=1024, overflow="lag", block_timeout=1.0):
+        if overflow not in ("lag", "block"):
+            raise ValueError("overflow must be 'lag' or 'block'")
+        self.bus = bus
+        self.callback = callback
+        self.buffer_size = buffer_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.lagged = 0
+        self._buffer = collections.deque()
+        self._condition = threading.Condition()
+
+    def _deliver(self, event):
+        """
+        Delivers one event, applying the overflow policy for buffered subscriptions.
+
+        Args:
+            event (dict): The event
+        """
+        if self.callback is not None:
+            self.callback(event)
+            return
+
+        with self._condition:
+            if len(self._buffer) >= self.buffer_size and self.overflow == "block":
+                self._condition.wait_for(lambda: len(self._buffer) < self.buffer_size, self.block_timeout)
+            if len(self._buffer) >= self.buffer_size:
+                self._buffer.popleft()
+                self.lagged += 1
+            self._buffer.append(event)
+            self._condition.notify_all()
+
+    def poll(self, max_events=None):
+        """
+        Takes buffered events without waiting.
+
+        Args:
+            max_events (int, optional): Maximum number of events to take (default all)
+
+        Returns:
+            list: The events, oldest first
+        """
+        with self._condition:
+            count = len(self._buffer) if max_events is None else min(max_events, len(self._buffer))
+            events = [self._buffer.popleft() for _ in range(count)]
+            if events:
+                self._condition.notify_all()
+            return events
+
+    def wait(self, timeout=None, max_events=None):
+        """
+        Waits until at least one event is buffered, then takes the buffered events.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait
+            max_events (int, optional): Maximum number of events to take
+
+        Returns:
+            list: The events, or an empty list on timeout
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._buffer, timeout)
+        return self.poll(max_events)
+
+    def reset_lag(self):
+        """
+        Clears the lag counter after the consumer has resynchronised.
+
+        Returns:
+            int: The number of events that had been dropped
+        """
+        with self._condition:
+            lagged, self.lagged = self.lagged, 0
+            return lagged
+
+    def pending(self):
+        """
+        Gets the number of buffered events.
+
+        Returns:
+            int: The number of events waiting to be polled
+        """
+        return len(self._buffer)
+
+    def close(self):
+        """
+        Unsubscribes from the bus.
+        """
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """
+    Publishes sequenced mutation events to subscribers.
+    """
+
+    def __init__(self):
+        self.sequence = 0
+        self._subscribers = []
+        self._transactions = 0
+        self._txn = None
+
+    def subscribe(self, callback=None, buffer_size=1024, overflow="lag", block_timeout=1.0):
+        """
+        Subscribes to future events.
+
+        Args:
+            callback (callable, optional): Called synchronously with each event; if omitted, events are buffered
+            buffer_size (int): Maximum number of buffered events
+            overflow (str): Overflow policy for a full buffer ('lag' or 'block')
+            block_timeout (float): Seconds a publisher waits under the 'block' policy
+
+        Returns:
+            Subscription: The new subscription
+        """
+        subscription = Subscription(self, callback, buffer_size, overflow, block_timeout)
+        # Copy on write, so publishing never iterates a list that is being modified
+        self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Removes a subscription.
+
+        Args:
+            subscription (Subscription): The subscription to remove
+        """
+        self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Marks the events published inside the block as one change. Nested blocks join the outermost one.
+
+        Yields:
+            int: The transaction number carried by the events as "txn"
+        """
+        if self._txn is not None:
+            yield self._txn
+            return
+        self._transactions += 1
+        self._txn = self._transactions
+        try:
+            yield self._txn
+        finally:
+            self._txn = None
+
+    def publish(self, event_type, task_id=None, **fields):
+        """
+        Assigns the next sequence number to an event and delivers it to every subscriber.
+
+        Args:
+            event_type (str): The event type ('add', 'update', 'toggle', 'delete', 'clear')
+            task_id (int, optional): The ID of the affected task
+            **fields: Additional event fields (task, changes, spawned_id, ...)
+
+        Returns:
+            dict: The published event
+        """
+        self.sequence += 1
+        event = {"seq": self.sequence, "type": event_type, "task_id": task_id}
+        if self._txn is not None:
+            event["txn"] = self._txn
+        event.update(fields)
+        for subscription in self._subscribers:
+            subscription._deliver(event)
+        return event
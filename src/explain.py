@@ -0,0 +1,183 @@
+"""
+Query explain module for the console todo application.
+Reports how filter_tasks, search_tasks, fuzzy_search and sort_tasks evaluate
+a query: the access path, the estimated and actual candidate counts at each
+stage, and the time spent per stage.
+
+Estimates come from the incremental counters in stats.py (read without moving
+the shared tracker to the query time) and assume the criteria are
+independent; stages without a counter have no estimate.
+"""
+
+import time
+
+import clock
+import fuzzy
+import stats
+import tasks
+
+
+def _selectivity(stage, counts, total):
+    """
+    Estimates the fraction of tasks a filter stage keeps, from the aggregate counters.
+
+    Args:
+        stage (dict): A stage from tasks.get_filter_stages
+        counts (dict): Counters from stats.estimate()
+        total (int): Number of tasks in the store
+
+    Returns:
+        float or None: The estimated fraction, or None if no counter covers the stage
+    """
+    field, value = stage["field"], stage["value"]
+    if field == "status":
+        matching = counts["completed"] if value == "completed" else counts["incomplete"]
+    elif field == "priority":
+        matching = counts["by_priority"].get(value, 0)
+    elif field == "tag":
+        matching = counts["by_tag"].get(value, 0)
+    elif field == "overdue":
+        matching = counts["overdue"] if value else total - counts["overdue"]
+    elif field == "recurring":
+        matching = counts["recurring"] if value else total - counts["recurring"]
+    else:
+        return None
+    return matching / total
+
+
+def _run_stages(stages, candidates, counts):
+    """
+    Applies filter stages in order, measuring each one.
+
+    Args:
+        stages (list): Stages from tasks.get_filter_stages
+        candidates (list): The tasks entering the first stage
+        counts (dict): Counters from stats.estimate()
+
+    Returns:
+        tuple: (remaining tasks, list of stage reports)
+    """
+    total = len(candidates)
+    estimate = float(total)
+    reports = []
+    for stage in stages:
+        predicate = stage["predicate"]
+        started = time.perf_counter()
+        remaining = [task for task in candidates if predicate(task)]
+        elapsed = time.perf_counter() - started
+
+        selectivity = _selectivity(stage, counts, total) if total else None
+        estimate = estimate * selectivity if selectivity is not None and estimate is not None else None
+        reports.append({
+            "stage": stage["stage"],
+            "input_rows": len(candidates),
+            "estimated_rows": round(estimate) if estimate is not None else None,
+            "actual_rows": len(remaining),
+            "time_ms": round(elapsed * 1000, 3),
+        })
+        candidates = remaining
+    return candidates, reports
+
+
+def explain(operation, **criteria):
+    """
+    Runs a query and reports how it was evaluated.
+
+    Args:
+        operation (str): 'filter_tasks', 'search_tasks', 'fuzzy_search' or 'sort_tasks'
+        **criteria: The keyword arguments of the operation
+
+    Returns:
+        dict: The report with 'operation', 'criteria', 'access_path', 'store_size', 'stages'
+              (stage, input_rows, estimated_rows, actual_rows, time_ms), 'result_rows' and 'total_time_ms'
+
+    Raises:
+        ValueError: If the operation is not supported
+    """
+    started = time.perf_counter()
+    store_size = len(tasks.tasks_storage)
+
+    if operation == "filter_tasks":
+        # Estimates and stages are evaluated at the same moment
+        now = criteria.get("now") or clock.now()
+        counts = stats.estimate(now)
+        filter_stages = tasks.get_filter_stages(**dict(criteria, now=now))
+        result, stages = _run_stages(filter_stages, tasks.tasks_storage[:], counts)
+        access_path = (f"sequential scan of tasks_storage, {len(filter_stages)} predicate stage(s) in criteria order"
+                       if filter_stages else "copy of tasks_storage (no criteria)")
+    elif operation == "search_tasks":
+        keyword = criteria.get("keyword")
+        stage_started = time.perf_counter()
+        result = tasks.search_tasks(keyword)
+        stages = [{
+            "stage": f"title/description contains {keyword!r}",
+            "input_rows": store_size if keyword else 0,
+            "estimated_rows": None,
+            "actual_rows": len(result),
+            "time_ms": round((time.perf_counter() - stage_started) * 1000, 3),
+        }]
+        access_path = "sequential scan of tasks_storage, substring match on title and description"
+    elif operation == "fuzzy_search":
+        query = criteria.get("query", "")
+        index = fuzzy.get_title_index()
+        stage_started = time.perf_counter()
+        result = index.search(query, criteria.get("max_distance"), criteria.get("limit"))
+        stages = [{
+            "stage": f"title words within edit distance of {query!r}",
+            "input_rows": index.vocabulary_size(),
+            "estimated_rows": None,
+            "actual_rows": index.last_checked,
+            "time_ms": round((time.perf_counter() - stage_started) * 1000, 3),
+        }]
+        access_path = (f"title n-gram index: {index.last_checked} of {index.vocabulary_size()} "
+                       f"words compared by edit distance")
+    elif operation == "sort_tasks":
+        tasks_list = criteria.get("tasks_list")
+        sort_by = criteria.get("sort_by", "priority")
+        candidates = tasks_list if tasks_list is not None else tasks.tasks_storage
+        stage_started = time.perf_counter()
+        result = tasks.sort_tasks(tasks_list, sort_by)
+        stages = [{
+            "stage": f"sort by {sort_by}",
+            "input_rows": len(candidates),
+            "estimated_rows": len(candidates),
+            "actual_rows": len(result),
+            "time_ms": round((time.perf_counter() - stage_started) * 1000, 3),
+        }]
+        access_path = f"in-memory sort of {'the given list' if tasks_list is not None else 'a copy of tasks_storage'}"
+    else:
+        raise ValueError(f"Cannot explain operation '{operation}'")
+
+    return {
+        "operation": operation,
+        "criteria": criteria,
+        "access_path": access_path,
+        "store_size": store_size,
+        "stages": stages,
+        "result_rows": len(result),
+        "total_time_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def format_explain(report):
+    """
+    Formats an explain report as text.
+
+    Args:
+        report (dict): A report from explain()
+
+    Returns:
+        str: The formatted plan
+    """
+    lines = [
+        f"{report['operation']}({', '.join(f'{k}={v!r}' for k, v in report['criteria'].items())})",
+        f"Access path: {report['access_path']} over {report['store_size']} tasks",
+        f"{'Stage':<36} | {'In':>8} | {'Est.':>8} | {'Actual':>8} | {'ms':>9}",
+        "-" * 80,
+    ]
+    for stage in report["stages"]:
+        estimated = stage["estimated_rows"] if stage["estimated_rows"] is not None else "-"
+        lines.append(f"{stage['stage']:<36} | {stage['input_rows']:>8} | {estimated:>8} | "
+                     f"{stage['actual_rows']:>8} | {stage['time_ms']:>9}")
+    lines.append(f"Result: {report['result_rows']} rows in {report['total_time_ms']} ms")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""
+Export module for the console todo application.
+Streams tasks to JSON Lines or CSV without materializing the task list:
+tasks are pulled lazily from any iterable (the store itself, or a lazy
+filter/sort result such as iter_filter_tasks) and written in chunks of a
+bounded number of rows, so memory use doesn't grow with the store.
+"""
+
+import csv
+import io
+import json
+
+import tasks
+
+# Rows formatted per write
+CHUNK_ROWS = 1000
+
+# CSV columns, in order; tags are comma-separated and recurrence patterns are JSON
+CSV_FIELDS = ("id", "title", "description", "completed", "priority", "tags", "due_date", "recurring")
+
+FORMATS = ("jsonl", "csv")
+
+
+def iter_jsonl_chunks(source, chunk_rows=CHUNK_ROWS):
+    """
+    Formats tasks as JSON Lines, a chunk at a time.
+
+    Args:
+        source (iterable): The tasks to export
+        chunk_rows (int): Rows per chunk
+
+    Yields:
+        str: Newline-terminated lines for up to chunk_rows tasks
+    """
+    dumps = json.dumps
+    lines = []
+    for task in source:
+        lines.append(dumps(task))
+        if len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv_chunks(source, chunk_rows=CHUNK_ROWS):
+    """
+    Formats tasks as CSV with a header row, a chunk at a time.
+
+    Args:
+        source (iterable): The tasks to export
+        chunk_rows (int): Rows per chunk
+
+    Yields:
+        str: CSV text for the header and up to chunk_rows tasks per chunk
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    rows = 0
+    for task in source:
+        recurring = task.get("recurring")
+        writer.writerow((
+            task["id"],
+            task["title"],
+            task["description"],
+            "true" if task["completed"] else "false",
+            task["priority"],
+            ",".join(task["tags"]),
+            task.get("due_date") or "",
+            json.dumps(recurring) if recurring else "",
+        ))
+        rows += 1
+        if rows >= chunk_rows:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_tasks(out, fmt="jsonl", source=None, chunk_rows=CHUNK_ROWS):
+    """
+    Streams tasks to an open text file.
+
+    Args:
+        out (file): The file to write to
+        fmt (str): 'jsonl' or 'csv'
+        source (iterable, optional): The tasks to export (defaults to the whole store, iterated in place)
+        chunk_rows (int): Rows per write
+
+    Returns:
+        int: Number of tasks exported
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    if source is None:
+        source = tasks.tasks_storage
+
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    chunks = iter_jsonl_chunks if fmt == "jsonl" else iter_csv_chunks
+    for chunk in chunks(counted(source), chunk_rows):
+        out.write(chunk)
+    return count
+
+
+def export_to_file(path, fmt=None, source=None, chunk_rows=CHUNK_ROWS):
+    """
+    Streams tasks to a file, choosing the format from the extension if not given.
+
+    Args:
+        path (str): The file to write (overwritten)
+        fmt (str, optional): 'jsonl' or 'csv' (defaults to the file extension, then 'jsonl')
+        source (iterable, optional): The tasks to export (defaults to the whole store)
+        chunk_rows (int): Rows per write
+
+    Returns:
+        int: Number of tasks exported
+    """
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    newline = "" if fmt == "csv" else None
+    with open(path, "w", encoding="utf-8", newline=newline) as out:
+        return export_tasks(out, fmt, source, chunk_rows)
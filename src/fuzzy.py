@@ -0,0 +1,327 @@
+"""
+Fuzzy search module for the console todo application.
+Finds tasks whose titles contain words close to the query words, so typos
+like "meetng" still find "Team meeting", ranked by total edit distance.
+
+Titles are normalized (case-folded, accents stripped) and split into words.
+The title index keeps the distinct words with the tasks using them, trigram
+and bigram indexes over those words and the words by length. A query word is
+only compared against words that share enough trigrams with it (an edit
+changes at most three trigrams) and have a compatible length, so a query
+computes edit distances for a small part of the vocabulary instead of every
+title. Short words with many allowed typos can match without sharing any
+trigram ("bag" and "bug", "meetng" and "meeting"); those are filtered on
+bigrams instead, of which an edit changes at most two. Only a distance too
+large for either filter compares every word of a compatible length. The index
+is kept current from the event bus.
+"""
+
+import collections
+import re
+import unicodedata
+
+import memory
+import tasks
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def normalize_words(text):
+    """
+    Splits text into case-folded words without accents.
+
+    Args:
+        text (str): The text (e.g. a task title)
+
+    Returns:
+        list: The normalized words, in order
+    """
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return _WORD.findall("".join(c for c in decomposed if not unicodedata.combining(c)))
+
+
+def trigrams(word):
+    """
+    Gets the trigrams of a word padded with '$' on both sides.
+
+    Args:
+        word (str): The normalized word
+
+    Returns:
+        set: The distinct trigrams
+    """
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bigrams(word):
+    """
+    Gets the bigrams of a word padded with '$' on both sides.
+
+    Args:
+        word (str): The normalized word
+
+    Returns:
+        set: The distinct bigrams
+    """
+    padded = f"${word}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def default_max_distance(word):
+    """
+    Gets the number of typos tolerated in a query word: none for very short words, two for long ones.
+
+    Args:
+        word (str): The normalized query word
+
+    Returns:
+        int: The maximum edit distance
+    """
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+def edit_distance(a, b, limit=None):
+    """
+    Computes the Levenshtein distance between two strings.
+
+    Args:
+        a (str): The first string
+        b (str): The second string
+        limit (int, optional): Stop early once the distance is known to exceed this
+
+    Returns:
+        int: The distance, or limit + 1 if it exceeds the limit
+    """
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TitleIndex:
+    """
+    Word and trigram index over task titles, kept current by subscribing to the event bus.
+    """
+
+    def __init__(self, bus=None, storage=None):
+        self.bus = bus if bus is not None else tasks.event_bus
+        self._storage = storage if storage is not None else tasks.tasks_storage
+        self.rebuild()
+        self.subscription = self.bus.subscribe(callback=self._on_event)
+
+    def rebuild(self):
+        """
+        Rebuilds the index from the store (only needed if the store was modified behind the bus).
+        """
+        # Task ID -> stored task, and task ID -> its distinct title words
+        self._tasks = {}
+        self._task_words = {}
+        # Word -> IDs of the tasks whose title has it
+        self._postings = {}
+        # Trigram -> words containing it, bigram -> words containing it, and word length -> words
+        self._grams = {}
+        self._bigrams = {}
+        self._lengths = {}
+        # Words compared by edit distance in the last search
+        self.last_checked = 0
+        for task in self._storage:
+            self._add(task["id"], task)
+
+    def _add(self, task_id, task):
+        """
+        Indexes one task's title.
+        """
+        words = frozenset(normalize_words(task["title"]))
+        self._tasks[task_id] = task
+        self._task_words[task_id] = words
+        for word in words:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                for gram in trigrams(word):
+                    self._grams.setdefault(gram, set()).add(word)
+                for gram in bigrams(word):
+                    self._bigrams.setdefault(gram, set()).add(word)
+                self._lengths.setdefault(len(word), set()).add(word)
+            postings.add(task_id)
+
+    def _remove(self, task_id):
+        """
+        Drops one task from the index, and the words no other title uses.
+        """
+        self._tasks.pop(task_id, None)
+        for word in self._task_words.pop(task_id, ()):
+            postings = self._postings[word]
+            postings.discard(task_id)
+            if not postings:
+                del self._postings[word]
+                for gram in trigrams(word):
+                    words = self._grams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._grams[gram]
+                for gram in bigrams(word):
+                    words = self._bigrams[gram]
+                    words.discard(word)
+                    if not words:
+                        del self._bigrams[gram]
+                words = self._lengths[len(word)]
+                words.discard(word)
+                if not words:
+                    del self._lengths[len(word)]
+
+    def _on_event(self, event):
+        """
+        Applies one mutation event to the index.
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        kind = event["type"]
+        if kind == "add":
+            self._add(event["task_id"], tasks.find_task(event["task_id"], self._storage) or event["task"])
+        elif kind == "update":
+            if "title" in event["changes"] and event["task_id"] in self._tasks:
+                task = self._tasks[event["task_id"]]
+                self._remove(event["task_id"])
+                self._add(event["task_id"], task)
+        elif kind == "delete":
+            self._remove(event["task_id"])
+        elif kind == "clear":
+            self.rebuild()
+
+    def similar_words(self, word, max_distance):
+        """
+        Finds the indexed words within an edit distance of a word.
+
+        Args:
+            word (str): The normalized query word
+            max_distance (int): The maximum edit distance
+
+        Returns:
+            dict: Word -> distance
+        """
+        if max_distance == 0:
+            return {word: 0} if word in self._postings else {}
+        # Each edit changes at most three trigrams or two bigrams, so closer words share at least
+        # len(grams) - 3 * max_distance trigrams and len(grams) - 2 * max_distance bigrams
+        for grams, postings, per_edit in ((trigrams(word), self._grams, 3), (bigrams(word), self._bigrams, 2)):
+            required = len(grams) - per_edit * max_distance
+            if required > 0:
+                shared = collections.Counter()
+                for gram in grams:
+                    shared.update(postings.get(gram, ()))
+                candidates = [candidate for candidate, count in shared.items() if count >= required]
+                break
+        else:
+            # A match may share no bigram at all, so every word of a compatible length is a candidate
+            candidates = [candidate for length in range(len(word) - max_distance, len(word) + max_distance + 1)
+                          for candidate in self._lengths.get(length, ())]
+        matches = {}
+        for candidate in candidates:
+            if abs(len(candidate) - len(word)) <= max_distance:
+                self.last_checked += 1
+                distance = edit_distance(word, candidate, max_distance)
+                if distance <= max_distance:
+                    matches[candidate] = distance
+        return matches
+
+    def search(self, query, max_distance=None, limit=None):
+        """
+        Finds the tasks whose titles have a close match for every query word.
+
+        Args:
+            query (str): The search text
+            max_distance (int, optional): Typos tolerated per word (defaults to default_max_distance)
+            limit (int, optional): Maximum number of results
+
+        Returns:
+            list: (task, distance) tuples, closest first (ties by ID); distance is the sum over the query words
+        """
+        self.last_checked = 0
+        words = list(dict.fromkeys(normalize_words(query)))
+        if not words:
+            return []
+        totals = None
+        for word in words:
+            allowed = default_max_distance(word) if max_distance is None else max_distance
+            # Task ID -> best distance of this query word within the task's title
+            best = {}
+            for candidate, distance in self.similar_words(word, allowed).items():
+                for task_id in self._postings[candidate]:
+                    if distance < best.get(task_id, allowed + 1):
+                        best[task_id] = distance
+            if totals is None:
+                totals = best
+            else:
+                totals = {task_id: totals[task_id] + distance for task_id, distance in best.items()
+                          if task_id in totals}
+            if not totals:
+                return []
+        ranked = sorted(totals.items(), key=lambda item: (item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self._tasks[task_id], distance) for task_id, distance in ranked]
+
+    def vocabulary_size(self):
+        """
+        Gets the number of distinct indexed words.
+
+        Returns:
+            int: The number of words
+        """
+        return len(self._postings)
+
+    def close(self):
+        """
+        Stops tracking events.
+        """
+        self.subscription.close()
+
+
+_index = None
+
+
+def get_title_index():
+    """
+    Gets the shared title index, creating it (with one pass over the store) on first use.
+
+    Returns:
+        TitleIndex: The index
+    """
+    global _index
+    if _index is None:
+        _index = TitleIndex()
+    return _index
+
+
+memory.register_index("title_index",
+                      lambda: [_index._task_words, _index._postings, _index._grams, _index._bigrams,
+                               _index._lengths] if _index else None)
+
+
+def fuzzy_search(query, max_distance=None, limit=None):
+    """
+    Searches task titles, tolerating typos.
+
+    Args:
+        query (str): The search text
+        max_distance (int, optional): Typos tolerated per word (defaults to default_max_distance)
+        limit (int, optional): Maximum number of results
+
+    Returns:
+        list: (task, distance) tuples, closest first
+    """
+    return get_title_index().search(query, max_distance, limit)
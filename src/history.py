@@ -0,0 +1,259 @@
+"""
+Change history module for the console todo application.
+Keeps a versioned history of every task for audits: how its title, priority,
+due date or status evolved, and what it looked like at any past time.
+
+Versions are stored as deltas rather than copies: the 'add' snapshot once, then
+only the changed fields of each update or toggle (the same changes dictionaries
+the event bus publishes, shared rather than copied). Recording a change costs
+one clock read and two appends. Pruning folds the deltas older than a cutoff
+into each task's base version, so the history before the cutoff is no longer
+available but the state at the cutoff is.
+
+Entries are kept in time order so queries can bisect by time. If the clock
+goes backwards (a clock adjustment, or a test moving it), changes are stamped
+with the latest time already recorded instead, so the order still holds.
+"""
+
+import bisect
+import collections
+
+import clock
+import tasks
+
+# Entry fields, in order
+AT, SEQ, TASK_ID, KIND, DATA = range(5)
+
+
+class TaskHistory:
+    """
+    Per-task version history recorded from the event bus.
+    """
+
+    def __init__(self, bus=None, retention=None):
+        self.bus = bus if bus is not None else tasks.event_bus
+        self.retention = retention
+        # Task ID -> {"base": state at the prune cutoff (None if absent), "entries": [entry, ...]}
+        self._tasks = {}
+        # Every entry in time order, for range queries and pruning
+        self._log = collections.deque()
+        self.pruned_before = None
+        # Latest time stamped on an entry; later entries are never stamped earlier
+        self.last_recorded_at = None
+        self.subscription = self.bus.subscribe(callback=self._on_event)
+
+    def _record(self, task_id, kind, data, at, seq):
+        """
+        Appends one entry to the task's versions and the global log.
+        """
+        entry = (at, seq, task_id, kind, data)
+        record = self._tasks.get(task_id)
+        if record is None:
+            record = self._tasks[task_id] = {"base": None, "entries": []}
+        record["entries"].append(entry)
+        self._log.append(entry)
+
+    def _on_event(self, event):
+        """
+        Records one mutation event as a version of the affected task(s).
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        kind = event["type"]
+        at = clock.now()
+        if self.last_recorded_at is not None and at < self.last_recorded_at:
+            at = self.last_recorded_at
+        self.last_recorded_at = at
+        if kind == "add":
+            self._record(event["task_id"], kind, event["task"], at, event["seq"])
+        elif kind in ("update", "toggle"):
+            if event["changes"]:
+                self._record(event["task_id"], kind, event["changes"], at, event["seq"])
+        elif kind == "delete":
+            self._record(event["task_id"], kind, None, at, event["seq"])
+        elif kind == "clear":
+            for task in event.get("tasks") or ():
+                self._record(task["id"], "delete", None, at, event["seq"])
+
+        if self.retention is not None and self._log and self._log[0][AT] < at - self.retention:
+            self.prune(at - self.retention)
+
+    def as_of(self, task_id, at):
+        """
+        Reconstructs a task as it was at a given time.
+
+        Args:
+            task_id (int): The task ID
+            at (datetime.datetime): The time
+
+        Returns:
+            dict or None: The task's fields at that time, or None if it didn't exist then
+
+        Raises:
+            ValueError: If the time is before the prune cutoff
+        """
+        if self.pruned_before is not None and at < self.pruned_before:
+            raise ValueError(f"History before {self.pruned_before.isoformat()} has been pruned")
+        record = self._tasks.get(task_id)
+        if record is None:
+            return None
+        entries = record["entries"]
+        state = dict(record["base"]) if record["base"] is not None else None
+        for index in range(bisect.bisect_right(entries, at, key=lambda entry: entry[AT])):
+            state = _apply(state, entries[index])
+        return state
+
+    def versions(self, task_id):
+        """
+        Gets every recorded change of one task.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            list: Change dictionaries (see changes()), oldest first
+        """
+        record = self._tasks.get(task_id)
+        return [_describe(entry) for entry in record["entries"]] if record else []
+
+    def changes(self, start=None, end=None, task_id=None):
+        """
+        Gets the changes recorded in a time range.
+
+        Args:
+            start (datetime.datetime, optional): Earliest time (inclusive)
+            end (datetime.datetime, optional): Latest time (exclusive)
+            task_id (int, optional): Only changes of this task
+
+        Returns:
+            list: {'at', 'seq', 'task_id', 'type'} dictionaries with 'changes' ({field: (old, new)})
+                  for updates and toggles and 'task' for adds, oldest first
+        """
+        if task_id is not None:
+            record = self._tasks.get(task_id)
+            entries = record["entries"] if record else []
+        else:
+            entries = self._log
+        key = lambda entry: entry[AT]
+        first = bisect.bisect_left(entries, start, key=key) if start is not None else 0
+        last = bisect.bisect_left(entries, end, key=key) if end is not None else len(entries)
+        return [_describe(entries[index]) for index in range(first, last)]
+
+    def prune(self, before):
+        """
+        Drops the changes recorded before a time, folding them into each task's base version.
+
+        Args:
+            before (datetime.datetime): The cutoff
+
+        Returns:
+            int: Number of changes dropped
+        """
+        dropped = 0
+        log = self._log
+        while log and log[0][AT] < before:
+            entry = log.popleft()
+            record = self._tasks[entry[TASK_ID]]
+            # Each task's entries are in time order, so the oldest one is this entry
+            record["entries"].pop(0)
+            record["base"] = _apply(record["base"], entry)
+            if record["base"] is None and not record["entries"]:
+                del self._tasks[entry[TASK_ID]]
+            dropped += 1
+        if self.pruned_before is None or before > self.pruned_before:
+            self.pruned_before = before
+        return dropped
+
+    def size(self):
+        """
+        Gets the number of recorded changes.
+
+        Returns:
+            int: The number of changes kept
+        """
+        return len(self._log)
+
+    def close(self):
+        """
+        Stops recording changes.
+        """
+        self.subscription.close()
+
+
+def _apply(state, entry):
+    """
+    Applies one entry to a task state, updating the state in place.
+
+    Args:
+        state (dict or None): The state before the entry (None if the task didn't exist)
+        entry (tuple): The entry
+
+    Returns:
+        dict or None: The state after the entry
+    """
+    kind = entry[KIND]
+    if kind == "add":
+        return dict(entry[DATA])
+    if kind == "delete" or state is None:
+        return None
+    for field, (_old, new) in entry[DATA].items():
+        state[field] = new
+    return state
+
+
+def _describe(entry):
+    """
+    Converts an entry to the dictionary returned by queries.
+    """
+    change = {"at": entry[AT], "seq": entry[SEQ], "task_id": entry[TASK_ID], "type": entry[KIND]}
+    if entry[KIND] == "add":
+        change["task"] = dict(entry[DATA])
+    elif entry[KIND] in ("update", "toggle"):
+        change["changes"] = dict(entry[DATA])
+    return change
+
+
+_history = None
+
+
+def enable(retention=None):
+    """
+    Starts recording task history. Enabling again restarts with an empty history.
+
+    Args:
+        retention (datetime.timedelta, optional): Prune changes older than this automatically
+    """
+    global _history
+    disable()
+    _history = TaskHistory(retention=retention)
+
+
+def disable():
+    """
+    Stops recording task history and drops it.
+    """
+    global _history
+    if _history is not None:
+        _history.close()
+        _history = None
+
+
+def is_enabled():
+    """
+    Checks whether task history is being recorded.
+
+    Returns:
+        bool: True if history is enabled
+    """
+    return _history is not None
+
+
+def get_history():
+    """
+    Gets the task history.
+
+    Returns:
+        TaskHistory or None: The history, or None if it isn't enabled
+    """
+    return _history
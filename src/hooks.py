@@ -0,0 +1,143 @@
+"""
+Hooks module for the console todo application.
+Lets tools (recorder, metrics, slow-operation log) wrap the public task functions.
+
+Wrapping works by rebinding the function names, both in the tasks module and in
+every loaded module that imported them with 'from tasks import *'. Nothing is
+wrapped while no layer is installed, so the hooks cost nothing when disabled.
+"""
+
+import sys
+import threading
+
+import tasks
+
+# Public task operations that layers can wrap
+PUBLIC_FUNCTIONS = (
+    "create_task",
+    "add_task",
+    "add_tasks",
+    "clear_tasks",
+    "get_all_tasks",
+    "get_task_by_id",
+    "update_task",
+    "delete_task",
+    "toggle_task_status",
+    "catch_up_recurrences",
+    "filter_tasks",
+    "search_tasks",
+    "sort_tasks",
+    "filter_overdue_tasks",
+    "filter_upcoming_tasks",
+    "filter_recurring_tasks",
+    "parse_datetime_input",
+    "is_task_overdue",
+    "is_task_due_today",
+    "is_task_upcoming",
+    "calculate_next_occurrence",
+)
+
+# Original, unwrapped functions by name
+_originals = {name: getattr(tasks, name) for name in PUBLIC_FUNCTIONS}
+
+# Installed layers in installation order: (layer name, wrapper factory)
+_layers = []
+
+_local = threading.local()
+
+
+def call_depth():
+    """
+    Gets how many wrapped task functions are currently executing on this thread,
+    including the current one. Layers use it to tell top-level calls (depth 1)
+    from calls the task functions make to each other.
+
+    Returns:
+        int: The current call depth
+    """
+    return getattr(_local, "depth", 0)
+
+
+def _depth_tracking(func):
+    """
+    Wraps a function so call_depth() reflects nested task calls.
+    """
+    def wrapper(*args, **kwargs):
+        _local.depth = getattr(_local, "depth", 0) + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.depth -= 1
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    wrapper.__wrapped__ = func
+    return wrapper
+
+
+def _rebind():
+    """
+    Rebuilds the wrapped functions from the originals and the installed layers,
+    and rebinds them everywhere the previous versions were referenced.
+    """
+    for name in PUBLIC_FUNCTIONS:
+        current = getattr(tasks, name)
+        func = _originals[name]
+        for _layer_name, factory in _layers:
+            func = factory(name, func)
+        if _layers:
+            func = _depth_tracking(func)
+
+        for module in list(sys.modules.values()):
+            if module is not None and getattr(module, name, None) is current:
+                setattr(module, name, func)
+
+
+def install(layer_name, factory):
+    """
+    Installs a wrapping layer around every public task function.
+    Installing a layer with the same name again replaces it.
+
+    Args:
+        layer_name (str): Unique name of the layer
+        factory (callable): factory(function name, function) returning the wrapped function
+    """
+    _layers[:] = [(n, f) for n, f in _layers if n != layer_name]
+    _layers.append((layer_name, factory))
+    _rebind()
+
+
+def uninstall(layer_name):
+    """
+    Removes a wrapping layer; the original functions are restored once no layer remains.
+
+    Args:
+        layer_name (str): Name of the layer to remove
+    """
+    _layers[:] = [(n, f) for n, f in _layers if n != layer_name]
+    _rebind()
+
+
+def is_installed(layer_name):
+    """
+    Checks whether a layer is installed.
+
+    Args:
+        layer_name (str): Name of the layer
+
+    Returns:
+        bool: True if the layer is installed
+    """
+    return any(n == layer_name for n, _f in _layers)
+
+
+def original(name):
+    """
+    Gets the unwrapped version of a public task function.
+
+    Args:
+        name (str): The function name
+
+    Returns:
+        callable: The original function
+    """
+    return _originals[name]
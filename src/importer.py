@@ -0,0 +1,227 @@
+"""
+Import module for the console todo application.
+Loads tasks from JSON Lines or CSV files (the formats written by export.py)
+in chunks: each chunk is parsed and validated in a process pool and then
+committed with one tasks.add_tasks call. Bad rows are reported with their
+line numbers and skipped without aborting the import.
+
+IDs in the file are not kept; imported tasks get new IDs from the store.
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import api
+import tasks
+from export import CSV_FIELDS
+
+# Rows parsed and committed together
+CHUNK_ROWS = 10000
+
+# Smaller files are parsed in-process, since starting workers would cost more than it saves
+PARALLEL_THRESHOLD_BYTES = 5_000_000
+
+# At most this many bad rows are listed in the report (all of them are counted)
+MAX_REPORTED_ERRORS = 1000
+
+
+def _parse_bool(value):
+    """
+    Parses a 'completed' value from a file.
+
+    Args:
+        value (bool or str): The value
+
+    Returns:
+        bool: The parsed value
+    """
+    if isinstance(value, bool):
+        return value
+    lowered = str(value).strip().lower()
+    if lowered in ("true", "yes", "1", "x"):
+        return True
+    if lowered in ("false", "no", "0", ""):
+        return False
+    raise api.OperationError(f"Invalid completed value '{value}'")
+
+
+def validate_row(row):
+    """
+    Validates one row with the same rules as the 'add' operation.
+
+    Args:
+        row (dict): Field values from the file (strings for CSV, JSON types for JSONL)
+
+    Returns:
+        dict: Normalized task fields for tasks.add_tasks
+
+    Raises:
+        api.OperationError: If the row is invalid
+    """
+    # task_fields treats empty values as missing, so CSV cells need no cleanup
+    recurring = row.get("recurring")
+    if recurring and isinstance(recurring, str):
+        try:
+            row["recurring"] = json.loads(recurring)
+        except ValueError:
+            raise api.OperationError(f"Invalid recurrence pattern '{recurring}'")
+    if not isinstance(row.get("title", ""), str):
+        raise api.OperationError("Title must be a string")
+
+    fields = api.task_fields(row)
+    fields["completed"] = _parse_bool(row.get("completed") or False)
+    return fields
+
+
+def parse_chunk(fmt, header, rows):
+    """
+    Parses and validates a chunk of rows. Runs in a worker process for large imports.
+
+    Args:
+        fmt (str): 'jsonl' or 'csv'
+        header (list): CSV column names (ignored for JSONL)
+        rows (list): (line number, raw JSON line or list of CSV values, or the error message of an unreadable CSV row) pairs
+
+    Returns:
+        tuple: (list of task field dicts, list of (line number, error message) pairs)
+    """
+    records = []
+    errors = []
+    decoded = None
+    if fmt == "jsonl":
+        # Decode the whole chunk in one call; fall back to line by line to pinpoint bad JSON
+        try:
+            decoded = json.loads("[" + ",".join(raw for _line_number, raw in rows) + "]")
+        except ValueError:
+            decoded = None
+        if decoded is not None and len(decoded) != len(rows):
+            decoded = None
+
+    for index, (line_number, raw) in enumerate(rows):
+        try:
+            if fmt == "jsonl":
+                if decoded is not None:
+                    row = decoded[index]
+                else:
+                    try:
+                        row = json.loads(raw)
+                    except ValueError as e:
+                        raise api.OperationError(f"Invalid JSON: {e}")
+                if not isinstance(row, dict):
+                    raise api.OperationError("Each line must be a JSON object")
+            else:
+                if isinstance(raw, str):
+                    raise api.OperationError(raw)
+                if len(raw) != len(header):
+                    raise api.OperationError(f"Expected {len(header)} columns, got {len(raw)}")
+                row = dict(zip(header, raw))
+            records.append(validate_row(row))
+        except api.OperationError as e:
+            errors.append((line_number, str(e)))
+    return records, errors
+
+
+def iter_chunks(f, fmt, chunk_rows=CHUNK_ROWS):
+    """
+    Reads a file in chunks of raw rows.
+
+    Args:
+        f (file): The open file
+        fmt (str): 'jsonl' or 'csv'
+        chunk_rows (int): Rows per chunk
+
+    Yields:
+        tuple: (header, list of (line number, raw row) pairs)
+    """
+    chunk = []
+    if fmt == "jsonl":
+        header = None
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                chunk.append((line_number, line))
+                if len(chunk) >= chunk_rows:
+                    yield header, chunk
+                    chunk = []
+    else:
+        reader = csv.reader(f)
+        header = next(reader, None) or list(CSV_FIELDS)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error as e:
+                # Unreadable rows (e.g. a field over the size limit) are passed on as their error message
+                row = f"Invalid CSV: {e}"
+            if row:
+                chunk.append((reader.line_num, row))
+                if len(chunk) >= chunk_rows:
+                    yield header, chunk
+                    chunk = []
+    if chunk:
+        yield header, chunk
+
+
+def import_tasks(path, fmt=None, workers=None, chunk_rows=CHUNK_ROWS):
+    """
+    Imports tasks from a JSON Lines or CSV file.
+
+    Args:
+        path (str): The file to read
+        fmt (str, optional): 'jsonl' or 'csv' (defaults to the file extension, then 'jsonl')
+        workers (int, optional): Worker processes for parsing (defaults to the CPU count for large
+            files; 0 parses in-process)
+        chunk_rows (int): Rows parsed and committed together
+
+    Returns:
+        dict: Report with 'imported', 'failed', 'errors' (up to MAX_REPORTED_ERRORS
+              {'line', 'error'} entries), 'seconds' and 'rows_per_sec'
+    """
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    if fmt not in ("jsonl", "csv"):
+        raise ValueError(f"Unsupported import format '{fmt}'")
+    if workers is None:
+        workers = (os.cpu_count() or 1) if os.path.getsize(path) > PARALLEL_THRESHOLD_BYTES else 0
+
+    imported = 0
+    failed = 0
+    errors = []
+    started = time.perf_counter()
+
+    def commit(result):
+        nonlocal imported, failed
+        records, chunk_errors = result
+        tasks.add_tasks(records)
+        imported += len(records)
+        failed += len(chunk_errors)
+        for line_number, message in chunk_errors:
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_number, "error": message})
+
+    with open(path, encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+        if workers:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Keep a bounded number of chunks in flight and commit them in file order
+                pending = []
+                for header, chunk in iter_chunks(f, fmt, chunk_rows):
+                    pending.append(pool.submit(parse_chunk, fmt, header, chunk))
+                    if len(pending) > workers * 2:
+                        commit(pending.pop(0).result())
+                for future in pending:
+                    commit(future.result())
+        else:
+            for header, chunk in iter_chunks(f, fmt, chunk_rows):
+                commit(parse_chunk(fmt, header, chunk))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round((imported + failed) / elapsed, 1) if elapsed else None,
+    }
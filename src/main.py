@@ -2,8 +2,19 @@
 Main module for the console todo application.
 """
 
+import datetime
+import sys
+import time
+import slowlog
+import history
+import undo
 from tasks import *
-from ui import display_menu, get_user_choice, handle_add_task, handle_view_tasks, handle_update_task, handle_delete_task, handle_toggle_task_status, handle_search_tasks, handle_filter_tasks, handle_sort_tasks, display_invalid_input, handle_view_overdue_tasks, handle_view_upcoming_tasks, handle_view_recurring_tasks
+from recorder import start_recording, stop_recording, record_menu_action
+from ui import display_menu, get_user_choice, handle_add_task, handle_view_tasks, handle_update_task, handle_delete_task, handle_toggle_task_status, handle_search_tasks, handle_filter_tasks, handle_sort_tasks, display_invalid_input, handle_view_overdue_tasks, handle_view_upcoming_tasks, handle_view_recurring_tasks, handle_view_summary, handle_view_metrics, handle_view_memory, handle_undo, handle_redo, handle_task_history, handle_task_lists, handle_view_actionable_tasks, handle_dependencies, handle_what_next
+
+
+# Hours of task history kept by the long-running serve and batch modes unless --history-retention is given
+SERVICE_HISTORY_RETENTION_HOURS = 24
 
 
 def main():
@@ -19,6 +30,7 @@ def main():
 
         # Get user choice
         choice = get_user_choice()
+        started = time.perf_counter()
 
         # Handle user choice
         if choice == '1':
@@ -44,11 +56,96 @@ def main():
         elif choice == '11':
             handle_view_recurring_tasks()
         elif choice == '12':
+            handle_view_summary()
+        elif choice.lower() == 'u':
+            handle_undo()
+        elif choice.lower() == 'r':
+            handle_redo()
+        elif choice.lower() == 'h':
+            handle_task_history()
+        elif choice.lower() == 'n':
+            handle_task_lists()
+        elif choice.lower() == 'a':
+            handle_view_actionable_tasks()
+        elif choice.lower() == 'd':
+            handle_dependencies()
+        elif choice.lower() == 'w':
+            handle_what_next()
+        elif choice.lower() == 'mem':
+            # Hidden option: memory report
+            handle_view_memory()
+        elif choice.lower() == 'm':
+            # Hidden option: operation metrics
+            handle_view_metrics()
+        elif choice == '13':
             print("Thank you for using the Console Todo Application. Goodbye!")
             break
         else:
             display_invalid_input()
 
+        record_menu_action(choice, started, time.perf_counter() - started)
+
+
+def parse_option_value(option, value, convert):
+    """
+    Parses the value of a numeric command line option, exiting with an error message if it is invalid.
+
+    Args:
+        option (str): The option name, for the message
+        value (str): The value given on the command line
+        convert (type): int or float
+
+    Returns:
+        int or float: The value
+    """
+    try:
+        number = convert(value)
+    except ValueError:
+        number = None
+    if number is None or number != number or number < 0:
+        print(f"Invalid value for {option}: {value!r} (expected a non-negative number)", file=sys.stderr)
+        sys.exit(2)
+    return number
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Options before the mode apply to every front end:
+    # main.py [--record PATH] [--slow-log MS] [--undo-depth N] [--history-retention HOURS] [serve ... | batch ...]
+    args = sys.argv[1:]
+    undo_depth = undo.DEFAULT_DEPTH
+    history_hours = None
+    while len(args) > 1 and args[0] in ("--record", "--slow-log", "--undo-depth", "--history-retention"):
+        if args[0] == "--record":
+            start_recording(args[1])
+        elif args[0] == "--undo-depth":
+            # Number of changes kept for undo (0 turns undo off)
+            undo_depth = parse_option_value(args[0], args[1], int)
+        elif args[0] == "--history-retention":
+            # Hours of task history kept (0 turns history off)
+            history_hours = parse_option_value(args[0], args[1], float)
+        else:
+            # Log task calls slower than the given number of milliseconds
+            slowlog.enable(threshold_ms=parse_option_value(args[0], args[1], float))
+        args = args[2:]
+    if undo_depth > 0:
+        undo.enable(undo_depth)
+    if history_hours is None and args and args[0] in ("serve", "batch"):
+        history_hours = SERVICE_HISTORY_RETENTION_HOURS
+    if history_hours is None:
+        history.enable()
+    elif history_hours > 0:
+        history.enable(retention=datetime.timedelta(hours=history_hours))
+
+    status = 0
+    try:
+        if args and args[0] == "serve":
+            from server import run_server_cli
+            run_server_cli(args[1:])
+        elif args and args[0] == "batch":
+            from batch import run_batch_cli
+            status = run_batch_cli(args[1:])
+        else:
+            main()
+    finally:
+        stop_recording()
+    sys.exit(status)
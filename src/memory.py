@@ -0,0 +1,293 @@
+"""
+Memory accounting module for the console todo application.
+Breaks down the bytes held by the task store (records, descriptions, tags,
+recurrence dicts) and by each index built on top of it, using sys.getsizeof
+walks, plus tracemalloc totals while tracing is on.
+
+Objects shared between tasks (e.g. interned priority strings) are counted
+once, under the first category that reaches them. Index sizes exclude the
+task dicts themselves, so they show what each index adds to the store.
+"""
+
+import collections
+import sys
+import tracemalloc
+
+import tasks
+
+# Containers the size walk descends into
+_CONTAINERS = (dict, list, tuple, set, frozenset, collections.deque)
+
+# Task fields accounted in their own category rather than with the record
+_SEPARATE_FIELDS = {"description": "descriptions", "tags": "tags", "recurring": "recurrence"}
+
+# Index name -> getter returning the object(s) the index holds, or None if it isn't built
+_indexes = {}
+
+_last_report = None
+
+
+def deep_sizeof(obj, seen):
+    """
+    Gets the size of an object and everything it contains that hasn't been counted yet.
+
+    Args:
+        obj (Any): The object to measure
+        seen (set): ids of objects already counted (updated in place)
+
+    Returns:
+        int: Size in bytes
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, _CONTAINERS):
+            stack.extend(current)
+    return size
+
+
+def register_index(name, getter):
+    """
+    Registers an index so memory reports account for it.
+
+    Args:
+        name (str): Name shown in the report
+        getter (callable): Returns the object or list of objects held by the index, or None if it isn't
+            built. Integers in the list are counted as raw bytes held outside the Python heap.
+    """
+    _indexes[name] = getter
+
+
+def _stats_index():
+    """
+    Gets the structures of the stats tracker, if it has been created.
+    """
+    stats = sys.modules.get("stats")
+    tracker = getattr(stats, "_tracker", None)
+    if tracker is None:
+        return None
+    # Only the counters and heaps: its int counts would be taken for raw bytes
+    return [value for key, value in vars(tracker).items()
+            if key not in ("bus", "_storage", "subscription") and isinstance(value, _CONTAINERS)]
+
+
+def _parallel_index():
+    """
+    Gets the snapshot held by the parallel scanner, if one has been built.
+    """
+    parallel = sys.modules.get("parallel")
+    scanner = getattr(parallel, "_scanner", None)
+    if scanner is None or not scanner._chunks:
+        return None
+    # The shared memory blocks live outside the Python heap; account for them as raw bytes
+    return ([chunk.tasks for chunk in scanner._chunks] + [scanner._chunk_of]
+            + [chunk.shm.size for chunk in scanner._chunks if chunk.shm is not None])
+
+
+def _undo_index():
+    """
+    Gets the undo and redo stacks, if undo is enabled.
+    """
+    undo = sys.modules.get("undo")
+    history = getattr(undo, "_history", None)
+    if history is None:
+        return None
+    return [history._undo, history._redo]
+
+
+def _history_index():
+    """
+    Gets the recorded task history, if it is enabled.
+    """
+    history = sys.modules.get("history")
+    task_history = getattr(history, "_history", None)
+    if task_history is None:
+        return None
+    return [task_history._tasks, task_history._log]
+
+
+def _event_bus_index():
+    """
+    Gets the events buffered for subscribers of the task event bus.
+    """
+    return [list(subscription._buffer) for subscription in tasks.event_bus._subscribers]
+
+
+register_index("stats", _stats_index)
+register_index("parallel_snapshot", _parallel_index)
+register_index("event_bus_buffers", _event_bus_index)
+register_index("undo_history", _undo_index)
+register_index("task_history", _history_index)
+
+
+def _tracemalloc_summary(top=5):
+    """
+    Summarizes tracemalloc's view of the heap, if tracing is on.
+
+    Args:
+        top (int): Number of source files listed
+
+    Returns:
+        dict or None: Current and peak traced bytes plus the top source files, or None if not tracing
+    """
+    if not tracemalloc.is_tracing():
+        return None
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    by_file = [
+        {"file": stat.traceback[0].filename, "bytes": stat.size, "blocks": stat.count}
+        for stat in snapshot.statistics("filename")[:top]
+    ]
+    return {"current": current, "peak": peak, "top_files": by_file}
+
+
+def start_tracing(frames=1):
+    """
+    Starts tracemalloc so later reports include traced allocations.
+    Only allocations made after this call are traced.
+
+    Args:
+        frames (int): Stack frames stored per allocation
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def is_tracing():
+    """
+    Checks whether allocations are being traced.
+
+    Returns:
+        bool: True if tracemalloc is on
+    """
+    return tracemalloc.is_tracing()
+
+
+def stop_tracing():
+    """
+    Stops tracemalloc.
+    """
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def memory_report():
+    """
+    Measures the memory held by the task store and its indexes.
+    Each call also records the report so the next one can show growth.
+
+    Returns:
+        dict: Report with 'tasks', 'categories' and 'indexes' (bytes), 'total', 'per_task' (bytes per task
+              for each category and index), 'growth' (change since the previous report, or None) and
+              'tracemalloc' (or None when not tracing)
+    """
+    global _last_report
+    # Snapshot before walking: the walk's own bookkeeping would show up in the trace
+    traced = _tracemalloc_summary()
+    storage = tasks.tasks_storage
+    seen = {id(storage)}
+    categories = {"store_list": sys.getsizeof(storage), "records": 0,
+                  "descriptions": 0, "tags": 0, "recurrence": 0}
+
+    # Count the records first so shared field values land in 'records'
+    for task in storage:
+        seen.add(id(task))
+        categories["records"] += sys.getsizeof(task)
+        for field, value in task.items():
+            categories["records"] += deep_sizeof(field, seen)
+            if field not in _SEPARATE_FIELDS:
+                categories["records"] += deep_sizeof(value, seen)
+    for task in storage:
+        for field, category in _SEPARATE_FIELDS.items():
+            if field in task:
+                categories[category] += deep_sizeof(task[field], seen)
+
+    indexes = {}
+    for name, getter in _indexes.items():
+        held = getter()
+        if held is not None:
+            indexes[name] = sum(item if isinstance(item, int) else deep_sizeof(item, seen) for item in
+                                (held if isinstance(held, list) else [held]))
+
+    count = len(storage)
+    sizes = {**categories, **{f"index:{name}": size for name, size in indexes.items()}}
+    report = {
+        "tasks": count,
+        "categories": categories,
+        "indexes": indexes,
+        "total": sum(sizes.values()),
+        "per_task": {name: round(size / count, 1) for name, size in sizes.items()} if count else {},
+        "growth": None,
+        "tracemalloc": traced,
+    }
+    if _last_report is not None:
+        previous = {**_last_report["categories"],
+                    **{f"index:{name}": size for name, size in _last_report["indexes"].items()}}
+        report["growth"] = {
+            "tasks": count - _last_report["tasks"],
+            "total": report["total"] - _last_report["total"],
+            **{name: size - previous.get(name, 0) for name, size in sizes.items()},
+        }
+    _last_report = report
+    return report
+
+
+def format_bytes(size):
+    """
+    Formats a byte count for display.
+
+    Args:
+        size (int): Number of bytes (may be negative for growth)
+
+    Returns:
+        str: e.g. '1.5 MiB'
+    """
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GiB"
+
+
+def report_text(report=None):
+    """
+    Formats a memory report as text.
+
+    Args:
+        report (dict, optional): A report from memory_report() (a new one is taken by default)
+
+    Returns:
+        str: The formatted report
+    """
+    report = report or memory_report()
+    growth = report["growth"] or {}
+    lines = [f"Memory used by {report['tasks']} tasks: {format_bytes(report['total'])}",
+             f"{'Category':<28} | {'Bytes':>12} | {'Per task':>9} | {'Growth':>12}",
+             "-" * 70]
+    rows = list(report["categories"].items()) + [(f"index:{n}", s) for n, s in report["indexes"].items()]
+    for name, size in rows:
+        change = format_bytes(growth[name]) if name in growth else "-"
+        lines.append(f"{name:<28} | {format_bytes(size):>12} | {report['per_task'].get(name, 0):>9} | {change:>12}")
+    if report["growth"] is not None:
+        lines.append(f"Since the last report: {growth['tasks']:+} tasks, {format_bytes(growth['total'])}")
+
+    traced = report["tracemalloc"]
+    if traced:
+        lines.append("")
+        lines.append(f"tracemalloc: {format_bytes(traced['current'])} current, {format_bytes(traced['peak'])} peak")
+        for row in traced["top_files"]:
+            lines.append(f"    {format_bytes(row['bytes']):>10} in {row['blocks']} blocks  {row['file']}")
+    return "\n".join(lines)
@@ -0,0 +1,270 @@
+"""
+Metrics module for the console todo application.
+Collects per-operation call counts, latency histograms, rows scanned versus
+returned for filter/search/sort, and parse_datetime_input outcomes.
+
+Metrics are installed as a hooks layer only while enabled, so they cost
+nothing when disabled. Data can be exported as a text report (hidden menu
+option 'm') or as JSON.
+"""
+
+import bisect
+import json
+import time
+
+import hooks
+import tasks
+
+LAYER_NAME = "metrics"
+
+# Upper bounds of the latency histogram buckets in microseconds (powers of two up to ~16s)
+BUCKET_BOUNDS_US = [2 ** i for i in range(25)]
+
+# Operations that scan the store; rows scanned is the store size (or list size for sort_tasks)
+SCANNING_OPERATIONS = {
+    "filter_tasks", "search_tasks", "sort_tasks",
+    "filter_overdue_tasks", "filter_upcoming_tasks", "filter_recurring_tasks",
+}
+
+RELATIVE_TERMS = ("today", "tomorrow", "yesterday")
+
+
+class OperationMetrics:
+    """
+    Counters and latency histogram for one operation.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.nested_calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_US) + 1)
+        self.rows_scanned = 0
+        self.rows_returned = 0
+
+    def observe(self, seconds):
+        """
+        Adds one call duration.
+
+        Args:
+            seconds (float): The call duration
+        """
+        self.calls += 1
+        self.total_seconds += seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_US, seconds * 1e6)] += 1
+
+    def percentile_us(self, fraction):
+        """
+        Estimates a latency percentile from the histogram (upper bound of the bucket, capped at the maximum).
+
+        Args:
+            fraction (float): The percentile as a fraction (e.g. 0.99)
+
+        Returns:
+            float: The estimated latency in microseconds
+        """
+        if not self.calls:
+            return 0.0
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target and count:
+                if index < len(BUCKET_BOUNDS_US):
+                    return min(float(BUCKET_BOUNDS_US[index]), round(self.max_seconds * 1e6, 3))
+                return round(self.max_seconds * 1e6, 3)
+        return self.max_seconds * 1e6
+
+    def to_dict(self):
+        """
+        Converts the metrics to a JSON-serializable dictionary.
+
+        Returns:
+            dict: The metrics
+        """
+        data = {
+            "calls": self.calls,
+            "nested_calls": self.nested_calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_us": round(self.total_seconds / self.calls * 1e6, 3) if self.calls else 0.0,
+            "p50_us": self.percentile_us(0.50),
+            "p99_us": self.percentile_us(0.99),
+            "max_us": round(self.max_seconds * 1e6, 3),
+            "histogram_us": {f"<={bound}": count for bound, count in zip(BUCKET_BOUNDS_US, self.buckets) if count},
+        }
+        if self.buckets[-1]:
+            data["histogram_us"][f">{BUCKET_BOUNDS_US[-1]}"] = self.buckets[-1]
+        if self.rows_scanned or self.rows_returned:
+            data["rows_scanned"] = self.rows_scanned
+            data["rows_returned"] = self.rows_returned
+        return data
+
+
+_operations = {}
+_parse_outcomes = {"format": 0, "relative": 0, "failed": 0, "iso_fallback": 0}
+_started = None
+
+
+def _classify_parse(date_input, result):
+    """
+    Classifies how parse_datetime_input resolved an input.
+
+    Args:
+        date_input (str): The input string
+        result (datetime.datetime or None): The parse result
+
+    Returns:
+        str: 'failed', 'relative' or 'format'
+    """
+    if result is None:
+        return "failed"
+    lowered = date_input.lower()
+    if lowered in RELATIVE_TERMS or lowered.startswith("in "):
+        return "relative"
+    return "format"
+
+
+def _wrap(name, func):
+    """
+    Layer factory for hooks.install: measures calls to func.
+    """
+    metrics = _operations.setdefault(name, OperationMetrics())
+    scanning = name in SCANNING_OPERATIONS
+    parsing = name == "parse_datetime_input"
+
+    def measured(*args, **kwargs):
+        nested = hooks.call_depth() > 1
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            metrics.errors += 1
+            raise
+        finally:
+            metrics.observe(time.perf_counter() - started)
+            if nested:
+                metrics.nested_calls += 1
+
+        if scanning:
+            if name == "sort_tasks":
+                tasks_list = args[0] if args else kwargs.get("tasks_list")
+                metrics.rows_scanned += len(tasks_list if tasks_list is not None else tasks.tasks_storage)
+            else:
+                metrics.rows_scanned += len(tasks.tasks_storage)
+            metrics.rows_returned += len(result)
+        elif parsing:
+            # Nested calls come from the due date helpers falling back from ISO parsing
+            if nested:
+                _parse_outcomes["iso_fallback"] += 1
+            date_input = args[0] if args else kwargs.get("date_input")
+            if date_input:
+                _parse_outcomes[_classify_parse(date_input, result)] += 1
+        return result
+
+    return measured
+
+
+def enable():
+    """
+    Starts collecting metrics.
+    """
+    global _started
+    if _started is None:
+        _started = time.time()
+    hooks.install(LAYER_NAME, _wrap)
+
+
+def disable():
+    """
+    Stops collecting metrics (collected data is kept until reset()).
+    """
+    hooks.uninstall(LAYER_NAME)
+
+
+def is_enabled():
+    """
+    Checks whether metrics are being collected.
+
+    Returns:
+        bool: True if enabled
+    """
+    return hooks.is_installed(LAYER_NAME)
+
+
+def reset():
+    """
+    Clears all collected metrics.
+    """
+    global _started
+    # Reset in place: installed wrappers hold references to these objects
+    for metrics in _operations.values():
+        metrics.__init__()
+    for outcome in _parse_outcomes:
+        _parse_outcomes[outcome] = 0
+    _started = time.time() if is_enabled() else None
+
+
+def snapshot():
+    """
+    Gets all collected metrics.
+
+    Returns:
+        dict: Metrics per operation plus parse outcomes
+    """
+    return {
+        "enabled": is_enabled(),
+        "since": _started,
+        "operations": {name: m.to_dict() for name, m in sorted(_operations.items()) if m.calls},
+        "parse_datetime_input": dict(_parse_outcomes),
+    }
+
+
+def export_json(path=None):
+    """
+    Exports the collected metrics as JSON.
+
+    Args:
+        path (str, optional): File to write to
+
+    Returns:
+        str: The JSON document
+    """
+    text = json.dumps(snapshot(), indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return text
+
+
+def report_text():
+    """
+    Formats the collected metrics as a text report.
+
+    Returns:
+        str: The report
+    """
+    data = snapshot()
+    lines = [f"Metrics ({'enabled' if data['enabled'] else 'disabled'})"]
+    if not data["operations"]:
+        lines.append("No calls recorded.")
+        return "\n".join(lines)
+
+    lines.append(f"{'Operation':<24} | {'Calls':>8} | {'Mean us':>10} | {'p50 us':>9} | {'p99 us':>9} | "
+                 f"{'Max us':>10} | Scanned/Returned")
+    lines.append("-" * 110)
+    for name, row in data["operations"].items():
+        rows = ""
+        if "rows_scanned" in row:
+            rows = f"{row['rows_scanned']}/{row['rows_returned']}"
+        lines.append(f"{name:<24} | {row['calls']:>8} | {row['mean_us']:>10} | {row['p50_us']:>9} | "
+                     f"{row['p99_us']:>9} | {row['max_us']:>10} | {rows}")
+
+    outcomes = data["parse_datetime_input"]
+    lines.append("")
+    lines.append("parse_datetime_input: " + ", ".join(f"{k}={v}" for k, v in outcomes.items()))
+    return "\n".join(lines)
@@ -0,0 +1,373 @@
+"""
+Namespace module for the console todo application.
+Keeps several independent task lists in one process. Each namespace has its
+own storage, ID space and event bus, and its own indexes and caches (stats
+counters, render cache, dependency graph, undo and change history), so
+operations on one list only cost that list's size.
+
+One namespace is active at a time: switching rebinds tasks.tasks_storage and
+tasks.event_bus (in the tasks module and everywhere they were imported with
+'from tasks import *', like hooks.py does for functions) and swaps the
+per-namespace index objects. Before a switch, the application's own modules
+are checked for globals holding the storage or bus under another name, which
+the rebinding would miss and which would silently keep using the wrong list;
+the switch is refused if there are any. Idle namespaces can be unloaded to a JSON Lines
+file and are loaded back when next used; their indexes are rebuilt on demand,
+while undo and change history start over.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import export
+import memory
+import tasks
+from events import EventBus
+
+DEFAULT_NAMESPACE = "default"
+
+# Per-namespace index objects: (module name, attribute). A new namespace starts without them;
+# lazily built ones (stats, render cache, dependency graph, urgency queue, title index) are
+# rebuilt on first use
+_STATE_ATTRIBUTES = (
+    ("stats", "_tracker"),
+    ("ui", "_render_cache"),
+    ("undo", "_history"),
+    ("history", "_history"),
+    ("memory", "_last_report"),
+    ("dependencies", "_graph"),
+    ("urgency", "_queue"),
+    ("fuzzy", "_index"),
+)
+
+
+class Namespace:
+    """
+    A named task list with its own storage, ID space, event bus and indexes.
+    """
+
+    def __init__(self, name, storage=None, last_task_id=0, bus=None):
+        self.name = name
+        self.storage = storage if storage is not None else []
+        self.last_task_id = last_task_id
+        self.bus = bus if bus is not None else EventBus()
+        self.state = {}
+        self.last_used = time.monotonic()
+        # File holding the tasks while the namespace is unloaded
+        self.unloaded_path = None
+
+    @property
+    def loaded(self):
+        return self.unloaded_path is None
+
+
+# The namespace in use when this module is imported becomes the default one
+_namespaces = {DEFAULT_NAMESPACE: Namespace(DEFAULT_NAMESPACE, tasks.tasks_storage, tasks.last_task_id,
+                                            tasks.event_bus)}
+_active = DEFAULT_NAMESPACE
+
+# Directory for unloaded namespaces (a temporary directory by default)
+_unload_dir = None
+
+
+def _rebind(name, value):
+    """
+    Rebinds a tasks module global everywhere it was imported.
+
+    Args:
+        name (str): 'tasks_storage' or 'event_bus'
+        value (Any): The new object
+    """
+    current = getattr(tasks, name)
+    for module in list(sys.modules.values()):
+        if module is not None and getattr(module, name, None) is current:
+            setattr(module, name, value)
+
+
+def _check_references():
+    """
+    Checks that _rebind will leave no application module holding the active storage or bus.
+
+    Raises:
+        RuntimeError: If a module global refers to one of them under another name
+    """
+    rebound = {"tasks_storage": tasks.tasks_storage, "event_bus": tasks.event_bus}
+    app_dir = os.path.dirname(os.path.abspath(tasks.__file__))
+    for module_name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if not path or os.path.dirname(os.path.abspath(path)) != app_dir:
+            continue
+        for attribute, value in list(vars(module).items()):
+            for name, current in rebound.items():
+                if value is current and attribute != name:
+                    raise RuntimeError(f"{module_name}.{attribute} refers to tasks.{name} under another name "
+                                       f"and would not follow a namespace switch")
+
+
+def _save_state(namespace):
+    """
+    Moves the active index objects into a namespace.
+    """
+    namespace.last_task_id = tasks.last_task_id
+    for module_name, attribute in _STATE_ATTRIBUTES:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            namespace.state[(module_name, attribute)] = getattr(module, attribute, None)
+            setattr(module, attribute, None)
+
+
+def _restore_state(namespace, previous):
+    """
+    Makes a namespace's storage, ID space, event bus and index objects the active ones.
+
+    Args:
+        namespace (Namespace): The namespace to activate
+        previous (Namespace): The namespace that was active, whose recording settings a new namespace inherits
+    """
+    _rebind("tasks_storage", namespace.storage)
+    _rebind("event_bus", namespace.bus)
+    tasks.last_task_id = namespace.last_task_id
+    fresh = not any(value is not None for value in namespace.state.values())
+    for (module_name, attribute), value in namespace.state.items():
+        module = sys.modules.get(module_name)
+        if module is not None:
+            setattr(module, attribute, value)
+    namespace.state = {}
+
+    if fresh:
+        # Undo and change history record from the start, so they are enabled eagerly like in the previous namespace
+        undo_history = previous.state.get(("undo", "_history"))
+        if undo_history is not None:
+            sys.modules["undo"].enable(undo_history.depth, undo_history.max_changes)
+        task_history = previous.state.get(("history", "_history"))
+        if task_history is not None:
+            sys.modules["history"].enable(task_history.retention)
+
+
+def active_namespace():
+    """
+    Gets the name of the active namespace.
+
+    Returns:
+        str: The namespace name
+    """
+    return _active
+
+
+def use_namespace(name, create=True):
+    """
+    Makes a namespace the active one, loading it back if it was unloaded.
+
+    Args:
+        name (str): The namespace name
+        create (bool): Create the namespace if it doesn't exist
+
+    Raises:
+        KeyError: If the namespace doesn't exist and create is False
+        ValueError: If the name is empty
+        RuntimeError: If a module holds the storage or event bus under another name
+    """
+    global _active
+    name = name.strip() if isinstance(name, str) else name
+    if not name:
+        raise ValueError("Namespace names must not be empty")
+    if name == _active:
+        _namespaces[name].last_used = time.monotonic()
+        return
+    _check_references()
+    namespace = _namespaces.get(name)
+    if namespace is None:
+        if not create:
+            raise KeyError(f"Namespace '{name}' does not exist")
+        namespace = _namespaces[name] = Namespace(name)
+    if not namespace.loaded:
+        _load(namespace)
+
+    previous = _namespaces[_active]
+    _save_state(previous)
+    _restore_state(namespace, previous)
+    previous.last_used = namespace.last_used = time.monotonic()
+    _active = name
+
+
+@contextlib.contextmanager
+def using(name, create=True):
+    """
+    Makes a namespace active for the duration of a with block.
+
+    Args:
+        name (str): The namespace name
+        create (bool): Create the namespace if it doesn't exist
+    """
+    previous = _active
+    use_namespace(name, create)
+    try:
+        yield _namespaces[name]
+    finally:
+        use_namespace(previous)
+
+
+def list_names():
+    """
+    Gets the namespace names.
+
+    Returns:
+        list: The names, sorted
+    """
+    return sorted(_namespaces)
+
+
+def list_namespaces():
+    """
+    Describes every namespace.
+
+    Returns:
+        list: {'name', 'tasks', 'loaded', 'active', 'idle_seconds'} dictionaries, sorted by name
+              ('tasks' is None for unloaded namespaces)
+    """
+    now = time.monotonic()
+    return [
+        {
+            "name": name,
+            "tasks": len(namespace.storage) if namespace.loaded else None,
+            "loaded": namespace.loaded,
+            "active": name == _active,
+            "idle_seconds": 0.0 if name == _active else round(now - namespace.last_used, 1),
+        }
+        for name, namespace in sorted(_namespaces.items())
+    ]
+
+
+def delete_namespace(name):
+    """
+    Deletes a namespace and its tasks.
+
+    Args:
+        name (str): The namespace name
+
+    Raises:
+        KeyError: If the namespace doesn't exist
+        ValueError: If it is the active or the default namespace
+    """
+    if name not in _namespaces:
+        raise KeyError(f"Namespace '{name}' does not exist")
+    if name in (_active, DEFAULT_NAMESPACE):
+        raise ValueError(f"Cannot delete the {'active' if name == _active else 'default'} namespace")
+    namespace = _namespaces.pop(name)
+    _close_state(namespace)
+    if namespace.unloaded_path and os.path.exists(namespace.unloaded_path):
+        os.remove(namespace.unloaded_path)
+
+
+def set_unload_dir(path):
+    """
+    Sets the directory unloaded namespaces are written to.
+
+    Args:
+        path (str or None): The directory (None for a temporary directory)
+    """
+    global _unload_dir
+    _unload_dir = path
+
+
+def _unload_path(name):
+    """
+    Gets the file an unloaded namespace is written to.
+    """
+    global _unload_dir
+    if _unload_dir is None:
+        _unload_dir = tempfile.mkdtemp(prefix="todo-namespaces-")
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    # The digest tells apart names that map to the same safe name, and is the same in every process
+    digest = hashlib.sha1(name.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(_unload_dir, f"{safe_name}-{digest}.jsonl")
+
+
+def _close_state(namespace):
+    """
+    Stops and drops a namespace's index objects.
+    """
+    for value in namespace.state.values():
+        if hasattr(value, "close"):
+            value.close()
+    namespace.state = {}
+
+
+def unload_namespace(name):
+    """
+    Writes an inactive namespace's tasks to a file and frees its storage and indexes.
+
+    Args:
+        name (str): The namespace name
+
+    Returns:
+        int: Number of tasks written
+
+    Raises:
+        KeyError: If the namespace doesn't exist
+        ValueError: If it is the active namespace
+    """
+    if name not in _namespaces:
+        raise KeyError(f"Namespace '{name}' does not exist")
+    if name == _active:
+        raise ValueError("Cannot unload the active namespace")
+    namespace = _namespaces[name]
+    if not namespace.loaded:
+        return 0
+
+    path = _unload_path(name)
+    with open(path, "w", encoding="utf-8") as out:
+        out.write(json.dumps({"namespace": name, "last_task_id": namespace.last_task_id}) + "\n")
+        count = export.export_tasks(out, "jsonl", namespace.storage)
+    _close_state(namespace)
+    namespace.storage = []
+    namespace.bus = EventBus()
+    namespace.unloaded_path = path
+    return count
+
+
+def _load(namespace):
+    """
+    Reads an unloaded namespace's tasks back from its file, keeping their IDs.
+    """
+    with open(namespace.unloaded_path, encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        namespace.storage = [json.loads(line) for line in f if line.strip()]
+    namespace.last_task_id = header.get("last_task_id", 0)
+    os.remove(namespace.unloaded_path)
+    namespace.unloaded_path = None
+
+
+def unload_idle(max_idle_seconds):
+    """
+    Unloads every inactive namespace that hasn't been used for a while.
+
+    Args:
+        max_idle_seconds (float): Idle time after which a namespace is unloaded
+
+    Returns:
+        list: Names of the namespaces unloaded
+    """
+    cutoff = time.monotonic() - max_idle_seconds
+    idle = [name for name, namespace in _namespaces.items()
+            if name != _active and namespace.loaded and namespace.last_used <= cutoff]
+    for name in idle:
+        unload_namespace(name)
+    return idle
+
+
+def _inactive_index():
+    """
+    Gets the storage and indexes held by loaded, inactive namespaces.
+    """
+    held = [(namespace.storage, namespace.state) for name, namespace in _namespaces.items()
+            if name != _active and namespace.loaded]
+    return held or None
+
+
+memory.register_index("inactive_namespaces", _inactive_index)
@@ -0,0 +1,396 @@
+"""
+Parallel scan module for the console todo application.
+Runs search and filter predicates across worker processes for very large stores.
+
+The store is encoded into a compact byte snapshot held in
+multiprocessing.shared_memory, one block per chunk of tasks. Workers attach to
+a chunk's block, evaluate the keyword match or filter predicate over it and
+return only the offsets of matching tasks, so only small results cross the
+process boundary. Mutations are followed on the event bus and only the chunks
+they touch are re-encoded before the next scan.
+"""
+
+import bisect
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import clock
+import tasks
+
+# Stores smaller than this are scanned serially; process start-up and result
+# transfer cost more than they save below this size
+PARALLEL_THRESHOLD = 50000
+
+# Tasks per snapshot chunk: a mutation re-encodes only its chunk, and a
+# scan submits one job per chunk, so slow chunks don't leave workers idle
+CHUNK_TASKS = 4096
+
+# Separators for the encoded snapshot (stripped from text fields when encoding)
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+TAG_SEP = "\x1d"
+_SEPARATOR_TABLE = str.maketrans({RECORD_SEP: " ", FIELD_SEP: " ", TAG_SEP: " "})
+
+
+def encode_task(task):
+    """
+    Encodes the searchable and filterable fields of a task as one snapshot record.
+
+    Args:
+        task (dict): The task dictionary
+
+    Returns:
+        str: The encoded record (without the record separator)
+    """
+    return FIELD_SEP.join((
+        "1" if task["completed"] else "0",
+        task["priority"],
+        "1" if task.get("recurring") else "0",
+        task.get("due_date") or "",
+        TAG_SEP.join(tag.translate(_SEPARATOR_TABLE) for tag in task["tags"]),
+        task["title"].lower().translate(_SEPARATOR_TABLE),
+        (task["description"] or "").lower().translate(_SEPARATOR_TABLE),
+    ))
+
+
+def _record_matches(fields, keyword, criteria):
+    """
+    Evaluates a keyword match or filter criteria against one decoded record.
+
+    Args:
+        fields (list): The decoded record fields
+        keyword (str or None): Lower-cased keyword for a search, or None for a filter
+        criteria (dict): Filter criteria as accepted by tasks.filter_tasks
+
+    Returns:
+        bool: True if the record matches
+    """
+    completed, priority, recurring, due_date, tags, title, description = fields
+
+    if keyword is not None:
+        return keyword in title or keyword in description
+
+    status = criteria.get("status")
+    if status:
+        if status.lower() == "completed" and completed != "1":
+            return False
+        if status.lower() == "incomplete" and completed == "1":
+            return False
+    if criteria.get("priority") and priority != criteria["priority"]:
+        return False
+    if criteria.get("tag") and criteria["tag"] not in (tags.split(TAG_SEP) if tags else ()):
+        return False
+    if criteria.get("recurring") is not None and (recurring == "1") != criteria["recurring"]:
+        return False
+    if criteria.get("overdue") is not None or criteria.get("upcoming") is not None:
+        probe = {"due_date": due_date or None}
+        now = criteria.get("now")
+        if criteria.get("overdue") is not None and tasks.is_task_overdue(probe, now) != criteria["overdue"]:
+            return False
+        if criteria.get("upcoming") is not None and tasks.is_task_upcoming(probe, now) != criteria["upcoming"]:
+            return False
+    return True
+
+
+def _scan_chunk(shm_name, length, keyword, criteria):
+    """
+    Worker entry point: scans one chunk of the shared snapshot.
+
+    Args:
+        shm_name (str): Name of the chunk's shared memory block
+        length (int): Number of encoded bytes in the block
+        keyword (str or None): Lower-cased keyword for a search, or None for a filter
+        criteria (dict): Filter criteria
+
+    Returns:
+        list: Offsets of the matching tasks within the chunk
+    """
+    # Workers share the parent's resource tracker, so attaching here doesn't
+    # change who unlinks the block: the parent does, when the chunk is dropped
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = bytes(shm.buf[:length]).decode("utf-8")
+    finally:
+        shm.close()
+
+    return [offset for offset, record in enumerate(data.split(RECORD_SEP))
+            if _record_matches(record.split(FIELD_SEP), keyword, criteria)]
+
+
+class _Chunk:
+    """
+    A run of consecutive tasks and their encoded records in one shared memory block.
+    """
+
+    def __init__(self, chunk_tasks):
+        self.tasks = chunk_tasks
+        self.shm = None
+        self.length = 0
+        self.dirty = True
+
+    def encode(self):
+        """
+        Re-encodes the chunk, reusing its block when the records still fit.
+        """
+        encoded = RECORD_SEP.join(encode_task(task) for task in self.tasks).encode("utf-8")
+        if self.shm is None or self.shm.size < len(encoded):
+            self.release()
+            # Leave room for edits, so most re-encodes write in place
+            self.shm = shared_memory.SharedMemory(create=True, size=max(1, len(encoded) + len(encoded) // 4 + 1024))
+        self.shm.buf[:len(encoded)] = encoded
+        self.length = len(encoded)
+        self.dirty = False
+
+    def release(self):
+        """
+        Frees the chunk's shared memory block.
+        """
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+class ParallelScanner:
+    """
+    Holds the shared-memory snapshot of the store and the worker pool that scans it.
+
+    The snapshot is split into chunks of CHUNK_TASKS consecutive tasks, each in
+    its own shared memory block. The scanner follows the event bus: a mutation
+    only marks the chunk holding the task dirty, and the next scan re-encodes
+    the dirty chunks alone. Appended tasks go to the last chunk.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._chunks = []
+        # Task ID -> chunk holding it
+        self._chunk_of = {}
+        self._storage = None
+        self._subscription = None
+
+    def _rebuild(self):
+        """
+        Splits the store into fresh chunks and follows the current event bus.
+        """
+        self._release_snapshot()
+        storage = tasks.tasks_storage
+        for first in range(0, len(storage), CHUNK_TASKS):
+            self._append_chunk(list(storage[first:first + CHUNK_TASKS]))
+        self._storage = storage
+        self._subscription = tasks.event_bus.subscribe(callback=self._on_event)
+
+    def _append_chunk(self, chunk_tasks):
+        """
+        Adds a chunk after the existing ones.
+        """
+        chunk = _Chunk(chunk_tasks)
+        self._chunks.append(chunk)
+        for task in chunk_tasks:
+            self._chunk_of[task["id"]] = chunk
+        return chunk
+
+    def _insert(self, task):
+        """
+        Puts a new task in the chunk matching its storage position (by ID, like the store).
+        """
+        last = self._chunks[-1] if self._chunks else None
+        if last is None or not last.tasks or task["id"] > last.tasks[-1]["id"]:
+            if last is None or len(last.tasks) >= CHUNK_TASKS:
+                last = self._append_chunk([])
+            last.tasks.append(task)
+            chunk = last
+        else:
+            # Restored tasks (undo) go back between existing ones
+            index = bisect.bisect_right([c.tasks[0]["id"] if c.tasks else 0 for c in self._chunks], task["id"])
+            chunk = self._chunks[max(0, index - 1)]
+            chunk.tasks.insert(bisect.bisect_left(chunk.tasks, task["id"], key=lambda t: t["id"]), task)
+        self._chunk_of[task["id"]] = chunk
+        chunk.dirty = True
+
+    def _on_event(self, event):
+        """
+        Marks the chunks touched by one mutation event dirty.
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        kind = event["type"]
+        if kind == "add":
+            self._insert(tasks.find_task(event["task_id"], self._storage) or event["task"])
+        elif kind in ("update", "toggle"):
+            chunk = self._chunk_of.get(event["task_id"])
+            if chunk is not None and event["changes"]:
+                chunk.dirty = True
+        elif kind == "delete":
+            chunk = self._chunk_of.pop(event["task_id"], None)
+            if chunk is not None:
+                chunk.tasks[:] = [task for task in chunk.tasks if task["id"] != event["task_id"]]
+                chunk.dirty = True
+        elif kind == "clear":
+            self._release_snapshot()
+
+    def _refresh(self):
+        """
+        Re-encodes the dirty chunks, or rebuilds the snapshot if the store was replaced
+        or modified behind the event bus.
+        """
+        storage = tasks.tasks_storage
+        if (storage is not self._storage or self._subscription is None
+                or self._subscription.bus is not tasks.event_bus
+                or sum(len(chunk.tasks) for chunk in self._chunks) != len(storage)):
+            self._rebuild()
+        for chunk in self._chunks:
+            if chunk.dirty:
+                chunk.encode()
+
+    def _release_snapshot(self):
+        """
+        Frees the shared memory blocks of the snapshot and stops following the event bus.
+        """
+        for chunk in self._chunks:
+            chunk.release()
+        self._chunks = []
+        self._chunk_of = {}
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+        self._storage = None
+
+    def scan(self, keyword=None, criteria=None):
+        """
+        Scans the store in parallel.
+
+        Args:
+            keyword (str, optional): Lower-cased keyword to search for
+            criteria (dict, optional): Filter criteria, used when no keyword is given
+
+        Returns:
+            list: Matching tasks in storage order
+        """
+        self._refresh()
+        chunks = [chunk for chunk in self._chunks if chunk.tasks]
+        if not chunks:
+            return []
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        futures = [
+            (chunk, self._pool.submit(_scan_chunk, chunk.shm.name, chunk.length, keyword, criteria or {}))
+            for chunk in chunks
+        ]
+        results = []
+        for chunk, future in futures:
+            results.extend(chunk.tasks[offset] for offset in future.result())
+        return results
+
+    def close(self):
+        """
+        Shuts down the worker pool and frees the snapshot.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        self._release_snapshot()
+
+
+_scanner = None
+
+
+def get_scanner(workers=None):
+    """
+    Gets the shared scanner, creating it on first use.
+
+    Args:
+        workers (int, optional): Number of worker processes (defaults to the CPU count)
+
+    Returns:
+        ParallelScanner: The scanner
+    """
+    global _scanner
+    if _scanner is None or (workers and workers != _scanner.workers):
+        if _scanner is not None:
+            _scanner.close()
+        _scanner = ParallelScanner(workers)
+    return _scanner
+
+
+def shutdown_parallel_scan():
+    """
+    Stops the worker processes and frees the shared snapshot.
+    """
+    global _scanner
+    if _scanner is not None:
+        _scanner.close()
+        _scanner = None
+
+
+def _scan_serially(threshold):
+    """
+    Checks whether a scan should run in this process: for stores smaller than the threshold
+    (PARALLEL_THRESHOLD if None), and in daemonic processes such as shard workers, which
+    can't start a worker pool.
+    """
+    if threshold is None:
+        threshold = PARALLEL_THRESHOLD
+    return len(tasks.tasks_storage) < threshold or multiprocessing.current_process().daemon
+
+
+def parallel_search_tasks(keyword, workers=None, threshold=None):
+    """
+    Searches for tasks containing the keyword in title or description using worker processes.
+    Falls back to tasks.search_tasks for stores smaller than the threshold.
+
+    Args:
+        keyword (str): The keyword to search for
+        workers (int, optional): Number of worker processes
+        threshold (int, optional): Minimum store size for a parallel scan (defaults to PARALLEL_THRESHOLD)
+
+    Returns:
+        list: A list of tasks that match the search criteria, in storage order
+    """
+    if not keyword:
+        return []
+    if _scan_serially(threshold):
+        return tasks.search_tasks(keyword)
+    return get_scanner(workers).scan(keyword=keyword.lower().translate(_SEPARATOR_TABLE))
+
+
+def parallel_filter_tasks(status=None, priority=None, tag=None, overdue=None, upcoming=None, recurring=None,
+                          workers=None, threshold=None, now=None):
+    """
+    Filters tasks using worker processes. Takes the same criteria as tasks.filter_tasks
+    and falls back to it for stores smaller than the threshold.
+
+    Args:
+        status (str, optional): Filter by status ('completed', 'incomplete', or None for all)
+        priority (str, optional): Filter by priority level ('High', 'Medium', 'Low')
+        tag (str, optional): Filter by specific tag
+        overdue (bool, optional): Filter by overdue status
+        upcoming (bool, optional): Filter by upcoming status
+        recurring (bool, optional): Filter by recurring status
+        workers (int, optional): Number of worker processes
+        threshold (int, optional): Minimum store size for a parallel scan (defaults to PARALLEL_THRESHOLD)
+        now (datetime.datetime, optional): The time overdue and upcoming are evaluated at (defaults to the clock)
+
+    Returns:
+        list: A list of tasks that match the filter criteria, in storage order
+    """
+    if now is None:
+        now = clock.now()
+    if _scan_serially(threshold):
+        return tasks.filter_tasks(status, priority, tag, overdue, upcoming, recurring, now)
+    # Workers evaluate due dates at the parent's time, so a frozen clock applies to them too
+    criteria = {
+        "status": status,
+        "priority": tasks.normalize_priority(priority) if priority else None,
+        "tag": tag,
+        "overdue": overdue,
+        "upcoming": upcoming,
+        "recurring": recurring,
+        "now": now,
+    }
+    return get_scanner(workers).scan(criteria=criteria)
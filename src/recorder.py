@@ -0,0 +1,179 @@
+"""
+Workload recorder module for the console todo application.
+Logs every top-level call into the tasks API (and menu actions from main.py)
+with its arguments and timing, as a JSON Lines trace for replay.py.
+
+Recording is opt-in: start it with start_recording(path) or run
+'python main.py --record trace.jsonl'. Calls the task functions make to each
+other (e.g. toggle_task_status creating the next occurrence) are not recorded,
+since replaying the outer call reproduces them.
+"""
+
+import datetime
+import json
+import time
+
+import hooks
+import tasks
+
+TRACE_VERSION = 1
+
+# Number of trace lines buffered before they are written out
+FLUSH_EVERY = 256
+
+_recorder = None
+
+
+def encode_value(value):
+    """
+    Converts an argument into a JSON-serializable form that replay.decode_value can decode.
+
+    Args:
+        value (Any): The argument value
+
+    Returns:
+        Any: The encoded value
+    """
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if value is tasks.tasks_storage:
+        # The UI passes the live store (e.g. to sort_tasks); don't copy it into the trace
+        return {"__all_tasks__": True}
+    if isinstance(value, list) and value and all(isinstance(v, dict) and "id" in v for v in value):
+        return {"__task_ids__": [v["id"] for v in value]}
+    if isinstance(value, dict):
+        return {k: encode_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(v) for v in value]
+    return value
+
+
+class Recorder:
+    """
+    Writes trace lines for recorded calls to a file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+        self.started = time.perf_counter()
+        self.buffer = []
+        self.count = 0
+        self._write({"type": "header", "version": TRACE_VERSION,
+                     "started": datetime.datetime.now().isoformat(), "tasks_at_start": len(tasks.tasks_storage)})
+
+    def _write(self, entry):
+        """
+        Buffers one trace line, flushing when the buffer is full.
+        """
+        self.buffer.append(json.dumps(entry))
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def record(self, entry_type, name, started, duration, args=None, kwargs=None):
+        """
+        Records one call.
+
+        Args:
+            entry_type (str): 'call' for task functions, 'menu' for menu actions
+            name (str): Function name or menu choice
+            started (float): perf_counter() value when the call started
+            duration (float): Call duration in seconds
+            args (tuple, optional): Positional arguments (already encoded)
+            kwargs (dict, optional): Keyword arguments (already encoded)
+        """
+        entry = {"type": entry_type, "op": name, "t": round(started - self.started, 6), "duration": round(duration, 9)}
+        if args:
+            entry["args"] = args
+        if kwargs:
+            entry["kwargs"] = kwargs
+        self.count += 1
+        self._write(entry)
+
+    def wrap(self, name, func):
+        """
+        Layer factory for hooks.install: records top-level calls to func.
+        """
+        recorder = self
+
+        def recorded(*args, **kwargs):
+            if hooks.call_depth() > 1:
+                return func(*args, **kwargs)
+            # Encode before the call: the call may mutate its arguments
+            encoded_args = [encode_value(arg) for arg in args]
+            encoded_kwargs = encode_value(kwargs)
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            recorder.record("call", name, started, time.perf_counter() - started, encoded_args, encoded_kwargs)
+            return result
+
+        return recorded
+
+    def flush(self):
+        """
+        Writes buffered trace lines to the file.
+        """
+        if self.buffer:
+            self.file.write("\n".join(self.buffer) + "\n")
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        """
+        Flushes and closes the trace file.
+        """
+        self.flush()
+        self.file.close()
+
+
+def start_recording(path):
+    """
+    Starts recording task API calls to a trace file.
+
+    Args:
+        path (str): Path of the trace file (overwritten)
+    """
+    global _recorder
+    stop_recording()
+    _recorder = Recorder(path)
+    hooks.install("recorder", _recorder.wrap)
+
+
+def stop_recording():
+    """
+    Stops recording and closes the trace file.
+
+    Returns:
+        int: Number of entries recorded, or 0 if no recording was active
+    """
+    global _recorder
+    if _recorder is None:
+        return 0
+    hooks.uninstall("recorder")
+    _recorder.close()
+    count = _recorder.count
+    _recorder = None
+    return count
+
+
+def is_recording():
+    """
+    Checks whether a recording is active.
+
+    Returns:
+        bool: True if calls are being recorded
+    """
+    return _recorder is not None
+
+
+def record_menu_action(choice, started, duration):
+    """
+    Records a main menu action, if a recording is active.
+
+    Args:
+        choice (str): The menu choice
+        started (float): perf_counter() value when the action started
+        duration (float): Seconds spent handling the action (including waiting for input)
+    """
+    if _recorder is not None:
+        _recorder.record("menu", choice, started, duration)
@@ -0,0 +1,196 @@
+"""
+Replay tool for workload traces written by recorder.py.
+Re-executes the recorded task API calls against the tasks module of any
+build, at full speed or at the original pacing, and reports throughput and
+p50/p99 latency per operation.
+
+Usage:
+    python replay.py trace.jsonl
+    python replay.py trace.jsonl --pace original --json
+    python replay.py trace.jsonl --src /path/to/other/build/src
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+
+def decode_value(value, tasks):
+    """
+    Decodes an argument encoded by recorder.encode_value against the current store.
+
+    Args:
+        value (Any): The encoded value
+        tasks (module): The tasks module being replayed against
+
+    Returns:
+        Any: The decoded argument
+    """
+    if isinstance(value, dict):
+        if "__datetime__" in value:
+            return datetime.datetime.fromisoformat(value["__datetime__"])
+        if value.get("__all_tasks__"):
+            return tasks.get_all_tasks()
+        if "__task_ids__" in value:
+            by_id = {task["id"]: task for task in tasks.get_all_tasks()}
+            return [by_id[i] for i in value["__task_ids__"] if i in by_id]
+        return {k: decode_value(v, tasks) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_value(v, tasks) for v in value]
+    return value
+
+
+def load_trace(path):
+    """
+    Reads a trace file.
+
+    Args:
+        path (str): Path of the trace file
+
+    Returns:
+        tuple: (header dict, list of entries)
+    """
+    header = {}
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("type") == "header":
+                header = entry
+            else:
+                entries.append(entry)
+    return header, entries
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the value at the given fraction of a sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def replay(entries, tasks, pace="full", speed=1.0):
+    """
+    Re-executes recorded calls.
+
+    Args:
+        entries (list): Trace entries
+        tasks (module): The tasks module to replay against
+        pace (str): 'full' to run back to back, 'original' to keep the recorded spacing
+        speed (float): Speed-up factor for 'original' pacing
+
+    Returns:
+        dict: Report with totals and per-operation count, throughput and latency percentiles
+    """
+    latencies = {}
+    recorded = {}
+    skipped = 0
+    errors = 0
+    started = time.perf_counter()
+
+    for entry in entries:
+        if entry.get("type") != "call":
+            # Menu actions include user think time and can't be re-executed
+            skipped += 1
+            continue
+        func = getattr(tasks, entry["op"], None)
+        if func is None:
+            skipped += 1
+            continue
+
+        if pace == "original":
+            delay = entry["t"] / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+        args = decode_value(entry.get("args", []), tasks)
+        kwargs = decode_value(entry.get("kwargs", {}), tasks)
+        call_started = time.perf_counter()
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            errors += 1
+        latencies.setdefault(entry["op"], []).append(time.perf_counter() - call_started)
+        recorded.setdefault(entry["op"], []).append(entry.get("duration", 0.0))
+
+    elapsed = time.perf_counter() - started
+    operations = {}
+    for op, values in sorted(latencies.items()):
+        values.sort()
+        original = sorted(recorded[op])
+        busy = sum(values)
+        operations[op] = {
+            "count": len(values),
+            "ops_per_sec": round(len(values) / busy, 1) if busy else None,
+            "p50_ms": round(percentile(values, 0.50) * 1000, 4),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+            "recorded_p50_ms": round(percentile(original, 0.50) * 1000, 4),
+            "recorded_p99_ms": round(percentile(original, 0.99) * 1000, 4),
+        }
+
+    replayed = sum(len(v) for v in latencies.values())
+    return {
+        "pace": pace,
+        "calls": replayed,
+        "skipped": skipped,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "calls_per_sec": round(replayed / elapsed, 1) if elapsed else None,
+        "operations": operations,
+    }
+
+
+def print_report(report):
+    """
+    Prints a replay report as a table.
+    """
+    print(f"Replayed {report['calls']} calls in {report['seconds']}s "
+          f"({report['calls_per_sec']} calls/s, pace: {report['pace']}, "
+          f"skipped: {report['skipped']}, errors: {report['errors']})")
+    print(f"{'Operation':<24} | {'Count':>7} | {'Ops/s':>10} | {'p50 ms':>9} | {'p99 ms':>9} | {'rec p50':>9} | {'rec p99':>9}")
+    print("-" * 96)
+    for op, row in report["operations"].items():
+        print(f"{op:<24} | {row['count']:>7} | {row['ops_per_sec'] or 0:>10} | {row['p50_ms']:>9} | "
+              f"{row['p99_ms']:>9} | {row['recorded_p50_ms']:>9} | {row['recorded_p99_ms']:>9}")
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list, optional): Command line arguments
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded todo workload trace.")
+    parser.add_argument("trace", help="Trace file written by the recorder")
+    parser.add_argument("--pace", choices=("full", "original"), default="full",
+                        help="Run calls back to back (full) or with the recorded spacing (original)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Speed-up factor for original pacing")
+    parser.add_argument("--src", help="Directory of the build to replay against (default: this build)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.abspath(args.src or os.path.dirname(__file__)))
+    import tasks
+
+    header, entries = load_trace(args.trace)
+    if header.get("tasks_at_start"):
+        print(f"⚠️  The recording started with {header['tasks_at_start']} existing tasks; "
+              f"calls referring to them will not find them.", file=sys.stderr)
+
+    report = replay(entries, tasks, args.pace, args.speed)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""
+Server module for the console todo application.
+Serves the task operations over HTTP/JSON on localhost or a Unix socket using asyncio.
+
+Endpoints:
+    GET  /health            - Liveness check
+    GET  /tasks             - Streams a task listing (query: op, status, priority, tag, keyword, sort_by, ...)
+    GET  /tasks/<id>        - Returns a single task
+    POST /api               - Runs one operation: {"op": "...", "params": {...}}
+    POST /batch             - Runs many operations in one round trip: {"operations": [...]}
+
+Connections are kept alive (HTTP/1.1) unless the client sends "Connection: close".
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+from urllib.parse import urlsplit, parse_qsl
+
+import api
+from api import OperationError, LISTING_OPERATIONS
+
+# Upper bound on request bodies to keep a single client from exhausting memory
+MAX_BODY_SIZE = 64 * 1024 * 1024
+
+# Number of tasks encoded per chunk when streaming a listing
+STREAM_CHUNK_TASKS = 1000
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    """
+    Raised while handling a request to produce an error response with the given status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def read_line(reader):
+    """
+    Reads one line of the request head.
+
+    Args:
+        reader (asyncio.StreamReader): The connection reader
+
+    Returns:
+        bytes: The line, or b"" at end of stream
+
+    Raises:
+        HttpError: If the line is longer than the stream's buffer limit
+    """
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HttpError(400, "Request line or header too long")
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP request from the stream.
+
+    Args:
+        reader (asyncio.StreamReader): The connection reader
+
+    Returns:
+        tuple or None: (method, target, headers, body), or None if the client closed the connection
+    """
+    request_line = await read_line(reader)
+    if not request_line:
+        return None
+
+    try:
+        method, target, _version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    length = headers.get("content-length")
+    if length:
+        try:
+            length = int(length)
+        except ValueError:
+            raise HttpError(400, "Invalid Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise HttpError(413, "Request body too large")
+        body = await reader.readexactly(length)
+
+    return method.upper(), target, headers, body
+
+
+def encode_response(status, payload, keep_alive):
+    """
+    Encodes a complete JSON response.
+
+    Args:
+        status (int): The HTTP status code
+        payload (Any): The JSON-serializable response body
+        keep_alive (bool): Whether the connection stays open
+
+    Returns:
+        bytes: The encoded response
+    """
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def stream_tasks(writer, tasks, keep_alive):
+    """
+    Streams a task listing as a JSON array using chunked transfer encoding.
+    Tasks are encoded a chunk at a time and the writer is drained between chunks,
+    so a large listing never has to be serialized in one piece.
+
+    Args:
+        writer (asyncio.StreamWriter): The connection writer
+        tasks (list): The tasks to stream
+        keep_alive (bool): Whether the connection stays open
+    """
+    head = (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: application/json\r\n"
+        "Transfer-Encoding: chunked\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1"))
+
+    def write_chunk(data):
+        writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+
+    write_chunk(b"[")
+    for start in range(0, len(tasks), STREAM_CHUNK_TASKS):
+        rows = ",".join(json.dumps(task) for task in tasks[start:start + STREAM_CHUNK_TASKS])
+        if start:
+            rows = "," + rows
+        write_chunk(rows.encode("utf-8"))
+        await writer.drain()
+    write_chunk(b"]")
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+def parse_query(query):
+    """
+    Converts query string parameters into operation parameters.
+
+    Args:
+        query (str): The raw query string
+
+    Values are kept as text: api.execute converts the boolean parameters itself, so a
+    keyword or tag that happens to read "true" is still searched for as text.
+
+    Returns:
+        dict: Parameter names mapped to their values
+    """
+    return dict(parse_qsl(query))
+
+
+def decode_json_body(body):
+    """
+    Decodes a JSON request body.
+
+    Args:
+        body (bytes): The raw request body
+
+    Returns:
+        Any: The decoded JSON value
+    """
+    try:
+        return json.loads(body or b"{}")
+    except ValueError:
+        raise HttpError(400, "Request body is not valid JSON")
+
+
+async def handle_request(writer, method, target, body, keep_alive, backend=api):
+    """
+    Routes a request to the matching endpoint and writes the response.
+
+    Args:
+        writer (asyncio.StreamWriter): The connection writer
+        method (str): The HTTP method
+        target (str): The request target (path and query)
+        body (bytes): The request body
+        keep_alive (bool): Whether the connection stays open
+        backend: Object providing execute() and execute_batch() (the api module or a ShardRouter)
+    """
+    url = urlsplit(target)
+    path = url.path.rstrip("/") or "/"
+
+    if path == "/health":
+        writer.write(encode_response(200, {"ok": True}, keep_alive))
+
+    elif path == "/tasks":
+        if method != "GET":
+            raise HttpError(405, "Use GET for /tasks")
+        params = parse_query(url.query)
+        op = params.pop("op", "sort" if "sort_by" in params else "list")
+        if op not in LISTING_OPERATIONS:
+            raise HttpError(400, f"'{op}' is not a listing operation")
+        try:
+            tasks = backend.execute(op, params)
+        except OperationError as e:
+            raise HttpError(400, str(e))
+        # Stream from a snapshot so later mutations can't disturb an in-flight listing
+        await stream_tasks(writer, list(tasks), keep_alive)
+        return
+
+    elif path.startswith("/tasks/"):
+        if method != "GET":
+            raise HttpError(405, "Use GET for /tasks/<id>")
+        try:
+            task = backend.execute("get", {"id": path[len("/tasks/"):]})
+        except OperationError as e:
+            raise HttpError(400, str(e))
+        if task is None:
+            raise HttpError(404, "Task not found")
+        writer.write(encode_response(200, {"ok": True, "result": task}, keep_alive))
+
+    elif path == "/api":
+        if method != "POST":
+            raise HttpError(405, "Use POST for /api")
+        request = decode_json_body(body)
+        if not isinstance(request, dict):
+            raise HttpError(400, "Request body must be an object")
+        try:
+            result = backend.execute(request.get("op"), request.get("params"))
+        except OperationError as e:
+            raise HttpError(400, str(e))
+        writer.write(encode_response(200, {"ok": True, "result": result}, keep_alive))
+
+    elif path == "/batch":
+        if method != "POST":
+            raise HttpError(405, "Use POST for /batch")
+        request = decode_json_body(body)
+        operations = request.get("operations") if isinstance(request, dict) else request
+        if not isinstance(operations, list):
+            raise HttpError(400, "Batch body must be a list of operations")
+        writer.write(encode_response(200, {"ok": True, "results": backend.execute_batch(operations)}, keep_alive))
+
+    else:
+        raise HttpError(404, f"No endpoint for {path}")
+
+    await writer.drain()
+
+
+async def handle_connection(reader, writer, backend=api):
+    """
+    Serves requests on one connection until the client closes it or asks to.
+
+    Args:
+        reader (asyncio.StreamReader): The connection reader
+        writer (asyncio.StreamWriter): The connection writer
+        backend: Object providing execute() and execute_batch()
+    """
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+            except HttpError as e:
+                writer.write(encode_response(e.status, {"ok": False, "error": e.message}, False))
+                await writer.drain()
+                break
+            if request is None:
+                break
+
+            method, target, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+
+            try:
+                await handle_request(writer, method, target, body, keep_alive, backend)
+            except HttpError as e:
+                writer.write(encode_response(e.status, {"ok": False, "error": e.message}, keep_alive))
+                await writer.drain()
+            except Exception as e:
+                writer.write(encode_response(500, {"ok": False, "error": str(e)}, False))
+                await writer.drain()
+                break
+
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(host="127.0.0.1", port=8765, unix_path=None, backend=api):
+    """
+    Starts the server on a TCP port or a Unix socket.
+
+    Args:
+        host (str): The host to bind to (default localhost)
+        port (int): The TCP port to bind to (0 picks a free port)
+        unix_path (str, optional): Path of a Unix socket to listen on instead of TCP
+        backend: Object providing execute() and execute_batch() (default: the in-process store)
+
+    Returns:
+        asyncio.base_events.Server: The running server
+    """
+    handler = functools.partial(handle_connection, backend=backend)
+    if unix_path:
+        return await asyncio.start_unix_server(handler, path=unix_path)
+    return await asyncio.start_server(handler, host, port)
+
+
+async def serve_forever(host="127.0.0.1", port=8765, unix_path=None, backend=api):
+    """
+    Runs the server until it is cancelled.
+
+    Args:
+        host (str): The host to bind to
+        port (int): The TCP port to bind to
+        unix_path (str, optional): Path of a Unix socket to listen on instead of TCP
+        backend: Object providing execute() and execute_batch()
+    """
+    server = await start_server(host, port, unix_path, backend)
+    where = unix_path if unix_path else "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+    print(f"Serving todo API on {where} (Ctrl+C to stop)")
+    async with server:
+        await server.serve_forever()
+
+
+def run_server_cli(argv=None):
+    """
+    Parses the command line for 'main.py serve' and runs the server.
+
+    Args:
+        argv (list, optional): Command line arguments after 'serve'
+    """
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Serve the todo API over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to bind to (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to bind to (default: 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="Partition tasks across this many worker processes (default: serve in-process)")
+    args = parser.parse_args(argv)
+
+    backend = api
+    if args.shards > 0:
+        from sharding import ShardRouter
+        backend = ShardRouter(args.shards)
+
+    try:
+        asyncio.run(serve_forever(args.host, args.port, args.unix, backend))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+    finally:
+        if backend is not api:
+            backend.close()
@@ -0,0 +1,421 @@
+"""
+Sharding module for the console todo application.
+Partitions tasks by ID hash across N local worker processes.
+
+Each shard is a separate process with its own tasks storage, so work is not
+bounded by a single interpreter's GIL. A ShardRouter in the parent assigns
+globally unique IDs, routes single-task operations to the owning shard and
+fans listing queries out to every shard, merging the partial results with a
+k-way merge. Shards are picked with jump consistent hashing, so changing the
+shard count only moves the tasks whose shard actually changes.
+
+Task dependencies and subtasks are not supported across shards: each shard's
+dependency graph only sees its own tasks, so the dependency operations are
+rejected instead of returning per-shard answers. Recurrence catch-up, change
+history, undo and task lists are rejected too, as they rely on state a shard
+only has for its own tasks.
+"""
+
+import heapq
+import itertools
+import multiprocessing
+
+import tasks
+from api import OperationError, LISTING_OPERATIONS, build_task, parse_bool
+
+# Operations that need the dependency graph over all tasks
+DEPENDENCY_OPERATIONS = {"add_dependency", "remove_dependency", "set_parent", "actionable", "subtasks"}
+
+# Operations rejected by the router -> why they can't be answered from the shards
+UNSUPPORTED_OPERATIONS = {
+    **dict.fromkeys(DEPENDENCY_OPERATIONS, "task dependencies can span shards"),
+    "catch_up": "recurrences spawned inside a shard would not get router-assigned IDs",
+    **dict.fromkeys(("history", "as_of", "undo", "redo"), "changes are not recorded across shards"),
+    **dict.fromkeys(("list_namespaces", "use_namespace", "unload_namespace", "delete_namespace"),
+                    "task lists are not partitioned across shards"),
+}
+
+
+def jump_hash(key, num_buckets):
+    """
+    Maps a key to a bucket with jump consistent hashing (Lamping and Veach).
+    Growing from n to n+1 buckets only moves keys into the new bucket.
+
+    Args:
+        key (int): The key to hash (a task ID)
+        num_buckets (int): Number of buckets
+
+    Returns:
+        int: The bucket index in range(num_buckets)
+    """
+    key &= 0xFFFFFFFFFFFFFFFF
+    bucket, candidate = -1, 0
+    while candidate < num_buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        candidate = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+
+def merge_key(sort_by=None):
+    """
+    Gets the key used to order and merge partial results.
+    Ties are broken by ID, which matches the order of a single store.
+
+    Args:
+        sort_by (str, optional): Sort criteria, 'score' for next-action results, or None for ID (creation) order
+
+    Returns:
+        callable: A function mapping a task dictionary to its merge key
+    """
+    if sort_by is None:
+        return lambda task: task["id"]
+    if sort_by == "score":
+        return lambda task: (-task["score"], task["id"])
+    primary = tasks.get_sort_key(sort_by)
+    return lambda task: (primary(task), task["id"])
+
+
+def _shard_worker(conn):
+    """
+    Worker process entry point: serves commands for one shard until told to stop.
+
+    Args:
+        conn (multiprocessing.connection.Connection): Pipe to the router
+    """
+    import api
+
+    # A forked worker starts with a copy of the parent's store; each shard owns its own
+    tasks.tasks_storage.clear()
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        command, payload = message
+        try:
+            if command == "insert":
+                for task in payload:
+                    tasks.add_task(task)
+                result = len(payload)
+            elif command == "query":
+                op, params, sort_by = payload
+                result = sorted(api.execute(op, params), key=merge_key(sort_by))
+            elif command == "extract":
+                index, num_shards = payload
+                moving = [t for t in tasks.tasks_storage if jump_hash(t["id"], num_shards) != index]
+                if moving:
+                    tasks.tasks_storage[:] = [t for t in tasks.tasks_storage
+                                              if jump_hash(t["id"], num_shards) == index]
+                result = moving
+            elif command == "count":
+                result = len(tasks.tasks_storage)
+            else:
+                result = api.execute(command, payload)
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, str(e)))
+    conn.close()
+
+
+class Shard:
+    """
+    Handle for one shard worker process.
+    """
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_shard_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def send(self, command, payload=None):
+        """
+        Sends a command without waiting for the reply.
+        """
+        self.conn.send((command, payload))
+
+    def receive(self):
+        """
+        Waits for the reply to the last command.
+
+        Returns:
+            Any: The command result
+
+        Raises:
+            OperationError: If the command failed in the worker
+        """
+        ok, result = self.conn.recv()
+        if not ok:
+            raise OperationError(result)
+        return result
+
+    def call(self, command, payload=None):
+        """
+        Sends a command and waits for its reply.
+        """
+        self.send(command, payload)
+        return self.receive()
+
+    def stop(self):
+        """
+        Stops the worker process.
+        """
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ShardRouter:
+    """
+    Routes task operations across hash-partitioned shard processes.
+    Offers the same execute()/execute_batch() interface as the api module.
+    """
+
+    def __init__(self, num_shards=4):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+        self.shards = [Shard() for _ in range(num_shards)]
+        self.next_id = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def num_shards(self):
+        return len(self.shards)
+
+    def shard_for(self, task_id):
+        """
+        Gets the shard owning a task ID.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            Shard: The owning shard
+        """
+        return self.shards[jump_hash(task_id, len(self.shards))]
+
+    def _fan_out(self, command, payload=None):
+        """
+        Sends a command to every shard, then collects all replies, so shards work concurrently.
+
+        Returns:
+            list: One result per shard
+        """
+        for shard in self.shards:
+            shard.send(command, payload)
+        return self._receive_all(self.shards)
+
+    def _receive_all(self, shards):
+        """
+        Collects one reply from each shard. Every reply is read even if one reports an error,
+        so no stale reply is left in a pipe for the next command.
+
+        Args:
+            shards (list): The shards a command was sent to
+
+        Returns:
+            list: One result per shard
+
+        Raises:
+            OperationError: The first error reported, once all replies are read
+        """
+        results = []
+        error = None
+        for shard in shards:
+            try:
+                results.append(shard.receive())
+            except OperationError as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def _insert(self, new_tasks):
+        """
+        Inserts tasks into their owning shards with one message per shard.
+
+        Args:
+            new_tasks (list): Task dictionaries with assigned IDs
+        """
+        by_shard = {}
+        for task in new_tasks:
+            by_shard.setdefault(jump_hash(task["id"], len(self.shards)), []).append(task)
+        for index, shard_tasks in by_shard.items():
+            self.shards[index].send("insert", shard_tasks)
+        self._receive_all([self.shards[index] for index in by_shard])
+
+    def add(self, params):
+        """
+        Creates a task with a globally unique ID and stores it in its shard.
+
+        Args:
+            params (dict): 'add' operation parameters
+
+        Returns:
+            dict: The stored task
+        """
+        task = build_task(params)
+        task["id"] = self.next_id
+        self.next_id += 1
+        self._insert([task])
+        return task
+
+    def toggle(self, task_id):
+        """
+        Marks a task as completed, spawning its next recurrence with a router-assigned ID.
+
+        Args:
+            task_id (int): The ID of the task to toggle
+
+        Returns:
+            bool: True if the task was found and toggled
+        """
+        shard = self.shard_for(task_id)
+        task = shard.call("get", {"id": task_id})
+        if task is None:
+            return False
+        if task.get("recurring"):
+            next_occurrence = tasks.calculate_next_occurrence(task)
+            if next_occurrence:
+                new_task = tasks.create_task(task["title"], task["description"], completed=False,
+                                             priority=task["priority"], tags=task["tags"],
+                                             due_date=next_occurrence, recurring=task["recurring"])
+                new_task["id"] = self.next_id
+                self.next_id += 1
+                self._insert([new_task])
+        return shard.call("update", {"id": task_id, "completed": True})
+
+    def query(self, op, params=None):
+        """
+        Runs a listing operation on every shard and k-way merges the sorted partial results.
+
+        Args:
+            op (str): A listing operation name
+            params (dict, optional): The operation parameters
+
+        Returns:
+            list: The merged tasks, in ID order or in sort order for 'sort'
+        """
+        params = params or {}
+        if op == "next":
+            try:
+                k = int(params.get("k", 5))
+            except (TypeError, ValueError):
+                raise OperationError("Parameter 'k' must be an integer")
+            # Each shard returns its own top k; the overall top k is among them
+            merged = heapq.merge(*self._fan_out("query", (op, params, "score")), key=merge_key("score"))
+            return list(itertools.islice(merged, max(k, 0)))
+        sort_by = params.get("sort_by", "priority") if op == "sort" else None
+        partials = self._fan_out("query", (op, params, sort_by))
+        return list(heapq.merge(*partials, key=merge_key(sort_by)))
+
+    def execute(self, op, params=None):
+        """
+        Executes a single named operation across the shards.
+
+        Args:
+            op (str): The operation name (see api.OPERATIONS)
+            params (dict, optional): The operation parameters
+
+        Returns:
+            Any: The operation result
+        """
+        params = params or {}
+        if not isinstance(params, dict):
+            raise OperationError("Operation parameters must be an object")
+        if op == "add":
+            return self.add(params)
+        if op == "next" and parse_bool(params.get("actionable", False), "actionable"):
+            raise OperationError(f"Operation '{op}' is not supported with sharding: "
+                                 f"{UNSUPPORTED_OPERATIONS['actionable']}")
+        if op in UNSUPPORTED_OPERATIONS:
+            raise OperationError(f"Operation '{op}' is not supported with sharding: {UNSUPPORTED_OPERATIONS[op]}")
+        if op in LISTING_OPERATIONS:
+            return self.query(op, params)
+        if op in ("get", "update", "delete", "toggle"):
+            try:
+                task_id = int(params.get("id"))
+            except (TypeError, ValueError):
+                raise OperationError("Parameter 'id' must be an integer")
+            if op == "toggle":
+                return self.toggle(task_id)
+            return self.shard_for(task_id).call(op, params)
+        raise OperationError(f"Unknown operation '{op}'")
+
+    def execute_batch(self, operations):
+        """
+        Executes many operations in order; see api.execute_batch.
+
+        Args:
+            operations (list): List of {"op": str, "params": dict} entries
+
+        Returns:
+            list: One result or error entry per operation
+        """
+        results = []
+        for entry in operations:
+            try:
+                if not isinstance(entry, dict):
+                    raise OperationError("Batch entries must be objects")
+                results.append({"ok": True, "result": self.execute(entry.get("op"), entry.get("params"))})
+            except OperationError as e:
+                results.append({"ok": False, "error": str(e)})
+        return results
+
+    def counts(self):
+        """
+        Gets the number of tasks held by each shard.
+
+        Returns:
+            list: Task count per shard
+        """
+        return self._fan_out("count")
+
+    def resize(self, num_shards):
+        """
+        Changes the number of shards, moving only the tasks whose shard changes.
+
+        Args:
+            num_shards (int): The new number of shards
+
+        Returns:
+            int: Number of tasks moved
+        """
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1")
+
+        moving = []
+        if num_shards < len(self.shards):
+            removed = self.shards[num_shards:]
+            self.shards = self.shards[:num_shards]
+            for shard in removed:
+                shard.send("list")
+            for shard in removed:
+                moving.extend(shard.receive())
+                shard.stop()
+        else:
+            self.shards.extend(Shard() for _ in range(num_shards - len(self.shards)))
+            for index, shard in enumerate(self.shards):
+                shard.send("extract", (index, num_shards))
+            for shard in self.shards:
+                moving.extend(shard.receive())
+
+        self._insert(moving)
+        return len(moving)
+
+    def close(self):
+        """
+        Stops all shard processes.
+        """
+        for shard in self.shards:
+            shard.stop()
+        self.shards = []
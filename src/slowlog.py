@@ -0,0 +1,262 @@
+"""
+Slow-operation log for the console todo application.
+Records every top-level tasks.py call that takes longer than a configurable
+threshold, with the operation name, a summary of its arguments, the store
+size and a short stack sample of the caller.
+
+The log is installed as a hooks layer only while enabled. Every top-level
+call is timed and every slow call is counted. Capturing one (argument
+summary, stack sample, file write) costs far more than timing it, so to keep
+overhead bounded at high call rates only one in every 'sample_every' slow
+calls per operation is captured, and at most 'max_per_second' captures are
+made (the rest are counted as suppressed).
+"""
+
+import collections
+import datetime
+import json
+import os
+import time
+import traceback
+
+import hooks
+import tasks
+
+LAYER_NAME = "slowlog"
+
+# Frames from the tooling layers are left out of stack samples
+_TOOLING_MODULES = {"hooks", "slowlog", "metrics", "recorder"}
+
+# Longest argument summary kept per argument
+MAX_ARG_LENGTH = 60
+
+
+class SlowLog:
+    """
+    Threshold, sampling settings and captured entries of the slow-operation log.
+    """
+
+    def __init__(self, threshold_ms=100.0, thresholds=None, sample_every=1, max_per_second=50,
+                 max_entries=1000, stack_depth=5, path=None):
+        self.threshold_ms = threshold_ms
+        self.thresholds = dict(thresholds or {})
+        self.sample_every = max(1, int(sample_every))
+        self.max_per_second = max_per_second
+        self.stack_depth = stack_depth
+        self.path = path
+        self.entries = collections.deque(maxlen=max_entries)
+        self.suppressed = 0
+        # Operation name -> number of slow calls, captured or not
+        self.slow_calls = collections.Counter()
+        self._window = 0
+        self._window_count = 0
+
+    def threshold_for(self, name):
+        """
+        Gets the threshold for an operation in seconds.
+
+        Args:
+            name (str): The operation name
+
+        Returns:
+            float: The threshold in seconds
+        """
+        return self.thresholds.get(name, self.threshold_ms) / 1000
+
+    def _admit(self):
+        """
+        Applies the per-second capture limit.
+
+        Returns:
+            bool: True if another slow call may be captured in the current second
+        """
+        if self.max_per_second is None:
+            return True
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window = window
+            self._window_count = 0
+        if self._window_count >= self.max_per_second:
+            self.suppressed += 1
+            return False
+        self._window_count += 1
+        return True
+
+    def record(self, name, seconds, args, kwargs):
+        """
+        Counts one slow call and captures it if it is sampled and the capture limit allows it.
+
+        Args:
+            name (str): The operation name
+            seconds (float): The call duration
+            args (tuple): Positional arguments of the call
+            kwargs (dict): Keyword arguments of the call
+        """
+        self.slow_calls[name] += 1
+        if (self.slow_calls[name] - 1) % self.sample_every == 0:
+            self.capture(name, seconds, args, kwargs)
+
+    def capture(self, name, seconds, args, kwargs):
+        """
+        Records one slow call with its arguments and stack sample.
+
+        Args:
+            name (str): The operation name
+            seconds (float): The call duration
+            args (tuple): Positional arguments of the call
+            kwargs (dict): Keyword arguments of the call
+        """
+        if not self._admit():
+            return
+        summary = [summarize_arg(arg) for arg in args]
+        summary.extend(f"{key}={summarize_arg(value)}" for key, value in kwargs.items())
+        entry = {
+            "at": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "op": name,
+            "ms": round(seconds * 1000, 3),
+            "args": ", ".join(summary),
+            "store_size": len(tasks.tasks_storage),
+            "stack": _stack_sample(self.stack_depth),
+        }
+        self.entries.append(entry)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def wrap(self, name, func):
+        """
+        Layer factory for hooks.install: times every top-level call to func.
+        """
+        log = self
+        threshold = self.threshold_for(name)
+
+        def logged(*args, **kwargs):
+            if hooks.call_depth() > 1:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if elapsed >= threshold:
+                    log.record(name, elapsed, args, kwargs)
+
+        return logged
+
+
+_log = None
+
+
+def summarize_arg(value):
+    """
+    Summarizes an argument for the log without copying large values.
+
+    Args:
+        value (Any): The argument
+
+    Returns:
+        str: A short description of the argument
+    """
+    if value is tasks.tasks_storage:
+        return f"<all {len(value)} tasks>"
+    if isinstance(value, list) and value and isinstance(value[0], dict) and "id" in value[0]:
+        return f"<{len(value)} tasks>"
+    if isinstance(value, dict) and "id" in value:
+        return f"<task {value['id']}>"
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    text = repr(value)
+    return text if len(text) <= MAX_ARG_LENGTH else text[:MAX_ARG_LENGTH - 3] + "..."
+
+
+def _stack_sample(depth):
+    """
+    Gets the innermost caller frames, leaving out the tooling layers.
+
+    Args:
+        depth (int): Number of frames to keep
+
+    Returns:
+        list: 'file:line function' strings, outermost first
+    """
+    frames = [frame for frame in traceback.extract_stack(limit=depth + 8)
+              if os.path.splitext(os.path.basename(frame.filename))[0] not in _TOOLING_MODULES]
+    return [f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}" for frame in frames[-depth:]]
+
+
+def enable(threshold_ms=100.0, thresholds=None, sample_every=1, max_per_second=50, max_entries=1000,
+           stack_depth=5, path=None):
+    """
+    Starts logging slow task operations. Enabling again replaces the settings and clears the log.
+
+    Args:
+        threshold_ms (float): Calls at least this slow are logged
+        thresholds (dict, optional): Per-operation thresholds in milliseconds, e.g. {"sort_tasks": 20}
+        sample_every (int): Capture only one in this many slow calls per operation
+        max_per_second (int, optional): Most slow calls captured per second (None for no limit)
+        max_entries (int): Most entries kept in memory
+        stack_depth (int): Caller frames kept per entry
+        path (str, optional): Also append entries to this JSON Lines file
+    """
+    global _log
+    _log = SlowLog(threshold_ms, thresholds, sample_every, max_per_second, max_entries, stack_depth, path)
+    hooks.install(LAYER_NAME, _log.wrap)
+
+
+def disable():
+    """
+    Stops logging slow operations (captured entries are kept until clear()).
+    """
+    hooks.uninstall(LAYER_NAME)
+
+
+def is_enabled():
+    """
+    Checks whether slow operations are being logged.
+
+    Returns:
+        bool: True if enabled
+    """
+    return hooks.is_installed(LAYER_NAME)
+
+
+def entries():
+    """
+    Gets the captured slow calls, oldest first.
+
+    Returns:
+        list: Entry dictionaries with 'at', 'op', 'ms', 'args', 'store_size' and 'stack'
+    """
+    return list(_log.entries) if _log else []
+
+
+def clear():
+    """
+    Clears the captured slow calls.
+    """
+    if _log:
+        _log.entries.clear()
+        _log.suppressed = 0
+        _log.slow_calls.clear()
+
+
+def report_text(limit=20):
+    """
+    Formats the most recent slow calls as text.
+
+    Args:
+        limit (int): Most entries shown
+
+    Returns:
+        str: The report
+    """
+    if _log is None:
+        return "Slow-operation log (disabled)"
+    lines = [f"Slow-operation log ({'enabled' if is_enabled() else 'disabled'}, "
+             f"threshold {_log.threshold_ms} ms, {sum(_log.slow_calls.values())} slow calls, "
+             f"sampling 1/{_log.sample_every}, {len(_log.entries)} captured, {_log.suppressed} suppressed)"]
+    for entry in list(_log.entries)[-limit:]:
+        lines.append(f"{entry['at']} {entry['op']}({entry['args']}) {entry['ms']} ms, {entry['store_size']} tasks")
+        for frame in entry["stack"]:
+            lines.append(f"    {frame}")
+    return "\n".join(lines)
@@ -0,0 +1,355 @@
+"""
+Statistics module for the console todo application.
+Maintains aggregate counters incrementally from the task event bus, so
+dashboard questions ("how many incomplete High-priority tasks", "how many
+overdue", "counts per tag") are answered without scanning the store.
+
+Overdue counts follow the query time without rescans: every task with a due
+date has an entry in a min-heap keyed by the moment it becomes overdue, and
+each stats() call pops only the entries whose moment has passed into a max-heap
+of overdue tasks. A query for an earlier time moves the entries whose moment
+is after it back, so counts are right whichever way the time moves.
+"""
+
+import collections
+import datetime
+import heapq
+
+import clock
+import tasks
+
+PRIORITIES = ("High", "Medium", "Low")
+
+# Overdue tasks are kept in a min-heap keyed by _EPOCH - threshold, so the latest threshold is on top
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def overdue_threshold(due_date):
+    """
+    Gets the moment from which a task with the given due date counts as overdue,
+    using the same rules as tasks.is_task_overdue.
+
+    Args:
+        due_date (str): The task's due date
+
+    Returns:
+        datetime.datetime or None: The first naive local time at which the task is overdue, or None if unparsable
+    """
+    if not due_date:
+        return None
+    try:
+        due = datetime.datetime.fromisoformat(due_date.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = tasks.parse_datetime_input(due_date)
+        return parsed + datetime.timedelta(microseconds=1) if parsed else None
+
+    if due.tzinfo is not None:
+        due = due.astimezone().replace(tzinfo=None)
+    if due.hour == 0 and due.minute == 0 and due.second == 0:
+        # Date-only due dates become overdue at the following midnight
+        return datetime.datetime.combine(due.date() + datetime.timedelta(days=1), datetime.time.min)
+    return due + datetime.timedelta(microseconds=1)
+
+
+class StatsTracker:
+    """
+    Aggregate task counters kept current by subscribing to the event bus.
+    """
+
+    def __init__(self, bus=None, storage=None):
+        self.bus = bus if bus is not None else tasks.event_bus
+        self._storage = storage if storage is not None else tasks.tasks_storage
+        self.rebuild()
+        self.subscription = self.bus.subscribe(callback=self._on_event)
+
+    def rebuild(self):
+        """
+        Recomputes every counter from the store (only needed if the store was modified behind the bus).
+        """
+        self.total = 0
+        self.completed = 0
+        self.recurring = 0
+        self.with_due_date = 0
+        self.by_priority = collections.Counter()
+        self.incomplete_by_priority = collections.Counter()
+        self.by_tag = collections.Counter()
+        self.incomplete_by_tag = collections.Counter()
+        self.overdue = 0
+        self.overdue_incomplete = 0
+        self._records = {}
+        # (threshold, token, task ID) of tasks not yet overdue, and (_EPOCH - threshold, token, task ID) of overdue ones
+        self._heap = []
+        self._overdue_heap = []
+        self._token = 0
+        for task in self._storage:
+            self._insert(task)
+
+    def _insert(self, task):
+        """
+        Adds one task's contribution to the counters.
+
+        Args:
+            task (dict): The task (or a record with the same fields)
+        """
+        completed = bool(task["completed"])
+        tags = tuple(dict.fromkeys(task["tags"] or ()))
+        record = {
+            "completed": completed,
+            "priority": task["priority"],
+            "tags": tags,
+            "recurring": task.get("recurring"),
+            "due_date": task.get("due_date"),
+            "overdue": False,
+            "token": None,
+            "threshold": None,
+        }
+        self._records[task["id"]] = record
+
+        self.total += 1
+        self.by_priority[record["priority"]] += 1
+        self.by_tag.update(tags)
+        if completed:
+            self.completed += 1
+        else:
+            self.incomplete_by_priority[record["priority"]] += 1
+            self.incomplete_by_tag.update(tags)
+        if record["recurring"]:
+            self.recurring += 1
+
+        threshold = overdue_threshold(record["due_date"])
+        if record["due_date"]:
+            self.with_due_date += 1
+        if threshold is not None:
+            self._token += 1
+            record["token"] = self._token
+            record["threshold"] = threshold
+            heapq.heappush(self._heap, (threshold, self._token, task["id"]))
+
+    def _remove(self, task_id):
+        """
+        Removes one task's contribution from the counters.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            dict or None: The removed record
+        """
+        record = self._records.pop(task_id, None)
+        if record is None:
+            return None
+
+        self.total -= 1
+        self.by_priority[record["priority"]] -= 1
+        self.by_tag.subtract(record["tags"])
+        if record["completed"]:
+            self.completed -= 1
+        else:
+            self.incomplete_by_priority[record["priority"]] -= 1
+            self.incomplete_by_tag.subtract(record["tags"])
+        if record["recurring"]:
+            self.recurring -= 1
+        if record["due_date"]:
+            self.with_due_date -= 1
+        if record["overdue"]:
+            self.overdue -= 1
+            if not record["completed"]:
+                self.overdue_incomplete -= 1
+        # Any heap entry for this record is now stale and is skipped when popped
+        self._compact_heap()
+        return record
+
+    def _compact_heap(self):
+        """
+        Drops stale heap entries once they outnumber the live ones.
+        """
+        if len(self._heap) + len(self._overdue_heap) > 2 * len(self._records) + 64:
+            self._heap = [entry for entry in self._heap if self._live(entry, False)]
+            self._overdue_heap = [entry for entry in self._overdue_heap if self._live(entry, True)]
+            heapq.heapify(self._heap)
+            heapq.heapify(self._overdue_heap)
+
+    def _live(self, entry, overdue):
+        """
+        Checks whether a heap entry still stands for its task's current due date and overdue state.
+        """
+        record = self._records.get(entry[2])
+        return record is not None and record["token"] == entry[1] and record["overdue"] == overdue
+
+    def _on_event(self, event):
+        """
+        Applies one mutation event to the counters.
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        if event["type"] == "add":
+            self._insert(event["task"])
+        elif event["type"] == "delete":
+            self._remove(event["task_id"])
+        elif event["type"] in ("update", "toggle"):
+            if not event["changes"]:
+                return
+            record = self._remove(event["task_id"])
+            if record is None:
+                return
+            for field, (_old, new) in event["changes"].items():
+                record[field] = new
+            record["id"] = event["task_id"]
+            self._insert(record)
+        elif event["type"] == "clear":
+            self.rebuild()
+
+    def _advance(self, now):
+        """
+        Brings the overdue counts to a given time: tasks whose overdue moment has passed are counted,
+        and tasks counted for a later time whose moment is still ahead are not.
+
+        Args:
+            now (datetime.datetime): The time to evaluate overdue counts at
+        """
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._live(entry, False):
+                self._set_overdue(self._records[entry[2]], True)
+                heapq.heappush(self._overdue_heap, (_EPOCH - entry[0], entry[1], entry[2]))
+        overdue_heap = self._overdue_heap
+        while overdue_heap and _EPOCH - overdue_heap[0][0] > now:
+            entry = heapq.heappop(overdue_heap)
+            if self._live(entry, True):
+                self._set_overdue(self._records[entry[2]], False)
+                heapq.heappush(heap, (_EPOCH - entry[0], entry[1], entry[2]))
+
+    def _set_overdue(self, record, overdue):
+        """
+        Counts a task as overdue or no longer overdue.
+        """
+        record["overdue"] = overdue
+        delta = 1 if overdue else -1
+        self.overdue += delta
+        if not record["completed"]:
+            self.overdue_incomplete += delta
+
+    def _crossing(self, heap, crossed, overdue):
+        """
+        Counts the live entries at the top of a heap that a move in time would cross, without popping them.
+
+        Args:
+            heap (list): self._heap or self._overdue_heap
+            crossed (callable): Predicate on an entry key; keys it accepts form a subtree at the heap root
+            overdue (bool): The overdue state of the heap's live entries
+
+        Returns:
+            tuple: (tasks crossed, incomplete tasks crossed)
+        """
+        count = incomplete = 0
+        pending = [0] if heap else []
+        while pending:
+            position = pending.pop()
+            entry = heap[position]
+            if not crossed(entry[0]):
+                continue
+            if self._live(entry, overdue):
+                count += 1
+                if not self._records[entry[2]]["completed"]:
+                    incomplete += 1
+            pending.extend(child for child in (2 * position + 1, 2 * position + 2) if child < len(heap))
+        return count, incomplete
+
+    def _counters(self, overdue, overdue_incomplete):
+        """
+        Builds the counters dictionary around the given overdue counts.
+        """
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "incomplete": self.total - self.completed,
+            "recurring": self.recurring,
+            "with_due_date": self.with_due_date,
+            "overdue": overdue,
+            "overdue_incomplete": overdue_incomplete,
+            "by_priority": {p: self.by_priority.get(p, 0) for p in PRIORITIES},
+            "incomplete_by_priority": {p: self.incomplete_by_priority.get(p, 0) for p in PRIORITIES},
+            "by_tag": {tag: count for tag, count in self.by_tag.items() if count > 0},
+            "incomplete_by_tag": {tag: count for tag, count in self.incomplete_by_tag.items() if count > 0},
+        }
+
+    def stats(self, now=None):
+        """
+        Gets the current aggregate counters.
+
+        Args:
+            now (datetime.datetime, optional): The time to evaluate overdue counts at (defaults to the clock)
+
+        Returns:
+            dict: Counters for totals, status, priority, tags, recurrence and overdue tasks
+        """
+        self._advance(now or clock.now())
+        return self._counters(self.overdue, self.overdue_incomplete)
+
+    def estimate(self, now=None):
+        """
+        Gets the counters stats(now) would return without moving the tracker to that time, for
+        callers like query plans that evaluate at a time of their choosing. Only the heap entries
+        between the tracker's time and 'now' are visited.
+
+        Args:
+            now (datetime.datetime, optional): The time to evaluate overdue counts at (defaults to the clock)
+
+        Returns:
+            dict: See stats
+        """
+        now = now or clock.now()
+        gained = self._crossing(self._heap, lambda threshold: threshold <= now, False)
+        lost = self._crossing(self._overdue_heap, lambda key: _EPOCH - key > now, True)
+        return self._counters(self.overdue + gained[0] - lost[0],
+                              self.overdue_incomplete + gained[1] - lost[1])
+
+    def close(self):
+        """
+        Stops tracking events.
+        """
+        self.subscription.close()
+
+
+_tracker = None
+
+
+def get_stats_tracker():
+    """
+    Gets the shared stats tracker, creating it (with one pass over the store) on first use.
+
+    Returns:
+        StatsTracker: The tracker
+    """
+    global _tracker
+    if _tracker is None:
+        _tracker = StatsTracker()
+    return _tracker
+
+
+def stats(now=None):
+    """
+    Gets the current aggregate task counters.
+
+    Args:
+        now (datetime.datetime, optional): The time to evaluate overdue counts at (defaults to the clock)
+
+    Returns:
+        dict: See StatsTracker.stats
+    """
+    return get_stats_tracker().stats(now)
+
+
+def estimate(now=None):
+    """
+    Gets the aggregate task counters at a given time without moving the shared tracker to it.
+
+    Args:
+        now (datetime.datetime, optional): The time to evaluate overdue counts at (defaults to the clock)
+
+    Returns:
+        dict: See StatsTracker.stats
+    """
+    return get_stats_tracker().estimate(now)
@@ -2,13 +2,24 @@
 Module for managing tasks in the console todo application.
 """
 
+import bisect
 import datetime
 import calendar
+import heapq
 from typing import Optional, Dict, Any, Union
 
+import clock
+from events import EventBus
+
 # Global in-memory storage for tasks
 tasks_storage = []
 
+# Every mutation of tasks_storage is published here with a sequence number
+event_bus = EventBus()
+
+# Highest task ID stored so far; IDs are never reused, even after deletes
+last_task_id = 0
+
 
 def create_task(title, description="", completed=False, priority="Medium", tags=None, due_date=None, recurring=None):
     """
@@ -26,8 +37,8 @@ def create_task(title, description="", completed=False, priority="Medium", tags=
     Returns:
         dict: A task dictionary with id, title, description, completed status, priority, tags, due_date, and recurring
     """
-    # Generate a unique ID based on the current length of the storage
-    task_id = len(tasks_storage) + 1
+    # Generate a unique ID that is never reused after deletes
+    task_id = get_next_id()
 
     # Set default tags list if none provided
     if tags is None:
@@ -64,7 +75,22 @@ def get_next_id():
     Returns:
         int: The next available ID
     """
-    return len(tasks_storage) + 1
+    return max(last_task_id, len(tasks_storage)) + 1
+
+
+def _store_task(task, **event_fields):
+    """
+    Appends a task to the storage, records its ID and publishes the 'add' event.
+
+    Args:
+        task (dict): The task dictionary to add
+        **event_fields: Extra fields for the event (e.g. source_id for spawned recurrences)
+    """
+    global last_task_id
+    tasks_storage.append(task)
+    if task["id"] > last_task_id:
+        last_task_id = task["id"]
+    event_bus.publish("add", task["id"], task=dict(task), **event_fields)
 
 
 def add_task(task):
@@ -77,11 +103,63 @@ def add_task(task):
     Returns:
         bool: True if the task was added successfully, False otherwise
     """
-    global tasks_storage
-    tasks_storage.append(task)
+    _store_task(task)
     return True
 
 
+def add_tasks(records, **event_fields):
+    """
+    Adds many tasks at once, assigning consecutive IDs. This is the bulk path for
+    imports: it skips per-task create_task calls and extends the storage once.
+
+    Args:
+        records (list): Task field dictionaries (title, description, completed, priority,
+            tags, due_date, recurring) that are already validated and normalized
+        **event_fields: Extra fields for each 'add' event (e.g. source_id for caught-up recurrences)
+
+    Returns:
+        list: The stored task dictionaries
+    """
+    global last_task_id
+    first_id = get_next_id()
+    new_tasks = [
+        {
+            "id": first_id + offset,
+            "title": record["title"],
+            "description": record.get("description", ""),
+            "completed": bool(record.get("completed", False)),
+            "priority": record.get("priority", "Medium"),
+            "tags": record.get("tags") or [],
+            "due_date": record.get("due_date"),
+            "recurring": record.get("recurring"),
+        }
+        for offset, record in enumerate(records)
+    ]
+    if not new_tasks:
+        return new_tasks
+
+    tasks_storage.extend(new_tasks)
+    last_task_id = new_tasks[-1]["id"]
+    publish = event_bus.publish
+    with event_bus.transaction():
+        for task in new_tasks:
+            publish("add", task["id"], task=dict(task), **event_fields)
+    return new_tasks
+
+
+def clear_tasks():
+    """
+    Removes all tasks from the in-memory storage and restarts IDs from 1.
+    """
+    global tasks_storage, last_task_id
+    # The removed tasks go with the event, so consumers like the undo history can restore them
+    removed = tasks_storage[:]
+    previous_last_id = last_task_id
+    tasks_storage.clear()
+    last_task_id = 0
+    event_bus.publish("clear", tasks=removed, last_task_id=previous_last_id)
+
+
 def get_all_tasks():
     """
     Retrieves all tasks from the in-memory storage.
@@ -110,6 +188,30 @@ def get_task_by_id(task_id):
     return None
 
 
+def find_task(task_id, storage=None):
+    """
+    Finds a stored task by ID with a binary search, falling back to a scan.
+    Tasks are appended with increasing IDs, so the search usually succeeds;
+    indexes use this to reach the stored task behind an event.
+
+    Args:
+        task_id (int): The ID of the task to find
+        storage (list, optional): The task store to search (defaults to tasks_storage)
+
+    Returns:
+        dict or None: The stored task dictionary if found, None otherwise
+    """
+    if storage is None:
+        storage = tasks_storage
+    position = bisect.bisect_left(storage, task_id, key=lambda task: task["id"])
+    if position < len(storage) and storage[position]["id"] == task_id:
+        return storage[position]
+    for task in storage:
+        if task["id"] == task_id:
+            return task
+    return None
+
+
 def update_task(task_id, title=None, description=None, completed=None, priority=None, tags=None, due_date=None, recurring=None):
     """
     Updates a task by its ID.
@@ -130,28 +232,37 @@ def update_task(task_id, title=None, description=None, completed=None, priority=
     global tasks_storage
     for i, task in enumerate(tasks_storage):
         if task["id"] == task_id:
+            new_values = {}
             if title is not None:
-                tasks_storage[i]["title"] = title
+                new_values["title"] = title
             if description is not None:
-                tasks_storage[i]["description"] = description
+                new_values["description"] = description
             if completed is not None:
-                tasks_storage[i]["completed"] = completed
+                new_values["completed"] = completed
             if priority is not None:
                 # Normalize the priority before updating
-                normalized_priority = normalize_priority(priority)
-                tasks_storage[i]["priority"] = normalized_priority
+                new_values["priority"] = normalize_priority(priority)
             if tags is not None:
-                tasks_storage[i]["tags"] = tags
+                new_values["tags"] = tags
             if due_date is not None:
                 # Convert due_date to ISO string format if it's a datetime object
                 if isinstance(due_date, datetime.datetime):
-                    tasks_storage[i]["due_date"] = due_date.isoformat()
-                elif due_date is not None and not isinstance(due_date, str):
-                    tasks_storage[i]["due_date"] = None
+                    new_values["due_date"] = due_date.isoformat()
+                elif not isinstance(due_date, str):
+                    new_values["due_date"] = None
                 else:
-                    tasks_storage[i]["due_date"] = due_date
+                    new_values["due_date"] = due_date
             if recurring is not None:
-                tasks_storage[i]["recurring"] = recurring
+                new_values["recurring"] = recurring
+
+            # Apply only the fields that actually change and publish them as deltas
+            changes = {}
+            for field, value in new_values.items():
+                if task.get(field) != value:
+                    changes[field] = (task.get(field), value)
+                    tasks_storage[i][field] = value
+            if changes:
+                event_bus.publish("update", task_id, changes=changes)
             return True
     return False
 
@@ -224,32 +335,25 @@ def delete_task(task_id):
     for i, task in enumerate(tasks_storage):
         if task["id"] == task_id:
             del tasks_storage[i]
+            event_bus.publish("delete", task_id, task=task, position=i)
             return True
     return False
 
 
-def sort_tasks(tasks_list=None, sort_by="priority"):
+def get_sort_key(sort_by="priority"):
     """
-    Sorts tasks based on specified criteria.
+    Gets the key function used to sort tasks by the specified criteria.
 
     Args:
-        tasks_list (list, optional): List of tasks to sort (defaults to all tasks)
         sort_by (str): Sort criteria ('priority', 'title', 'id', 'due_date')
 
     Returns:
-        list: A list of tasks sorted according to the specified criteria
+        callable: A function mapping a task dictionary to its sort key
     """
-    if tasks_list is None:
-        tasks_list = tasks_storage[:]
-
-    if sort_by.lower() == "priority":
-        # Define priority order: High > Medium > Low
-        priority_order = {"High": 1, "Medium": 2, "Low": 3}
-        return sorted(tasks_list, key=lambda x: priority_order.get(x["priority"], 4))
-    elif sort_by.lower() == "title":
-        return sorted(tasks_list, key=lambda x: x["title"].lower())
+    if sort_by.lower() == "title":
+        return lambda x: x["title"].lower()
     elif sort_by.lower() == "id":
-        return sorted(tasks_list, key=lambda x: x["id"])
+        return lambda x: x["id"]
     elif sort_by.lower() == "due_date":
         # Sort by due date, with tasks without due dates appearing last
         def due_date_key(task):
@@ -263,16 +367,33 @@ def sort_tasks(tasks_list=None, sort_by="priority"):
             else:
                 # Tasks without due dates go to the end
                 return datetime.datetime.max
-        return sorted(tasks_list, key=due_date_key)
+        return due_date_key
     else:
-        # Default to priority sort if invalid sort_by provided
+        # Priority order: High > Medium > Low (also the default for an invalid sort_by)
         priority_order = {"High": 1, "Medium": 2, "Low": 3}
-        return sorted(tasks_list, key=lambda x: priority_order.get(x["priority"], 4))
+        return lambda x: priority_order.get(x["priority"], 4)
 
 
-def filter_tasks(status=None, priority=None, tag=None, overdue=None, upcoming=None, recurring=None):
+def sort_tasks(tasks_list=None, sort_by="priority"):
     """
-    Filters tasks based on specified criteria.
+    Sorts tasks based on specified criteria.
+
+    Args:
+        tasks_list (list, optional): List of tasks to sort (defaults to all tasks)
+        sort_by (str): Sort criteria ('priority', 'title', 'id', 'due_date')
+
+    Returns:
+        list: A list of tasks sorted according to the specified criteria
+    """
+    if tasks_list is None:
+        tasks_list = tasks_storage[:]
+
+    return sorted(tasks_list, key=get_sort_key(sort_by))
+
+
+def get_filter_stages(status=None, priority=None, tag=None, overdue=None, upcoming=None, recurring=None, now=None):
+    """
+    Builds the ordered predicate stages that filter_tasks applies for the given criteria.
 
     Args:
         status (str, optional): Filter by status ('completed', 'incomplete', or None for all)
@@ -281,52 +402,129 @@ def filter_tasks(status=None, priority=None, tag=None, overdue=None, upcoming=No
         overdue (bool, optional): Filter by overdue status (True for overdue, False for not overdue)
         upcoming (bool, optional): Filter by upcoming status (True for upcoming, False for not upcoming)
         recurring (bool, optional): Filter by recurring status (True for recurring, False for non-recurring)
+        now (datetime.datetime, optional): The time the overdue and upcoming stages are evaluated at
+            (defaults to the clock, read once for all tasks)
 
     Returns:
-        list: A list of tasks that match the filter criteria
+        list: Stage dictionaries with 'stage' (description), 'field', 'value' and 'predicate' (task -> bool)
     """
-    filtered_tasks = tasks_storage[:]
+    stages = []
+    if now is None and (overdue is not None or upcoming is not None):
+        now = clock.now()
 
     # Filter by status
     if status:
         if status.lower() == 'completed':
-            filtered_tasks = [task for task in filtered_tasks if task["completed"]]
+            stages.append({"stage": "status = completed", "field": "status", "value": "completed",
+                           "predicate": lambda task: task["completed"]})
         elif status.lower() == 'incomplete':
-            filtered_tasks = [task for task in filtered_tasks if not task["completed"]]
+            stages.append({"stage": "status = incomplete", "field": "status", "value": "incomplete",
+                           "predicate": lambda task: not task["completed"]})
 
     # Filter by priority
     if priority:
         normalized_priority = normalize_priority(priority)
-        filtered_tasks = [task for task in filtered_tasks if task["priority"] == normalized_priority]
+        stages.append({"stage": f"priority = {normalized_priority}", "field": "priority", "value": normalized_priority,
+                       "predicate": lambda task: task["priority"] == normalized_priority})
 
     # Filter by tag
     if tag:
-        filtered_tasks = [task for task in filtered_tasks if tag in task["tags"]]
+        stages.append({"stage": f"tag = {tag}", "field": "tag", "value": tag,
+                       "predicate": lambda task: tag in task["tags"]})
 
     # Filter by overdue status
     if overdue is not None:
-        if overdue:
-            filtered_tasks = [task for task in filtered_tasks if is_task_overdue(task)]
-        else:
-            filtered_tasks = [task for task in filtered_tasks if not is_task_overdue(task)]
+        stages.append({"stage": f"overdue = {bool(overdue)}", "field": "overdue", "value": bool(overdue),
+                       "predicate": lambda task: is_task_overdue(task, now) == bool(overdue)})
 
     # Filter by upcoming status
     if upcoming is not None:
-        if upcoming:
-            filtered_tasks = [task for task in filtered_tasks if is_task_upcoming(task)]
-        else:
-            filtered_tasks = [task for task in filtered_tasks if not is_task_upcoming(task)]
+        stages.append({"stage": f"upcoming = {bool(upcoming)}", "field": "upcoming", "value": bool(upcoming),
+                       "predicate": lambda task: is_task_upcoming(task, now) == bool(upcoming)})
 
     # Filter by recurring status
     if recurring is not None:
-        if recurring:
-            filtered_tasks = [task for task in filtered_tasks if task.get('recurring')]
-        else:
-            filtered_tasks = [task for task in filtered_tasks if not task.get('recurring')]
+        stages.append({"stage": f"recurring = {bool(recurring)}", "field": "recurring", "value": bool(recurring),
+                       "predicate": lambda task: bool(task.get('recurring')) == bool(recurring)})
+
+    return stages
+
+
+def filter_tasks(status=None, priority=None, tag=None, overdue=None, upcoming=None, recurring=None, now=None):
+    """
+    Filters tasks based on specified criteria.
+
+    Args:
+        status (str, optional): Filter by status ('completed', 'incomplete', or None for all)
+        priority (str, optional): Filter by priority level ('High', 'Medium', 'Low')
+        tag (str, optional): Filter by specific tag
+        overdue (bool, optional): Filter by overdue status (True for overdue, False for not overdue)
+        upcoming (bool, optional): Filter by upcoming status (True for upcoming, False for not upcoming)
+        recurring (bool, optional): Filter by recurring status (True for recurring, False for non-recurring)
+        now (datetime.datetime, optional): The time overdue and upcoming are evaluated at (defaults to the clock)
+
+    Returns:
+        list: A list of tasks that match the filter criteria
+    """
+    filtered_tasks = tasks_storage[:]
+
+    # Each stage narrows the candidates left by the previous one
+    for stage in get_filter_stages(status, priority, tag, overdue, upcoming, recurring, now):
+        predicate = stage["predicate"]
+        filtered_tasks = [task for task in filtered_tasks if predicate(task)]
 
     return filtered_tasks
 
 
+def iter_filter_tasks(status=None, priority=None, tag=None, overdue=None, upcoming=None, recurring=None, now=None):
+    """
+    Lazily yields the tasks filter_tasks would return, in the same order,
+    so callers that only need the first results don't scan the whole store.
+
+    Args:
+        status (str, optional): Filter by status ('completed', 'incomplete', or None for all)
+        priority (str, optional): Filter by priority level ('High', 'Medium', 'Low')
+        tag (str, optional): Filter by specific tag
+        overdue (bool, optional): Filter by overdue status (True for overdue, False for not overdue)
+        upcoming (bool, optional): Filter by upcoming status (True for upcoming, False for not upcoming)
+        recurring (bool, optional): Filter by recurring status (True for recurring, False for non-recurring)
+        now (datetime.datetime, optional): The time overdue and upcoming are evaluated at (defaults to the clock)
+
+    Yields:
+        dict: Each matching task
+    """
+    predicates = [stage["predicate"] for stage in
+                  get_filter_stages(status, priority, tag, overdue, upcoming, recurring, now)]
+    for task in tasks_storage:
+        if all(predicate(task) for predicate in predicates):
+            yield task
+
+
+def iter_sorted_tasks(tasks_list=None, sort_by="priority"):
+    """
+    Lazily yields tasks in the order sort_tasks would return them. The input is
+    still consumed in full up front (every task's key is computed and the heap
+    built in O(n)), but each task yielded then costs O(log n), so the first
+    page skips the O(n log n) sort of everything.
+
+    Args:
+        tasks_list (iterable, optional): Tasks to sort, e.g. a lazy filter result (defaults to all tasks)
+        sort_by (str): Sort criteria ('priority', 'title', 'id', 'due_date')
+
+    Yields:
+        dict: Each task in sorted order
+    """
+    if tasks_list is None:
+        tasks_list = tasks_storage[:]
+
+    key = get_sort_key(sort_by)
+    # The position breaks ties, keeping the order stable like sorted()
+    heap = [(key(task), position, task) for position, task in enumerate(tasks_list)]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
 def search_tasks(keyword):
     """
     Searches for tasks containing the keyword in title or description.
@@ -352,6 +550,25 @@ def search_tasks(keyword):
     return matching_tasks
 
 
+def iter_search_tasks(keyword):
+    """
+    Lazily yields the tasks search_tasks would return, in the same order,
+    so callers that only need the first results don't scan the whole store.
+
+    Args:
+        keyword (str): The keyword to search for
+
+    Yields:
+        dict: Each matching task
+    """
+    if not keyword:
+        return
+    keyword_lower = keyword.lower()
+    for task in tasks_storage:
+        if keyword_lower in task["title"].lower() or (task["description"] and keyword_lower in task["description"].lower()):
+            yield task
+
+
 def parse_datetime_input(date_input: str) -> Optional[datetime.datetime]:
     """
     Parse various date/time input formats into a datetime object.
@@ -387,7 +604,7 @@ def parse_datetime_input(date_input: str) -> Optional[datetime.datetime]:
             continue
     
     # Handle relative terms
-    today = datetime.date.today()
+    today = clock.today()
     if date_input.lower() == "today":
         return datetime.datetime.combine(today, datetime.time.min)
     elif date_input.lower() == "tomorrow":
@@ -411,22 +628,24 @@ def parse_datetime_input(date_input: str) -> Optional[datetime.datetime]:
     return None
 
 
-def is_task_overdue(task: Dict[str, Any]) -> bool:
+def is_task_overdue(task: Dict[str, Any], now: Optional[datetime.datetime] = None) -> bool:
     """
     Check if a task is overdue based on its due date.
 
     Args:
         task (dict): The task dictionary
+        now (datetime.datetime, optional): The reference time (defaults to the clock)
 
     Returns:
         bool: True if the task is overdue, False otherwise
     """
     if not task.get('due_date'):
         return False
+    if now is None:
+        now = clock.now()
     
     try:
         due_date = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-        now = datetime.datetime.now()
         
         # Compare only the date part if no time is specified
         if due_date.hour == 0 and due_date.minute == 0 and due_date.second == 0:
@@ -438,7 +657,6 @@ def is_task_overdue(task: Dict[str, Any]) -> bool:
         try:
             parsed_date = parse_datetime_input(task['due_date'])
             if parsed_date:
-                now = datetime.datetime.now()
                 return parsed_date < now
         except:
             pass
@@ -446,22 +664,23 @@ def is_task_overdue(task: Dict[str, Any]) -> bool:
     return False
 
 
-def is_task_due_today(task: Dict[str, Any]) -> bool:
+def is_task_due_today(task: Dict[str, Any], now: Optional[datetime.datetime] = None) -> bool:
     """
     Check if a task is due today based on its due date.
 
     Args:
         task (dict): The task dictionary
+        now (datetime.datetime, optional): The reference time (defaults to the clock)
 
     Returns:
         bool: True if the task is due today, False otherwise
     """
     if not task.get('due_date'):
         return False
+    today = (now or clock.now()).date()
     
     try:
         due_date = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-        today = datetime.date.today()
         
         return due_date.date() == today
     except ValueError:
@@ -469,7 +688,6 @@ def is_task_due_today(task: Dict[str, Any]) -> bool:
         try:
             parsed_date = parse_datetime_input(task['due_date'])
             if parsed_date:
-                today = datetime.date.today()
                 return parsed_date.date() == today
         except:
             pass
@@ -477,22 +695,24 @@ def is_task_due_today(task: Dict[str, Any]) -> bool:
     return False
 
 
-def is_task_upcoming(task: Dict[str, Any]) -> bool:
+def is_task_upcoming(task: Dict[str, Any], now: Optional[datetime.datetime] = None) -> bool:
     """
     Check if a task is upcoming (due in the future) based on its due date.
 
     Args:
         task (dict): The task dictionary
+        now (datetime.datetime, optional): The reference time (defaults to the clock)
 
     Returns:
         bool: True if the task is upcoming, False otherwise
     """
     if not task.get('due_date'):
         return False
+    if now is None:
+        now = clock.now()
     
     try:
         due_date = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-        now = datetime.datetime.now()
         
         # Compare only the date part if no time is specified
         if due_date.hour == 0 and due_date.minute == 0 and due_date.second == 0:
@@ -504,7 +724,6 @@ def is_task_upcoming(task: Dict[str, Any]) -> bool:
         try:
             parsed_date = parse_datetime_input(task['due_date'])
             if parsed_date:
-                now = datetime.datetime.now()
                 return parsed_date > now
         except:
             pass
@@ -512,6 +731,68 @@ def is_task_upcoming(task: Dict[str, Any]) -> bool:
     return False
 
 
+def due_state_of(due_date: datetime.datetime, now: Optional[datetime.datetime] = None) -> Optional[str]:
+    """
+    Classify an already parsed due date with the same rules as is_task_overdue,
+    is_task_due_today and is_task_upcoming (checked in that order), so callers
+    that need all three only parse the due date once.
+
+    Args:
+        due_date (datetime.datetime): The parsed due date
+        now (datetime.datetime, optional): The reference time (defaults to the clock)
+
+    Returns:
+        str or None: 'overdue', 'today', 'upcoming' or None
+    """
+    if now is None:
+        now = clock.now()
+    if due_date.tzinfo is not None:
+        due_date = due_date.astimezone().replace(tzinfo=None)
+
+    # Compare only the date part if no time is specified
+    date_only = due_date.hour == 0 and due_date.minute == 0 and due_date.second == 0
+    if (due_date.date() < now.date()) if date_only else (due_date < now):
+        return 'overdue'
+    if due_date.date() == now.date():
+        return 'today'
+    if (due_date.date() > now.date()) if date_only else (due_date > now):
+        return 'upcoming'
+    return None
+
+
+def due_state_window(due_date: datetime.datetime, now: Optional[datetime.datetime] = None) -> tuple:
+    """
+    Classify a parsed due date like due_state_of and also get the period around
+    'now' during which that state holds, so callers can cache results derived
+    from the due state until a boundary is crossed.
+
+    Args:
+        due_date (datetime.datetime): The parsed due date
+        now (datetime.datetime, optional): The reference time (defaults to the clock)
+
+    Returns:
+        tuple: (state, start, end) where state is 'overdue', 'today' or 'upcoming',
+               and it holds for any naive time with start <= time < end
+    """
+    if now is None:
+        now = clock.now()
+    if due_date.tzinfo is not None:
+        due_date = due_date.astimezone().replace(tzinfo=None)
+
+    # The state changes when the due day starts and when the task becomes overdue
+    day_start = datetime.datetime.combine(due_date.date(), datetime.time.min)
+    if due_date.hour == 0 and due_date.minute == 0 and due_date.second == 0:
+        overdue_from = day_start + datetime.timedelta(days=1)
+    else:
+        overdue_from = due_date + datetime.timedelta(microseconds=1)
+
+    if now < day_start:
+        return 'upcoming', datetime.datetime.min, day_start
+    if now < overdue_from:
+        return 'today', day_start, overdue_from
+    return 'overdue', overdue_from, datetime.datetime.max
+
+
 def calculate_next_occurrence(task: Dict[str, Any]) -> Optional[datetime.datetime]:
     """
     Calculate the next occurrence date based on the recurrence pattern.
@@ -539,7 +820,7 @@ def calculate_next_occurrence(task: Dict[str, Any]) -> Optional[datetime.datetim
     
     if not last_due_date:
         # If no due date, use current date
-        last_due_date = datetime.datetime.now()
+        last_due_date = clock.now()
     
     interval = recurring_info.get('interval', 'daily')
     every = recurring_info.get('every', 1)
@@ -652,24 +933,223 @@ def add_years(source_date: datetime.datetime, years: int) -> datetime.datetime:
     return source_date.replace(year=year)
 
 
-def filter_overdue_tasks():
+# How catch_up_recurrences handles occurrences missed since a series' last due date
+CATCH_UP_POLICIES = ("all", "latest", "skip")
+
+_WEEKDAY_NUMBERS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+
+def _weekday_offsets(anchor: datetime.datetime, target_days: list) -> list:
+    """
+    Get the day offsets (1-7) from the anchor date to each target weekday in the following week.
+
+    Args:
+        anchor (datetime.datetime): The date the offsets count from
+        target_days (list): List of target weekday names (e.g., ['Monday', 'Wednesday'])
+
+    Returns:
+        list: Sorted offsets in days, or an empty list if no day name is valid
+    """
+    target_nums = {_WEEKDAY_NUMBERS[day.lower()] for day in target_days if day.lower() in _WEEKDAY_NUMBERS}
+    return sorted((target_num - anchor.weekday()) % 7 or 7 for target_num in target_nums)
+
+
+def occurrence_at(anchor: datetime.datetime, recurring_info: Dict[str, Any], k: int) -> datetime.datetime:
+    """
+    Calculate the k-th occurrence after an anchor date in closed form, without stepping
+    through the occurrences in between. Month and year steps are measured from the anchor,
+    so a series due on the 31st returns to the 31st after a shorter month.
+
+    Args:
+        anchor (datetime.datetime): The due date of occurrence 0
+        recurring_info (dict): The recurrence pattern
+        k (int): The occurrence number (0 is the anchor itself)
+
+    Returns:
+        datetime.datetime: The due date of the k-th occurrence
+    """
+    if k <= 0:
+        return anchor
+    interval = recurring_info.get('interval', 'daily')
+    every = max(1, int(recurring_info.get('every', 1) or 1))
+
+    if interval == 'weekly':
+        offsets = _weekday_offsets(anchor, recurring_info.get('days') or [])
+        if offsets:
+            # Weekday lists repeat every week, like get_next_weekday
+            weeks, index = divmod(k - 1, len(offsets))
+            return anchor + datetime.timedelta(days=weeks * 7 + offsets[index])
+        return anchor + datetime.timedelta(weeks=every * k)
+    if interval == 'monthly':
+        return add_months(anchor, every * k)
+    if interval == 'yearly':
+        return add_years(anchor, every * k)
+    # Daily, custom (every N days) and unrecognized intervals
+    return anchor + datetime.timedelta(days=every * k)
+
+
+def count_occurrences(anchor: datetime.datetime, recurring_info: Dict[str, Any], now: datetime.datetime) -> int:
+    """
+    Count the occurrences after an anchor date that are due at or before now, in closed form.
+
+    Args:
+        anchor (datetime.datetime): The due date of occurrence 0
+        recurring_info (dict): The recurrence pattern
+        now (datetime.datetime): The cutoff
+
+    Returns:
+        int: Number of occurrences k >= 1 with occurrence_at(anchor, recurring_info, k) <= now
+    """
+    if now <= anchor:
+        return 0
+    interval = recurring_info.get('interval', 'daily')
+    every = max(1, int(recurring_info.get('every', 1) or 1))
+    elapsed = now - anchor
+
+    if interval == 'weekly':
+        offsets = _weekday_offsets(anchor, recurring_info.get('days') or [])
+        if offsets:
+            weeks, remainder = divmod(elapsed, datetime.timedelta(weeks=1))
+            return weeks * len(offsets) + sum(1 for offset in offsets
+                                              if datetime.timedelta(days=offset) <= remainder)
+        return elapsed // datetime.timedelta(weeks=every)
+    if interval in ('monthly', 'yearly'):
+        months = (now.year - anchor.year) * 12 + now.month - anchor.month
+        step = every if interval == 'monthly' else every * 12
+        k = months // step
+        # The k-th occurrence may fall later in now's month (or year) than now itself
+        if k > 0 and occurrence_at(anchor, recurring_info, k) > now:
+            k -= 1
+        return max(0, k)
+    return elapsed // datetime.timedelta(days=every)
+
+
+def missed_recurrences(now: Optional[datetime.datetime] = None) -> list:
+    """
+    Find the recurring series that missed occurrences: incomplete recurring tasks with
+    occurrences due after their own due date and at or before now.
+
+    Args:
+        now (datetime.datetime, optional): The cutoff (defaults to the clock)
+
+    Returns:
+        list: (task, due date, number of missed occurrences) tuples
+    """
+    if now is None:
+        now = clock.now()
+    behind = []
+    for task in tasks_storage:
+        recurring_info = task.get('recurring')
+        if task["completed"] or not isinstance(recurring_info, dict) or not task.get('due_date'):
+            continue
+        try:
+            anchor = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
+        except ValueError:
+            anchor = parse_datetime_input(task['due_date'])
+        if anchor is None:
+            continue
+        # Compare due dates with a UTC offset against now in the same zone
+        cutoff = now.astimezone(anchor.tzinfo) if anchor.tzinfo and not now.tzinfo else now
+        missed = count_occurrences(anchor, recurring_info, cutoff)
+        if missed:
+            behind.append((task, anchor, missed))
+    return behind
+
+
+def catch_up_recurrences(policy: str = "all", now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+    """
+    Catch up recurring series whose occurrences were missed while they weren't toggled.
+
+    Each incomplete recurring task with a past due date is the current occurrence of its
+    series. The occurrences due between it and now are computed in closed form and the
+    series is brought up to date in one step:
+
+    - 'all': every missed occurrence is added as its own task, in one bulk insert. The
+      recurrence pattern moves to the newest one; the older ones become one-off tasks.
+    - 'latest': the missed occurrences collapse into the current task, whose due date
+      moves to the latest missed occurrence.
+    - 'skip': the current task's due date moves to the next occurrence after now.
+
+    Args:
+        policy (str): 'all', 'latest' or 'skip'
+        now (datetime.datetime, optional): The cutoff (defaults to the clock)
+
+    Returns:
+        dict: 'series' caught up, 'missed' occurrences found and 'created' tasks
+
+    Raises:
+        ValueError: If the policy is not recognized
+    """
+    if policy not in CATCH_UP_POLICIES:
+        raise ValueError(f"Unknown catch-up policy '{policy}' (expected one of {', '.join(CATCH_UP_POLICIES)})")
+    if now is None:
+        now = clock.now()
+
+    # Find the series first: the bulk inserts below extend the storage
+    behind = missed_recurrences(now)
+
+    summary = {"series": len(behind), "missed": 0, "created": 0}
+    # One change for event consumers, e.g. undone in one step
+    with event_bus.transaction():
+        for task, anchor, missed in behind:
+            recurring_info = task['recurring']
+            summary["missed"] += missed
+            if policy == "all":
+                records = [
+                    {
+                        "title": task["title"],
+                        "description": task["description"],
+                        "priority": task["priority"],
+                        "tags": list(task["tags"]),
+                        "due_date": occurrence_at(anchor, recurring_info, k).isoformat(),
+                        "recurring": dict(recurring_info) if k == missed else None,
+                    }
+                    for k in range(1, missed + 1)
+                ]
+                task["recurring"] = None
+                event_bus.publish("update", task["id"], changes={"recurring": (recurring_info, None)})
+                add_tasks(records, source_id=task["id"])
+                summary["created"] += missed
+            else:
+                k = missed if policy == "latest" else missed + 1
+                due_date = occurrence_at(anchor, recurring_info, k).isoformat()
+                changes = {"due_date": (task["due_date"], due_date)}
+                task["due_date"] = due_date
+                event_bus.publish("update", task["id"], changes=changes)
+    return summary
+
+
+def filter_overdue_tasks(now=None):
     """
     Filters tasks that are overdue.
 
+    Args:
+        now (datetime.datetime, optional): The reference time (defaults to the clock, read once for all tasks)
+
     Returns:
         list: A list of tasks that are overdue
     """
-    return [task for task in tasks_storage if is_task_overdue(task)]
+    if now is None:
+        now = clock.now()
+    return [task for task in tasks_storage if is_task_overdue(task, now)]
 
 
-def filter_upcoming_tasks():
+def filter_upcoming_tasks(now=None):
     """
     Filters tasks that are upcoming.
 
+    Args:
+        now (datetime.datetime, optional): The reference time (defaults to the clock, read once for all tasks)
+
     Returns:
         list: A list of tasks that are upcoming
     """
-    return [task for task in tasks_storage if is_task_upcoming(task)]
+    if now is None:
+        now = clock.now()
+    return [task for task in tasks_storage if is_task_upcoming(task, now)]
 
 
 def filter_recurring_tasks():
@@ -695,24 +1175,30 @@ def toggle_task_status(task_id):
     global tasks_storage
     for i, task in enumerate(tasks_storage):
         if task["id"] == task_id:
-            # Check if this is a recurring task
-            if task.get("recurring"):
-                # Create the next occurrence before toggling the status
-                next_occurrence = calculate_next_occurrence(task)
-                if next_occurrence:
-                    # Create a new task with the next occurrence
-                    new_task = create_task(
-                        title=task["title"],
-                        description=task["description"],
-                        completed=False,  # New occurrence starts as incomplete
-                        priority=task["priority"],
-                        tags=task["tags"],
-                        due_date=next_occurrence,
-                        recurring=task["recurring"]
-                    )
-                    add_task(new_task)
-            
-            # Mark the current task as completed
-            tasks_storage[i]["completed"] = True
+            spawned_id = None
+            # The spawned occurrence and the toggle are one change for event consumers
+            with event_bus.transaction():
+                # Check if this is a recurring task
+                if task.get("recurring"):
+                    # Create the next occurrence before toggling the status
+                    next_occurrence = calculate_next_occurrence(task)
+                    if next_occurrence:
+                        # Create a new task with the next occurrence
+                        new_task = create_task(
+                            title=task["title"],
+                            description=task["description"],
+                            completed=False,  # New occurrence starts as incomplete
+                            priority=task["priority"],
+                            tags=task["tags"],
+                            due_date=next_occurrence,
+                            recurring=task["recurring"]
+                        )
+                        _store_task(new_task, source_id=task_id)
+                        spawned_id = new_task["id"]
+
+                # Mark the current task as completed
+                changes = {} if task["completed"] else {"completed": (task["completed"], True)}
+                tasks_storage[i]["completed"] = True
+                event_bus.publish("toggle", task_id, changes=changes, spawned_id=spawned_id)
             return True
-    return False
\ No newline at end of file
+    return False
@@ -4,7 +4,19 @@ Handles user interface elements and input validation.
 """
 
 import datetime
+import sys
 from tasks import *
+from stats import stats
+import clock
+import dependencies
+import fuzzy
+import metrics
+import slowlog
+import memory
+import history
+import namespaces
+import undo
+import urgency
 
 
 def display_menu():
@@ -13,6 +25,8 @@ def display_menu():
     """
     print("\n" + "="*40)
     print("Console Todo Application")
+    if namespaces.active_namespace() != namespaces.DEFAULT_NAMESPACE:
+        print(f"Task list: {namespaces.active_namespace()}")
     print("="*40)
     print("1. Add a new task")
     print("2. View all tasks")
@@ -25,7 +39,10 @@ def display_menu():
     print("9. View overdue tasks")
     print("10. View upcoming tasks")
     print("11. View recurring tasks")
-    print("12. Exit")
+    print("12. View summary")
+    print("13. Exit")
+    print("u. Undo last change   r. Redo   h. Task history   n. Task lists")
+    print("a. Actionable tasks   d. Dependencies and subtasks   w. What to do next")
     print("-"*40)
 
 
@@ -36,7 +53,7 @@ def get_user_choice():
     Returns:
         str: The user's choice
     """
-    choice = input("Enter your choice (1-12): ").strip()
+    choice = input("Enter your choice (1-13, u, r, h, n, a, d, w): ").strip()
     return choice
 
 
@@ -44,7 +61,7 @@ def display_invalid_input():
     """
     Displays a message for invalid input.
     """
-    print("\n❌ Invalid input. Please enter a number between 1 and 6.")
+    print("\n❌ Invalid input. Please enter a number between 1 and 13 or one of u, r, h, n, a, d, w.")
 
 
 def get_priority_indicator(priority):
@@ -73,6 +90,314 @@ def get_priority_indicator(priority):
     return priority_map.get(normalized_priority, "[M]")  # Default to [M] if not found
 
 
+# Header and separator shared by the task listings
+LISTING_HEADER = f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence\n" + "-" * 120 + "\n"
+
+# Listings are written out in chunks of this many rows
+RENDER_CHUNK_ROWS = 1000
+
+DUE_STATE_LABELS = {"overdue": "OVERDUE", "today": "TODAY", "upcoming": "UPCOMING"}
+
+
+def format_recurrence(recurring_info):
+    """
+    Formats a recurrence pattern for display.
+
+    Args:
+        recurring_info (dict): The task's recurrence pattern
+
+    Returns:
+        str: e.g. 'Daily', 'Every 2 weeks on Monday, Friday'
+    """
+    interval = recurring_info.get('interval', 'Unknown')
+    every = recurring_info.get('every', 1)
+    if interval == 'daily':
+        recurrence_str = "Daily" if every == 1 else f"Every {every} days"
+    elif interval == 'weekly':
+        recurrence_str = "Weekly" if every == 1 else f"Every {every} weeks"
+        if 'days' in recurring_info:
+            recurrence_str += f" on {', '.join(recurring_info['days'])}"
+    elif interval == 'monthly':
+        recurrence_str = "Monthly" if every == 1 else f"Every {every} months"
+    elif interval == 'yearly':
+        recurrence_str = "Yearly" if every == 1 else f"Every {every} years"
+    elif interval == 'custom':
+        recurrence_str = f"Every {every} days"
+    else:
+        recurrence_str = f"Every {every} {interval}"
+    return recurrence_str
+
+
+def _format_task_row(task, now, show_due_state):
+    """
+    Formats one task as listing lines and works out how long the result stays valid.
+
+    Returns:
+        tuple: (formatted lines, start, end); the lines don't change for start <= now < end
+    """
+    status = "[x]" if task["completed"] else "[ ]"
+    priority_indicator = get_priority_indicator(task['priority'])
+    valid_from, valid_until = datetime.datetime.min, datetime.datetime.max
+
+    # Format due date, parsing it once for both the date and its due state
+    due_date_str = ""
+    if task.get('due_date'):
+        try:
+            dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
+            due_date_str = dt.strftime("%Y-%m-%d")
+            if show_due_state:
+                state, valid_from, valid_until = due_state_window(dt, now)
+                due_date_str = f"[{DUE_STATE_LABELS[state]}: {due_date_str}]"
+        except ValueError:
+            due_date_str = task['due_date'][:10]  # Just show the date part
+
+    tags_str = ', '.join(task['tags']) if task['tags'] else ""
+    recurrence_str = format_recurrence(task['recurring']) if task.get('recurring') else ""
+
+    # Truncate title if too long
+    title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
+
+    row = f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}\n"
+    if task["description"]:
+        row += f"       Description: {task['description']}\n"
+    return row + "\n", valid_from, valid_until
+
+
+def format_task_row(task, now, show_due_state=True):
+    """
+    Formats one task as listing lines: the row, its description (if any) and a blank line.
+
+    Args:
+        task (dict): The task
+        now (datetime.datetime): The reference time for due state labels
+        show_due_state (bool): Whether to label overdue, today and upcoming due dates
+
+    Returns:
+        str: The formatted lines, newline-terminated
+    """
+    return _format_task_row(task, now, show_due_state)[0]
+
+
+# Most rows kept by the render cache before it starts over
+RENDER_CACHE_LIMIT = 250000
+
+
+class RenderCache:
+    """
+    Formatted listing rows by task ID. A row is reused until the task changes
+    (seen on the task event bus) or its due state label would change.
+    """
+
+    def __init__(self, bus=None, limit=RENDER_CACHE_LIMIT):
+        self.rows = {}
+        self.limit = limit
+        self.hits = 0
+        self.misses = 0
+        self.subscription = (bus if bus is not None else event_bus).subscribe(callback=self._on_event)
+
+    def _on_event(self, event):
+        """
+        Drops the rows of a task that changed.
+
+        Args:
+            event (dict): The event published by the task event bus
+        """
+        if event["type"] == "clear":
+            self.rows.clear()
+        elif event["type"] != "add":
+            self.rows.pop((event["task_id"], True), None)
+            self.rows.pop((event["task_id"], False), None)
+
+    def row(self, task, now, show_due_state=True):
+        """
+        Gets the formatted lines for a task, formatting them only if no valid cached copy exists.
+
+        Args:
+            task (dict): The task
+            now (datetime.datetime): The reference time for due state labels
+            show_due_state (bool): Whether to label overdue, today and upcoming due dates
+
+        Returns:
+            str: The formatted lines
+        """
+        key = (task["id"], show_due_state)
+        entry = self.rows.get(key)
+        if entry is not None and entry[1] <= now < entry[2]:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        entry = _format_task_row(task, now, show_due_state)
+        if len(self.rows) >= self.limit:
+            self.rows.clear()
+        self.rows[key] = entry
+        return entry[0]
+
+    def close(self):
+        """
+        Stops tracking events and drops the cached rows.
+        """
+        self.subscription.close()
+        self.rows.clear()
+
+
+_render_cache = None
+
+
+def get_render_cache():
+    """
+    Gets the shared render cache, creating it on first use.
+
+    Returns:
+        RenderCache: The cache
+    """
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
+
+
+memory.register_index("render_cache", lambda: _render_cache.rows if _render_cache else None)
+
+
+def render_task_listing(tasks, show_due_state=True, out=None):
+    """
+    Writes the listing header and one row per task, buffering rows and
+    writing them out in large chunks.
+
+    Args:
+        tasks (iterable): The tasks to list
+        show_due_state (bool): Whether to label overdue, today and upcoming due dates
+        out (file, optional): Where to write (defaults to sys.stdout)
+    """
+    out = out or sys.stdout
+    # One timestamp for the whole listing, so rows can't disagree across midnight
+    now = clock.now()
+    row = get_render_cache().row
+    buffer = [LISTING_HEADER]
+    for task in tasks:
+        buffer.append(row(task, now, show_due_state))
+        if len(buffer) >= RENDER_CHUNK_ROWS:
+            out.write("".join(buffer))
+            buffer = []
+    out.write("".join(buffer))
+
+
+# Rows per pager screen
+PAGE_SIZE = 20
+
+# 'auto' pages listings longer than one screen when running in a terminal; 'on' and 'off' force it
+PAGER_MODE = "auto"
+
+
+def pager_enabled():
+    """
+    Checks whether listings should be shown one page at a time.
+
+    Returns:
+        bool: True if the pager is on
+    """
+    if PAGER_MODE == "auto":
+        return sys.stdin.isatty() and sys.stdout.isatty()
+    return PAGER_MODE == "on"
+
+
+def page_task_listing(tasks, show_due_state=True, title=None, page_size=None, total=None):
+    """
+    Shows a listing one page at a time, with next/prev/jump navigation.
+    Rows are pulled from 'tasks' only as pages need them and only the visible
+    page is formatted, so the first screen appears without walking the whole
+    result. A listing that fits on one page is shown without prompting.
+
+    Args:
+        tasks (iterable): The tasks to list (a list, or a lazy iterator such as iter_filter_tasks)
+        show_due_state (bool): Whether to label overdue, today and upcoming due dates
+        title (str, optional): Line printed before the first page
+        page_size (int, optional): Rows per page (defaults to PAGE_SIZE)
+        total (int, optional): Number of rows, if known for a lazy iterator
+
+    Returns:
+        bool: False if there were no tasks to show
+    """
+    page_size = page_size or PAGE_SIZE
+    if total is None and isinstance(tasks, (list, tuple)):
+        total = len(tasks)
+    source = iter(tasks)
+    pulled = []
+
+    def fill(count):
+        # Pull rows until 'count' are available or the source runs out
+        while len(pulled) < count:
+            task = next(source, None)
+            if task is None:
+                return
+            pulled.append(task)
+
+    fill(page_size + 1)
+    if not pulled:
+        return False
+    if title:
+        print(title)
+
+    page = 0
+    while True:
+        start = page * page_size
+        fill(start + page_size + 1)
+        rows = pulled[start:start + page_size]
+        now = clock.now()
+        cache = get_render_cache()
+        sys.stdout.write(LISTING_HEADER + "".join(cache.row(task, now, show_due_state) for task in rows))
+
+        has_next = len(pulled) > start + page_size
+        if page == 0 and not has_next:
+            return True
+        known = total if total is not None else (None if has_next else len(pulled))
+        pages = f"{page + 1}/{-(-known // page_size)}" if known is not None else f"{page + 1}"
+        count = known if known is not None else f"{len(pulled)}+"
+        print(f"Page {pages} - rows {start + 1}-{start + len(rows)} of {count}")
+
+        action = input("[n]ext, [p]rev, [j]ump <page>, [q]uit: ").strip().lower()
+        if action in ("", "n"):
+            if has_next:
+                page += 1
+            else:
+                print("ℹ️  This is the last page.")
+        elif action == "p":
+            page = max(0, page - 1)
+        elif action.startswith("j"):
+            target = action[1:].strip() or input("Jump to page: ").strip()
+            if not target.isdigit() or int(target) < 1:
+                print("❌ Please enter a page number.")
+                continue
+            fill(int(target) * page_size)
+            # Jumping past the end lands on the last page
+            last_page = max(0, (len(pulled) - 1) // page_size)
+            page = min(int(target) - 1, last_page)
+        elif action == "q":
+            return True
+        else:
+            print("❌ Invalid choice.")
+
+
+def show_task_listing(tasks, show_due_state=True, title=None):
+    """
+    Shows a listing through the pager when it is on, or writes it out in full.
+
+    Args:
+        tasks (iterable): The tasks to list
+        show_due_state (bool): Whether to label overdue, today and upcoming due dates
+        title (str, optional): Line printed before the listing
+
+    Returns:
+        bool: False if there were no tasks to show
+    """
+    if pager_enabled():
+        return page_task_listing(tasks, show_due_state, title)
+    if title:
+        print(title)
+    render_task_listing(tasks, show_due_state)
+    return True
+
+
 def handle_add_task():
     """
     Handles the process of adding a new task.
@@ -178,63 +503,7 @@ def handle_view_tasks():
         print("📭 No tasks found.")
         return
 
-    print(f"\nTotal tasks: {len(tasks)}")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence")
-    print("-" * 120)
-
-    for task in tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        
-        # Format due date
-        due_date_str = ""
-        if task.get('due_date'):
-            try:
-                dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                due_date_str = dt.strftime("%Y-%m-%d")
-                
-                # Add visual indicators for overdue, today, or upcoming tasks
-                if is_task_overdue(task):
-                    due_date_str = f"[OVERDUE: {due_date_str}]"
-                elif is_task_due_today(task):
-                    due_date_str = f"[TODAY: {due_date_str}]"
-                elif is_task_upcoming(task):
-                    due_date_str = f"[UPCOMING: {due_date_str}]"
-            except ValueError:
-                due_date_str = task['due_date'][:10]  # Just show the date part
-        
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-
-        # Format recurrence info
-        recurrence_str = ""
-        if task.get('recurring'):
-            recurring_info = task['recurring']
-            interval = recurring_info.get('interval', 'Unknown')
-            every = recurring_info.get('every', 1)
-            if interval == 'daily':
-                recurrence_str = f"Daily" if every == 1 else f"Every {every} days"
-            elif interval == 'weekly':
-                recurrence_str = f"Weekly" if every == 1 else f"Every {every} weeks"
-                if 'days' in recurring_info:
-                    recurrence_str += f" on {', '.join(recurring_info['days'])}"
-            elif interval == 'monthly':
-                recurrence_str = f"Monthly" if every == 1 else f"Every {every} months"
-            elif interval == 'yearly':
-                recurrence_str = f"Yearly" if every == 1 else f"Every {every} years"
-            elif interval == 'custom':
-                recurrence_str = f"Every {every} days"
-            else:
-                recurrence_str = f"Every {every} {interval}"
-
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
-
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}")
-
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    show_task_listing(tasks, title=f"\nTotal tasks: {len(tasks)}")
 
 
 def handle_update_task():
@@ -450,7 +719,7 @@ def handle_filter_tasks():
             print("❌ Invalid choice.")
             return
 
-        filtered_tasks = filter_tasks(status=status)
+        criteria = {"status": status}
 
     elif choice == '2':
         print("Filter by priority:")
@@ -470,7 +739,7 @@ def handle_filter_tasks():
             print("❌ Invalid choice.")
             return
 
-        filtered_tasks = filter_tasks(priority=priority)
+        criteria = {"priority": priority}
 
     elif choice == '3':
         tag = input("Enter tag to filter by: ").strip()
@@ -478,7 +747,7 @@ def handle_filter_tasks():
             print("❌ Tag cannot be empty.")
             return
 
-        filtered_tasks = filter_tasks(tag=tag)
+        criteria = {"tag": tag}
 
     elif choice == '4':
         print("Filter by overdue status:")
@@ -498,7 +767,7 @@ def handle_filter_tasks():
             print("❌ Invalid choice.")
             return
 
-        filtered_tasks = filter_tasks(overdue=overdue)
+        criteria = {"overdue": overdue}
 
     elif choice == '5':
         print("Filter by upcoming status:")
@@ -518,7 +787,7 @@ def handle_filter_tasks():
             print("❌ Invalid choice.")
             return
 
-        filtered_tasks = filter_tasks(upcoming=upcoming)
+        criteria = {"upcoming": upcoming}
 
     elif choice == '6':
         print("Filter by recurring status:")
@@ -538,7 +807,7 @@ def handle_filter_tasks():
             print("❌ Invalid choice.")
             return
 
-        filtered_tasks = filter_tasks(recurring=recurring)
+        criteria = {"recurring": recurring}
 
     elif choice == '7':
         return  # Go back to main menu
@@ -547,67 +816,20 @@ def handle_filter_tasks():
         print("❌ Invalid choice.")
         return
 
+    if pager_enabled():
+        # Page through matches as they are found instead of filtering the whole store first
+        if not page_task_listing(iter_filter_tasks(**criteria), title="\nFiltered tasks:"):
+            print("📭 No tasks found matching the filter criteria.")
+        return
+
+    filtered_tasks = filter_tasks(**criteria)
+
     if not filtered_tasks:
         print(f"📭 No tasks found matching the filter criteria.")
         return
 
     print(f"\nFiltered tasks ({len(filtered_tasks)} found):")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence")
-    print("-" * 120)
-
-    for task in filtered_tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        
-        # Format due date
-        due_date_str = ""
-        if task.get('due_date'):
-            try:
-                dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                due_date_str = dt.strftime("%Y-%m-%d")
-                
-                # Add visual indicators for overdue, today, or upcoming tasks
-                if is_task_overdue(task):
-                    due_date_str = f"[OVERDUE: {due_date_str}]"
-                elif is_task_due_today(task):
-                    due_date_str = f"[TODAY: {due_date_str}]"
-                elif is_task_upcoming(task):
-                    due_date_str = f"[UPCOMING: {due_date_str}]"
-            except ValueError:
-                due_date_str = task['due_date'][:10]  # Just show the date part
-        
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-
-        # Format recurrence info
-        recurrence_str = ""
-        if task.get('recurring'):
-            recurring_info = task['recurring']
-            interval = recurring_info.get('interval', 'Unknown')
-            every = recurring_info.get('every', 1)
-            if interval == 'daily':
-                recurrence_str = f"Daily" if every == 1 else f"Every {every} days"
-            elif interval == 'weekly':
-                recurrence_str = f"Weekly" if every == 1 else f"Every {every} weeks"
-                if 'days' in recurring_info:
-                    recurrence_str += f" on {', '.join(recurring_info['days'])}"
-            elif interval == 'monthly':
-                recurrence_str = f"Monthly" if every == 1 else f"Every {every} months"
-            elif interval == 'yearly':
-                recurrence_str = f"Yearly" if every == 1 else f"Every {every} years"
-            elif interval == 'custom':
-                recurrence_str = f"Every {every} days"
-            else:
-                recurrence_str = f"Every {every} {interval}"
-
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
-
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}")
-
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    render_task_listing(filtered_tasks)
 
 
 def handle_sort_tasks():
@@ -640,6 +862,13 @@ def handle_sort_tasks():
 
     # Get all tasks and sort them
     all_tasks = get_all_tasks()
+    if pager_enabled():
+        # Pull rows from a heap page by page instead of sorting everything first
+        title = f"\nSorted tasks ({len(all_tasks)} found) - Sorted by {sort_by}:"
+        if not page_task_listing(iter_sorted_tasks(all_tasks, sort_by), title=title, total=len(all_tasks)):
+            print("📭 No tasks found.")
+        return
+
     sorted_tasks = sort_tasks(all_tasks, sort_by)
 
     if not sorted_tasks:
@@ -647,62 +876,7 @@ def handle_sort_tasks():
         return
 
     print(f"\nSorted tasks ({len(sorted_tasks)} found) - Sorted by {sort_by}:")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence")
-    print("-" * 120)
-
-    for task in sorted_tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        
-        # Format due date
-        due_date_str = ""
-        if task.get('due_date'):
-            try:
-                dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                due_date_str = dt.strftime("%Y-%m-%d")
-                
-                # Add visual indicators for overdue, today, or upcoming tasks
-                if is_task_overdue(task):
-                    due_date_str = f"[OVERDUE: {due_date_str}]"
-                elif is_task_due_today(task):
-                    due_date_str = f"[TODAY: {due_date_str}]"
-                elif is_task_upcoming(task):
-                    due_date_str = f"[UPCOMING: {due_date_str}]"
-            except ValueError:
-                due_date_str = task['due_date'][:10]  # Just show the date part
-        
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-
-        # Format recurrence info
-        recurrence_str = ""
-        if task.get('recurring'):
-            recurring_info = task['recurring']
-            interval = recurring_info.get('interval', 'Unknown')
-            every = recurring_info.get('every', 1)
-            if interval == 'daily':
-                recurrence_str = f"Daily" if every == 1 else f"Every {every} days"
-            elif interval == 'weekly':
-                recurrence_str = f"Weekly" if every == 1 else f"Every {every} weeks"
-                if 'days' in recurring_info:
-                    recurrence_str += f" on {', '.join(recurring_info['days'])}"
-            elif interval == 'monthly':
-                recurrence_str = f"Monthly" if every == 1 else f"Every {every} months"
-            elif interval == 'yearly':
-                recurrence_str = f"Yearly" if every == 1 else f"Every {every} years"
-            elif interval == 'custom':
-                recurrence_str = f"Every {every} days"
-            else:
-                recurrence_str = f"Every {every} {interval}"
-
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
-
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}")
-
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    render_task_listing(sorted_tasks)
 
 
 def handle_search_tasks():
@@ -717,30 +891,23 @@ def handle_search_tasks():
         print("❌ Search keyword cannot be empty.")
         return
 
-    matching_tasks = search_tasks(keyword)
+    if pager_enabled():
+        # Page through matches as they are found instead of searching the whole store first
+        found = page_task_listing(iter_search_tasks(keyword), title=f"\nTasks containing '{keyword}':")
+    else:
+        matching_tasks = search_tasks(keyword)
+        found = bool(matching_tasks)
+        if found:
+            show_task_listing(matching_tasks, title=f"\nFound {len(matching_tasks)} task(s) containing '{keyword}':")
+    if found:
+        return
 
+    # Nothing contains the keyword as typed; try titles with close spellings
+    matching_tasks = [task for task, _distance in fuzzy.fuzzy_search(keyword, limit=20)]
     if not matching_tasks:
         print(f"📭 No tasks found containing '{keyword}'.")
         return
-
-    print(f"\nFound {len(matching_tasks)} task(s) containing '{keyword}':")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Title':<25} | Tags")
-    print("-" * 80)
-
-    for task in matching_tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-        
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
-        
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {title:<25} | {tags_str}")
-
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    show_task_listing(matching_tasks, title=f"\nNo exact matches for '{keyword}'. Closest title(s), best first:")
 
 
 def handle_view_overdue_tasks():
@@ -749,62 +916,21 @@ def handle_view_overdue_tasks():
     """
     print("\n📋 Viewing overdue tasks...")
 
-    tasks = get_all_tasks()
-    overdue_tasks = [task for task in tasks if is_task_overdue(task)]
+    now = clock.now()
+    if pager_enabled():
+        # Page through matches as they are found instead of scanning the whole store first
+        if not page_task_listing(iter_filter_tasks(overdue=True, now=now), show_due_state=False,
+                                 title="\nOverdue tasks:"):
+            print("📭 No overdue tasks found.")
+        return
+
+    overdue_tasks = filter_overdue_tasks(now)
 
     if not overdue_tasks:
         print("📭 No overdue tasks found.")
         return
 
-    print(f"\nOverdue tasks: {len(overdue_tasks)}")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence")
-    print("-" * 120)
-
-    for task in overdue_tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        
-        # Format due date
-        due_date_str = ""
-        if task.get('due_date'):
-            try:
-                dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                due_date_str = dt.strftime("%Y-%m-%d")
-            except ValueError:
-                due_date_str = task['due_date'][:10]  # Just show the date part
-        
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-
-        # Format recurrence info
-        recurrence_str = ""
-        if task.get('recurring'):
-            recurring_info = task['recurring']
-            interval = recurring_info.get('interval', 'Unknown')
-            every = recurring_info.get('every', 1)
-            if interval == 'daily':
-                recurrence_str = f"Daily" if every == 1 else f"Every {every} days"
-            elif interval == 'weekly':
-                recurrence_str = f"Weekly" if every == 1 else f"Every {every} weeks"
-                if 'days' in recurring_info:
-                    recurrence_str += f" on {', '.join(recurring_info['days'])}"
-            elif interval == 'monthly':
-                recurrence_str = f"Monthly" if every == 1 else f"Every {every} months"
-            elif interval == 'yearly':
-                recurrence_str = f"Yearly" if every == 1 else f"Every {every} years"
-            elif interval == 'custom':
-                recurrence_str = f"Every {every} days"
-            else:
-                recurrence_str = f"Every {every} {interval}"
-
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
-
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}")
-
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    show_task_listing(overdue_tasks, show_due_state=False, title=f"\nOverdue tasks: {len(overdue_tasks)}")
 
 
 def handle_view_upcoming_tasks():
@@ -813,62 +939,20 @@ def handle_view_upcoming_tasks():
     """
     print("\n📋 Viewing upcoming tasks...")
 
-    tasks = get_all_tasks()
-    upcoming_tasks = [task for task in tasks if is_task_upcoming(task)]
+    now = clock.now()
+    if pager_enabled():
+        if not page_task_listing(iter_filter_tasks(upcoming=True, now=now), show_due_state=False,
+                                 title="\nUpcoming tasks:"):
+            print("📭 No upcoming tasks found.")
+        return
+
+    upcoming_tasks = filter_upcoming_tasks(now)
 
     if not upcoming_tasks:
         print("📭 No upcoming tasks found.")
         return
 
-    print(f"\nUpcoming tasks: {len(upcoming_tasks)}")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence")
-    print("-" * 120)
-
-    for task in upcoming_tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        
-        # Format due date
-        due_date_str = ""
-        if task.get('due_date'):
-            try:
-                dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                due_date_str = dt.strftime("%Y-%m-%d")
-            except ValueError:
-                due_date_str = task['due_date'][:10]  # Just show the date part
-        
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-
-        # Format recurrence info
-        recurrence_str = ""
-        if task.get('recurring'):
-            recurring_info = task['recurring']
-            interval = recurring_info.get('interval', 'Unknown')
-            every = recurring_info.get('every', 1)
-            if interval == 'daily':
-                recurrence_str = f"Daily" if every == 1 else f"Every {every} days"
-            elif interval == 'weekly':
-                recurrence_str = f"Weekly" if every == 1 else f"Every {every} weeks"
-                if 'days' in recurring_info:
-                    recurrence_str += f" on {', '.join(recurring_info['days'])}"
-            elif interval == 'monthly':
-                recurrence_str = f"Monthly" if every == 1 else f"Every {every} months"
-            elif interval == 'yearly':
-                recurrence_str = f"Yearly" if every == 1 else f"Every {every} years"
-            elif interval == 'custom':
-                recurrence_str = f"Every {every} days"
-            else:
-                recurrence_str = f"Every {every} {interval}"
-
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
-
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}")
-
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    show_task_listing(upcoming_tasks, show_due_state=False, title=f"\nUpcoming tasks: {len(upcoming_tasks)}")
 
 
 def handle_view_recurring_tasks():
@@ -877,70 +961,325 @@ def handle_view_recurring_tasks():
     """
     print("\n📋 Viewing recurring tasks...")
 
-    tasks = get_all_tasks()
-    recurring_tasks = [task for task in tasks if task.get('recurring')]
+    if pager_enabled():
+        found = page_task_listing(iter_filter_tasks(recurring=True), title="\nRecurring tasks:")
+    else:
+        recurring_tasks = filter_recurring_tasks()
+        found = bool(recurring_tasks)
+        if found:
+            show_task_listing(recurring_tasks, title=f"\nRecurring tasks: {len(recurring_tasks)}")
 
-    if not recurring_tasks:
+    if not found:
         print("📭 No recurring tasks found.")
         return
 
-    print(f"\nRecurring tasks: {len(recurring_tasks)}")
-    # Print header for better readability
-    print(f"{'ID':<4} | {'Status':<7} | {'Pri':<4} | {'Due Date':<12} | {'Title':<25} | Tags | Recurrence")
-    print("-" * 120)
+    # Offer to catch up series that fell behind instead of toggling them once per missed occurrence
+    now = clock.now()
+    behind = len(missed_recurrences(now))
+    if not behind:
+        return
+
+    choice = input(f"\n{behind} series missed occurrences. Catch up? "
+                   "([a]ll / [l]atest only / [s]kip to next / N): ").strip().lower()
+    policy = {"a": "all", "all": "all", "l": "latest", "latest": "latest", "s": "skip", "skip": "skip"}.get(choice)
+    if policy is None:
+        return
+    summary = catch_up_recurrences(policy, now)
+    print(f"✅ Caught up {summary['series']} series ({summary['missed']} missed occurrences, "
+          f"{summary['created']} tasks created).")
 
-    for task in recurring_tasks:
-        status = "[x]" if task["completed"] else "[ ]"
-        priority_indicator = get_priority_indicator(task['priority'])
-        
-        # Format due date
-        due_date_str = ""
-        if task.get('due_date'):
-            try:
-                dt = datetime.datetime.fromisoformat(task['due_date'].replace('Z', '+00:00'))
-                due_date_str = dt.strftime("%Y-%m-%d")
-                
-                # Add visual indicators for overdue, today, or upcoming tasks
-                if is_task_overdue(task):
-                    due_date_str = f"[OVERDUE: {due_date_str}]"
-                elif is_task_due_today(task):
-                    due_date_str = f"[TODAY: {due_date_str}]"
-                elif is_task_upcoming(task):
-                    due_date_str = f"[UPCOMING: {due_date_str}]"
-            except ValueError:
-                due_date_str = task['due_date'][:10]  # Just show the date part
-        
-        tags_str = f"{', '.join(task['tags'])}" if task['tags'] else ""
-
-        # Format recurrence info
-        recurrence_str = ""
-        if task.get('recurring'):
-            recurring_info = task['recurring']
-            interval = recurring_info.get('interval', 'Unknown')
-            every = recurring_info.get('every', 1)
-            if interval == 'daily':
-                recurrence_str = f"Daily" if every == 1 else f"Every {every} days"
-            elif interval == 'weekly':
-                recurrence_str = f"Weekly" if every == 1 else f"Every {every} weeks"
-                if 'days' in recurring_info:
-                    recurrence_str += f" on {', '.join(recurring_info['days'])}"
-            elif interval == 'monthly':
-                recurrence_str = f"Monthly" if every == 1 else f"Every {every} months"
-            elif interval == 'yearly':
-                recurrence_str = f"Yearly" if every == 1 else f"Every {every} years"
-            elif interval == 'custom':
-                recurrence_str = f"Every {every} days"
-            else:
-                recurrence_str = f"Every {every} {interval}"
 
-        # Truncate title if too long
-        title = task['title'][:23] + ".." if len(task['title']) > 25 else task['title']
+def handle_view_summary():
+    """
+    Handles the process of viewing the task summary dashboard.
+    """
+    print("\n📈 Task summary...")
+
+    summary = stats()
+
+    if not summary["total"]:
+        print("📭 No tasks found.")
+        return
+
+    print(f"\nTotal tasks: {summary['total']}")
+    print(f"Completed: {summary['completed']} | Incomplete: {summary['incomplete']}")
+    print(f"Overdue: {summary['overdue_incomplete']} incomplete ({summary['overdue']} including completed)")
+    print(f"With due date: {summary['with_due_date']} | Recurring: {summary['recurring']}")
+
+    print(f"\n{'Priority':<10} | {'Total':<6} | Incomplete")
+    print("-" * 32)
+    for priority, count in summary["by_priority"].items():
+        print(f"{get_priority_indicator(priority)} {priority:<6} | {count:<6} | {summary['incomplete_by_priority'][priority]}")
+
+    if summary["by_tag"]:
+        print(f"\n{'Tag':<20} | {'Total':<6} | Incomplete")
+        print("-" * 42)
+        for tag, count in sorted(summary["by_tag"].items(), key=lambda item: (-item[1], item[0])):
+            print(f"{tag:<20} | {count:<6} | {summary['incomplete_by_tag'].get(tag, 0)}")
+
+
+def handle_view_metrics():
+    """
+    Handles the hidden metrics option: shows the report and lets the user
+    enable, disable, reset or export the instrumentation.
+    """
+    print("\n🛠️  Operation metrics...")
+    print(metrics.report_text())
+
+    print("\nOptions: [e]nable, [d]isable, [r]eset, e[x]port JSON, [s]low-op log, press Enter to go back")
+    action = input("Choose an option: ").strip().lower()
+
+    if action == 'e':
+        metrics.enable()
+        print("✅ Metrics enabled.")
+    elif action == 'd':
+        metrics.disable()
+        print("✅ Metrics disabled.")
+    elif action == 'r':
+        metrics.reset()
+        print("✅ Metrics reset.")
+    elif action == 'x':
+        path = input("Enter file path for the JSON export: ").strip()
+        if not path:
+            print("❌ File path cannot be empty.")
+            return
+        try:
+            metrics.export_json(path)
+        except OSError as e:
+            print(f"❌ Could not write metrics: {e}")
+            return
+        print(f"✅ Metrics exported to {path}.")
+    elif action == 's':
+        print(slowlog.report_text())
+
+
+def handle_undo():
+    """
+    Handles undoing the most recent change.
+    """
+    description = undo.undo()
+    if description is None:
+        print("\n📭 Nothing to undo.")
+    else:
+        print(f"\n↩️  Undid: {description}")
+
+
+def handle_redo():
+    """
+    Handles redoing the most recently undone change.
+    """
+    description = undo.redo()
+    if description is None:
+        print("\n📭 Nothing to redo.")
+    else:
+        print(f"\n↪️  Redid: {description}")
+
+
+def format_change(change):
+    """
+    Formats one recorded change of a task for display.
+
+    Args:
+        change (dict): A change from history.TaskHistory.versions()
+
+    Returns:
+        str: e.g. "2026-05-01 09:30:00 | update | priority: 'Medium' -> 'High'"
+    """
+    if change["type"] == "add":
+        details = f"created '{change['task']['title']}'"
+    elif change["type"] == "delete":
+        details = "deleted"
+    else:
+        details = ", ".join(f"{field}: {old!r} -> {new!r}" for field, (old, new) in change["changes"].items())
+    return f"{change['at']:%Y-%m-%d %H:%M:%S} | {change['type']:<6} | {details}"
+
+
+def handle_task_history():
+    """
+    Handles viewing how a task changed over time, and what it looked like at a given time.
+    """
+    print("\n🕘 Task history...")
+
+    task_history = history.get_history()
+    if task_history is None:
+        print("📭 Task history is not being recorded.")
+        return
+
+    try:
+        task_id = int(input("Enter the ID of the task: "))
+    except ValueError:
+        print("❌ Invalid ID. Please enter a number.")
+        return
+
+    versions = task_history.versions(task_id)
+    if not versions:
+        print(f"📭 No recorded changes for task {task_id}.")
+        return
+    for change in versions:
+        print(format_change(change))
+
+    when_input = input("\nShow the task as of (date/time, press Enter to skip): ").strip()
+    if not when_input:
+        return
+    when = parse_datetime_input(when_input)
+    if when is None:
+        print("❌ Invalid date/time.")
+        return
+    try:
+        state = task_history.as_of(task_id, when)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    if state is None:
+        print(f"📭 Task {task_id} did not exist at {when:%Y-%m-%d %H:%M}.")
+    else:
+        # Historical versions bypass the render cache, which holds the current rows
+        sys.stdout.write(LISTING_HEADER + format_task_row(state, clock.now()))
+
+
+def handle_view_actionable_tasks():
+    """
+    Handles viewing the incomplete tasks that aren't waiting for other tasks.
+    """
+    print("\n📋 Viewing actionable tasks...")
+
+    actionable = dependencies.actionable_tasks()
+    if not actionable:
+        print("📭 No actionable tasks found.")
+        return
+
+    show_task_listing(actionable, title=f"\nActionable tasks: {len(actionable)}")
+
 
-        print(f"{task['id']:<4} | {status:<7} | {priority_indicator:<4} | {due_date_str:<12} | {title:<25} | {tags_str} | {recurrence_str}")
+def handle_what_next():
+    """
+    Handles showing the most pressing tasks by priority and due-date urgency, skipping blocked tasks.
+    """
+    print("\n🎯 What to do next...")
+
+    count_input = input("How many tasks? (press Enter for 5): ").strip()
+    try:
+        count = int(count_input) if count_input else 5
+    except ValueError:
+        print("❌ Invalid number.")
+        return
 
-        if task["description"]:
-            print(f"       Description: {task['description']}")
-        print()
+    results = urgency.next_actions(count, clock.now(), actionable_only=True)
+    if not results:
+        print("📭 Nothing to do.")
+        return
+
+    show_task_listing([task for task, _score in results], title=f"\nMost pressing tasks: {len(results)}")
+    print("Scores: " + ", ".join(f"#{task['id']} {score:.1f}" for task, score in results))
+
+
+def handle_dependencies():
+    """
+    Handles viewing and changing what a task waits for: tasks it depends on and its subtasks.
+    """
+    print("\n🔗 Dependencies and subtasks...")
+
+    try:
+        task_id = int(input("Enter the ID of the task: "))
+    except ValueError:
+        print("❌ Invalid ID. Please enter a number.")
+        return
+    task = get_task_by_id(task_id)
+    if task is None:
+        print(f"❌ Task with ID {task_id} not found.")
+        return
+
+    graph = dependencies.get_dependency_graph()
+    print(f"Task {task_id}: {task['title']}")
+    print(f"  Depends on: {', '.join(map(str, task.get('depends_on') or [])) or 'nothing'}")
+    print(f"  Parent: {task.get('parent_id') or 'none'}")
+    print(f"  Subtasks: {', '.join(str(child['id']) for child in graph.subtasks(task_id)) or 'none'}")
+    blockers = graph.blockers(task_id)
+    print(f"  Waiting for: {', '.join(map(str, blockers))}" if blockers else "  Not blocked")
+
+    print("\nOptions: [a]dd a dependency, [r]emove a dependency, set the [p]arent, press Enter to go back")
+    action = input("Choose an option: ").strip().lower()
+    if action not in ('a', 'r', 'p'):
+        return
+    prompt = "Enter the parent task ID (press Enter for none): " if action == 'p' else "Enter the ID of the task it depends on: "
+    other_input = input(prompt).strip()
+    try:
+        other_id = int(other_input) if other_input or action != 'p' else None
+    except ValueError:
+        print("❌ Invalid ID. Please enter a number.")
+        return
+
+    try:
+        if action == 'a':
+            changed = dependencies.add_dependency(task_id, other_id)
+        elif action == 'r':
+            changed = dependencies.remove_dependency(task_id, other_id)
+        else:
+            changed = dependencies.set_parent(task_id, other_id)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+    if changed:
+        print("✅ Relations updated.")
+    else:
+        print("❌ Task or dependency not found.")
+
+
+def handle_task_lists():
+    """
+    Handles listing, switching, creating and unloading task lists (namespaces).
+    """
+    print("\n🗂️  Task lists...")
+    for info in namespaces.list_namespaces():
+        size = f"{info['tasks']} tasks" if info["loaded"] else "unloaded"
+        marker = "*" if info["active"] else " "
+        print(f"{marker} {info['name']:<20} {size}")
+
+    print("\nOptions: [s]witch to or create a list, [u]nload a list, [d]elete a list, press Enter to go back")
+    action = input("Choose an option: ").strip().lower()
+    if action not in ('s', 'u', 'd'):
+        return
+    name = input("Enter the list name: ").strip()
+    if not name:
+        print("❌ List name cannot be empty.")
+        return
+
+    try:
+        if action == 's':
+            created = name not in namespaces.list_names()
+            namespaces.use_namespace(name)
+            print(f"✅ {'Created and switched' if created else 'Switched'} to task list '{name}'.")
+        elif action == 'u':
+            count = namespaces.unload_namespace(name)
+            print(f"✅ Unloaded task list '{name}' ({count} tasks written to disk).")
+        else:
+            confirm = input(f"Delete task list '{name}' and all its tasks? (y/N): ").strip().lower()
+            if confirm == 'y':
+                namespaces.delete_namespace(name)
+                print(f"✅ Deleted task list '{name}'.")
+    except (KeyError, ValueError, RuntimeError) as e:
+        print(f"❌ {e.args[0]}")
+
+
+def handle_view_memory():
+    """
+    Handles the hidden memory option: shows the memory report and lets the
+    user turn allocation tracing on or off.
+    """
+    print("\n🧮 Memory report...")
+    print(memory.report_text())
+
+    tracing = memory.is_tracing()
+    print(f"\nOptions: [t]urn allocation tracing {'off' if tracing else 'on'}, press Enter to go back")
+    action = input("Choose an option: ").strip().lower()
+
+    if action == 't':
+        if tracing:
+            memory.stop_tracing()
+            print("✅ Allocation tracing stopped.")
+        else:
+            memory.start_tracing()
+            print("✅ Allocation tracing started; later reports include traced allocations.")
 
 
 def handle_toggle_task_status():
@@ -0,0 +1,344 @@
+"""
+Undo/redo module for the console todo application.
+Keeps a bounded history of task changes built from the field-level deltas
+published on the event bus, instead of snapshots of the store, so undoing or
+redoing a change costs time proportional to the change, not to the store.
+
+Events published in one event bus transaction (a toggle and the recurrence it
+spawned, a bulk insert, a recurrence catch-up, an API batch) are one step.
+Undoing and redoing publish the reverse or repeated events, so the other
+subscribers (stats, render cache, ...) stay in sync.
+
+The history is bounded both in steps and in the task changes it holds (an
+added, deleted or cleared task, or an update), since one bulk step can hold
+a copy of every task it added. The oldest steps are dropped to stay within
+both limits; a single step larger than the change budget is not kept at all.
+"""
+
+import bisect
+import collections
+
+import tasks
+
+# Steps kept for undo by default; the oldest step is dropped when the history is full
+DEFAULT_DEPTH = 100
+
+# Task changes held by the undo and redo stacks by default
+DEFAULT_MAX_CHANGES = 100000
+
+
+def change_count(event):
+    """
+    Gets the number of task changes a recorded event holds.
+
+    Args:
+        event (dict): The event published by tasks.event_bus
+
+    Returns:
+        int: 1, or the number of tasks removed by a 'clear'
+    """
+    if event["type"] == "clear":
+        return max(len(event.get("tasks") or ()), 1)
+    return 1
+
+
+class UndoHistory:
+    """
+    Undo and redo stacks of changes recorded from the event bus.
+    """
+
+    def __init__(self, bus=None, storage=None, depth=DEFAULT_DEPTH, max_changes=DEFAULT_MAX_CHANGES):
+        self.bus = bus if bus is not None else tasks.event_bus
+        self._storage = storage if storage is not None else tasks.tasks_storage
+        self.depth = depth
+        self.max_changes = max_changes
+        self._undo = collections.deque()
+        self._redo = []
+        # Task changes held by both stacks, and the transaction of a step dropped for exceeding max_changes
+        self._changes = 0
+        self._dropped_txn = None
+        self._applying = False
+        self.subscription = self.bus.subscribe(callback=self._on_event)
+
+    def _on_event(self, event):
+        """
+        Records one mutation event, joining it to the previous step if both belong to the same transaction.
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        if self._applying:
+            return
+        if event["type"] in ("update", "toggle") and not event["changes"] and not event.get("spawned_id"):
+            # Nothing changed, so there is nothing to undo (and the redo stack stays valid)
+            return
+        self._clear_redo()
+        txn = event.get("txn")
+        if txn is not None and txn == self._dropped_txn:
+            # The rest of a step already too large to keep
+            return
+        if txn is not None and self._undo and self._undo[-1]["txn"] == txn:
+            self._undo[-1]["events"].append(event)
+        else:
+            self._undo.append({"txn": txn, "events": [event]})
+        self._changes += change_count(event)
+        self._trim()
+
+    def _trim(self):
+        """
+        Drops the oldest steps until the undo stack is within its step and change limits.
+        """
+        while self._undo and (len(self._undo) > self.depth or self._changes > self.max_changes):
+            step = self._undo.popleft()
+            self._changes -= sum(change_count(event) for event in step["events"])
+            if not self._undo:
+                # The newest step alone is over the budget; the rest of its transaction is ignored too
+                self._dropped_txn = step["txn"]
+
+    def _clear_redo(self):
+        """
+        Forgets the undone steps.
+        """
+        for step in self._redo:
+            self._changes -= sum(change_count(event) for event in step["events"])
+        self._redo.clear()
+
+    def _index(self, task_id):
+        """
+        Finds a task's position in the store.
+
+        Args:
+            task_id (int): The task ID
+
+        Returns:
+            int or None: The position, or None if the task isn't stored
+        """
+        storage = self._storage
+        # Tasks are appended with increasing IDs, so a binary search usually finds them
+        position = bisect.bisect_left(storage, task_id, key=lambda task: task["id"])
+        if position < len(storage) and storage[position]["id"] == task_id:
+            return position
+        for position, task in enumerate(storage):
+            if task["id"] == task_id:
+                return position
+        return None
+
+    def _remove(self, task_id):
+        """
+        Removes a task from the store and publishes the 'delete' event.
+        """
+        position = self._index(task_id)
+        if position is not None:
+            task = self._storage.pop(position)
+            self.bus.publish("delete", task_id, task=task, position=position)
+
+    def _insert(self, task, position=None):
+        """
+        Puts a task back in the store (at its old position if known) and publishes the 'add' event.
+        """
+        if position is None or position > len(self._storage):
+            position = bisect.bisect_left(self._storage, task["id"], key=lambda stored: stored["id"])
+        self._storage.insert(position, task)
+        if task["id"] > tasks.last_task_id:
+            tasks.last_task_id = task["id"]
+        self.bus.publish("add", task["id"], task=dict(task))
+
+    def _set_fields(self, event_type, task_id, changes):
+        """
+        Sets task fields and publishes the change with the given event type.
+
+        Args:
+            event_type (str): 'update' or 'toggle'
+            task_id (int): The task ID
+            changes (dict): {field: (current value, value to set)}
+        """
+        position = self._index(task_id)
+        if position is None:
+            return
+        task = self._storage[position]
+        for field, (_old, new) in changes.items():
+            task[field] = new
+        extra = {"spawned_id": None} if event_type == "toggle" else {}
+        self.bus.publish(event_type, task_id, changes=changes, **extra)
+
+    def _revert(self, event):
+        """
+        Reverses one recorded event.
+        """
+        kind = event["type"]
+        if kind == "add":
+            self._remove(event["task_id"])
+        elif kind == "delete":
+            self._insert(event["task"], event.get("position"))
+        elif kind in ("update", "toggle"):
+            self._set_fields(kind, event["task_id"],
+                             {field: (new, old) for field, (old, new) in event["changes"].items()})
+        elif kind == "clear":
+            for task in event.get("tasks") or ():
+                self._insert(task, len(self._storage))
+            tasks.last_task_id = max(tasks.last_task_id, event.get("last_task_id") or 0)
+
+    def _reapply(self, event):
+        """
+        Repeats one recorded event after it was undone.
+        """
+        kind = event["type"]
+        if kind == "add":
+            self._insert(dict(event["task"]))
+        elif kind == "delete":
+            self._remove(event["task_id"])
+        elif kind in ("update", "toggle"):
+            self._set_fields(kind, event["task_id"], event["changes"])
+        elif kind == "clear":
+            tasks.clear_tasks()
+
+    def undo(self):
+        """
+        Undoes the most recent step.
+
+        Returns:
+            str or None: Description of the undone step, or None if there was nothing to undo
+        """
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._applying = True
+        try:
+            for event in reversed(step["events"]):
+                self._revert(event)
+        finally:
+            self._applying = False
+        self._redo.append(step)
+        return describe(step)
+
+    def redo(self):
+        """
+        Redoes the most recently undone step.
+
+        Returns:
+            str or None: Description of the redone step, or None if there was nothing to redo
+        """
+        if not self._redo:
+            return None
+        step = self._redo.pop()
+        self._applying = True
+        try:
+            for event in step["events"]:
+                self._reapply(event)
+        finally:
+            self._applying = False
+        self._undo.append(step)
+        return describe(step)
+
+    def can_undo(self):
+        """
+        Checks whether there is a step to undo.
+
+        Returns:
+            bool: True if undo() would change something
+        """
+        return bool(self._undo)
+
+    def can_redo(self):
+        """
+        Checks whether there is a step to redo.
+
+        Returns:
+            bool: True if redo() would change something
+        """
+        return bool(self._redo)
+
+    def clear(self):
+        """
+        Forgets every recorded step.
+        """
+        self._undo.clear()
+        self._redo.clear()
+        self._changes = 0
+
+    def close(self):
+        """
+        Stops recording changes.
+        """
+        self.subscription.close()
+
+
+def describe(step):
+    """
+    Describes a recorded step for display.
+
+    Args:
+        step (dict): A step from the undo or redo stack
+
+    Returns:
+        str: e.g. 'delete task 4' or 'toggle task 2 (+1 more change)'
+    """
+    events = step["events"]
+    # A toggle that spawned a recurrence is described by the toggle, not the spawned task
+    main = next((event for event in events if event["type"] == "toggle"), events[0])
+    if main["type"] == "clear":
+        text = f"clear ({len(main.get('tasks') or ())} tasks)"
+    elif len(events) > 1 and all(event["type"] == main["type"] for event in events):
+        text = f"{main['type']} {len(events)} tasks"
+    else:
+        text = f"{main['type']} task {main['task_id']}"
+        if len(events) > 1:
+            more = len(events) - 1
+            text += f" (+{more} more change{'s' if more > 1 else ''})"
+    return text
+
+
+_history = None
+
+
+def enable(depth=DEFAULT_DEPTH, max_changes=DEFAULT_MAX_CHANGES):
+    """
+    Starts recording changes for undo. Enabling again restarts with an empty history.
+
+    Args:
+        depth (int): Maximum number of steps kept for undo
+        max_changes (int): Maximum number of task changes held by the undo and redo stacks
+    """
+    global _history
+    disable()
+    _history = UndoHistory(depth=depth, max_changes=max_changes)
+
+
+def disable():
+    """
+    Stops recording changes and drops the history.
+    """
+    global _history
+    if _history is not None:
+        _history.close()
+        _history = None
+
+
+def is_enabled():
+    """
+    Checks whether changes are being recorded.
+
+    Returns:
+        bool: True if undo is enabled
+    """
+    return _history is not None
+
+
+def undo():
+    """
+    Undoes the most recent change.
+
+    Returns:
+        str or None: Description of the undone change, or None if there was nothing to undo
+    """
+    return _history.undo() if _history is not None else None
+
+
+def redo():
+    """
+    Redoes the most recently undone change.
+
+    Returns:
+        str or None: Description of the redone change, or None if there was nothing to redo
+    """
+    return _history.redo() if _history is not None else None
@@ -0,0 +1,306 @@
+"""
+Urgency module for the console todo application.
+Answers "what should I do next": incomplete tasks ranked by a blend of
+priority and due-date urgency, instead of sorting by one and eyeballing the
+other.
+
+    score = priority weight * PRIORITY_LEVELS[priority] + urgency weight * urgency
+
+where urgency is the number of days since the task became overdue (negative
+while it is still ahead), or -undated_days for tasks without a due date.
+
+Because urgency grows at the same rate for every dated task, the order of
+dated tasks never changes with time, so they are kept in a heap keyed by the
+time-independent part of their score; undated tasks are kept in a second heap
+keyed by priority. next(k) merges the two heaps at the query time and costs
+O(k log n). Updates, toggles and deletes invalidate heap entries lazily: the
+entry stays in the heap with a stale token and is dropped when it surfaces.
+"""
+
+import datetime
+import heapq
+
+import clock
+import dependencies
+import memory
+import tasks
+from stats import overdue_threshold
+
+# Priority -> level used in the score
+PRIORITY_LEVELS = {"High": 3, "Medium": 2, "Low": 1}
+
+# Score weights: one priority level counts as much as one day of urgency by default
+DEFAULT_WEIGHTS = {"priority": 1.0, "urgency": 1.0, "undated_days": 7.0}
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_DAY = datetime.timedelta(days=1)
+
+# The heaps are rebuilt once they hold this many entries per task (stale entries included)
+_COMPACT_RATIO = 2
+
+
+def _days(moment):
+    """
+    Converts a naive local time to fractional days since the epoch.
+    """
+    return (moment - _EPOCH) / _DAY
+
+
+class UrgencyQueue:
+    """
+    Incomplete tasks in next-action order, kept current by subscribing to the event bus.
+    """
+
+    def __init__(self, bus=None, storage=None, weights=None):
+        self.bus = bus if bus is not None else tasks.event_bus
+        self._storage = storage if storage is not None else tasks.tasks_storage
+        self.weights = dict(weights if weights is not None else DEFAULT_WEIGHTS)
+        self.rebuild()
+        self.subscription = self.bus.subscribe(callback=self._on_event)
+
+    def rebuild(self):
+        """
+        Rebuilds both heaps from the store (only needed if the store was modified behind the bus).
+        """
+        # Task ID -> {"task": stored task, "token": token of its live heap entry, or None if completed}
+        self._records = {}
+        # (negated time-independent score, token, task ID) for dated and undated tasks
+        self._dated = []
+        self._undated = []
+        self._token = 0
+        for task in self._storage:
+            self._records[task["id"]] = {"task": task, "token": None}
+            if not task["completed"]:
+                heap, entry = self._entry(task)
+                heap.append(entry)
+        heapq.heapify(self._dated)
+        heapq.heapify(self._undated)
+
+    def _threshold(self, task):
+        """
+        Gets the moment a task becomes overdue, or None if it has no (parsable) due date.
+        """
+        return overdue_threshold(task.get("due_date"))
+
+    def _entry(self, task):
+        """
+        Creates a heap entry for a task and makes it the task's live entry.
+
+        Args:
+            task (dict): The task
+
+        Returns:
+            tuple: The heap the entry belongs to, and the entry (negated time-independent score, token, task ID)
+        """
+        self._token += 1
+        self._records[task["id"]]["token"] = self._token
+        base = self.weights["priority"] * PRIORITY_LEVELS.get(task["priority"], 0)
+        threshold = self._threshold(task)
+        if threshold is None:
+            return self._undated, (-base, self._token, task["id"])
+        # urgency = now - threshold in days; the 'now' part is the same for every task
+        base -= self.weights["urgency"] * _days(threshold)
+        return self._dated, (-base, self._token, task["id"])
+
+    def _push(self, task):
+        """
+        Pushes a fresh entry for a task, invalidating any previous one.
+        """
+        heap, entry = self._entry(task)
+        heapq.heappush(heap, entry)
+        if len(self._dated) + len(self._undated) > _COMPACT_RATIO * len(self._records) + 64:
+            self.rebuild()
+
+    def _invalidate(self, task_id):
+        """
+        Marks a task's heap entry stale, so it is skipped when it surfaces.
+        """
+        record = self._records.get(task_id)
+        if record is not None:
+            record["token"] = None
+
+    def _on_event(self, event):
+        """
+        Applies one mutation event to the queue.
+
+        Args:
+            event (dict): The event published by tasks.event_bus
+        """
+        kind = event["type"]
+        if kind == "add":
+            task_id = event["task_id"]
+            task = tasks.find_task(task_id, self._storage) or event["task"]
+            self._records[task_id] = {"task": task, "token": None}
+            if not task["completed"]:
+                self._push(task)
+        elif kind in ("update", "toggle"):
+            record = self._records.get(event["task_id"])
+            changes = event["changes"]
+            if record is None or not ("priority" in changes or "due_date" in changes or "completed" in changes):
+                return
+            self._invalidate(event["task_id"])
+            if not record["task"]["completed"]:
+                self._push(record["task"])
+        elif kind == "delete":
+            self._invalidate(event["task_id"])
+            self._records.pop(event["task_id"], None)
+        elif kind == "clear":
+            self.rebuild()
+
+    def _top(self, heap):
+        """
+        Drops stale entries from the top of a heap.
+
+        Returns:
+            tuple or None: The top live entry, or None if the heap is empty
+        """
+        records = self._records
+        while heap:
+            entry = heap[0]
+            record = records.get(entry[2])
+            if record is not None and record["token"] == entry[1]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def score(self, task, now=None):
+        """
+        Computes a task's score.
+
+        Args:
+            task (dict): The task
+            now (datetime.datetime, optional): The time to evaluate urgency at (defaults to the clock)
+
+        Returns:
+            float: The score (higher is more pressing)
+        """
+        if now is None:
+            now = clock.now()
+        threshold = self._threshold(task)
+        urgency = (now - threshold) / _DAY if threshold is not None else -self.weights["undated_days"]
+        return self.weights["priority"] * PRIORITY_LEVELS.get(task["priority"], 0) + self.weights["urgency"] * urgency
+
+    def next(self, k=1, now=None, skip=None):
+        """
+        Gets the k most pressing incomplete tasks without sorting the store.
+
+        Args:
+            k (int): Number of tasks to return
+            now (datetime.datetime, optional): The time to evaluate urgency at (defaults to the clock)
+            skip (callable, optional): Predicate on a task; matching tasks are passed over (e.g. blocked tasks)
+
+        Returns:
+            list: (task, score) tuples, most pressing first
+        """
+        if now is None:
+            now = clock.now()
+        # Scores of dated entries at 'now' are -key + urgency weight * days(now); undated ones are -key - offset
+        dated_shift = self.weights["urgency"] * _days(now)
+        undated_shift = -self.weights["urgency"] * self.weights["undated_days"]
+        taken = []
+        results = []
+        while len(results) < k:
+            dated = self._top(self._dated)
+            undated = self._top(self._undated)
+            if dated is None and undated is None:
+                break
+            if undated is None or (dated is not None and -dated[0] + dated_shift >= -undated[0] + undated_shift):
+                heap, entry, score = self._dated, dated, -dated[0] + dated_shift
+            else:
+                heap, entry, score = self._undated, undated, -undated[0] + undated_shift
+            heapq.heappop(heap)
+            taken.append((heap, entry))
+            task = self._records[entry[2]]["task"]
+            if skip is None or not skip(task):
+                results.append((task, score))
+        # Put the live entries back; the queue is only read
+        for heap, entry in taken:
+            heapq.heappush(heap, entry)
+        return results
+
+    def size(self):
+        """
+        Gets the number of heap entries, including stale ones not yet dropped.
+
+        Returns:
+            int: The number of entries
+        """
+        return len(self._dated) + len(self._undated)
+
+    def close(self):
+        """
+        Stops tracking events.
+        """
+        self.subscription.close()
+
+
+_weights = dict(DEFAULT_WEIGHTS)
+_queue = None
+
+
+def get_urgency_queue():
+    """
+    Gets the shared urgency queue, creating it (with one pass over the store) on first use
+    or after the weights changed.
+
+    Returns:
+        UrgencyQueue: The queue
+    """
+    global _queue
+    if _queue is not None and _queue.weights != _weights:
+        _queue.close()
+        _queue = None
+    if _queue is None:
+        _queue = UrgencyQueue(weights=_weights)
+    return _queue
+
+
+memory.register_index("urgency_queue", lambda: [_queue._records, _queue._dated, _queue._undated] if _queue else None)
+
+
+def get_weights():
+    """
+    Gets the score weights.
+
+    Returns:
+        dict: {'priority', 'urgency', 'undated_days'}
+    """
+    return dict(_weights)
+
+
+def set_weights(priority=None, urgency=None, undated_days=None):
+    """
+    Changes the score weights; the queue is rebuilt on its next use.
+
+    Args:
+        priority (float, optional): Weight of one priority level
+        urgency (float, optional): Weight of one day of urgency
+        undated_days (float, optional): Days ahead that a task without a due date counts as
+
+    Raises:
+        ValueError: If a weight is negative
+    """
+    for name, value in (("priority", priority), ("urgency", urgency), ("undated_days", undated_days)):
+        if value is not None:
+            if value < 0:
+                raise ValueError(f"Weight '{name}' must not be negative")
+            _weights[name] = float(value)
+
+
+def next_actions(k=5, now=None, actionable_only=False):
+    """
+    Gets the k most pressing incomplete tasks.
+
+    Args:
+        k (int): Number of tasks to return
+        now (datetime.datetime, optional): The time to evaluate urgency at (defaults to the clock)
+        actionable_only (bool): Pass over tasks blocked by dependencies or subtasks
+
+    Returns:
+        list: (task, score) tuples, most pressing first
+    """
+    skip = None
+    if actionable_only:
+        graph = dependencies.get_dependency_graph()
+        skip = lambda task: graph.is_blocked(task["id"])
+    return get_urgency_queue().next(k, now, skip)
@@ -193,6 +193,1456 @@ def test_filters_and_sorting():
     print("[OK] Sorting by due date works")
 
 
+def test_server_mode():
+    """Test the HTTP/JSON server with keep-alive, batch and streamed listings."""
+    print("\nTesting server mode...")
+
+    import asyncio
+    import threading
+    from server import start_server
+    from client import TaskClient
+
+    tasks_storage.clear()
+
+    started = threading.Event()
+    state = {}
+
+    async def run_server():
+        server = await start_server("127.0.0.1", 0)
+        state['port'] = server.sockets[0].getsockname()[1]
+        state['stop'] = asyncio.get_running_loop().create_future()
+        state['loop'] = asyncio.get_running_loop()
+        started.set()
+        await state['stop']
+        server.close()
+        await server.wait_closed()
+
+    thread = threading.Thread(target=asyncio.run, args=(run_server(),), daemon=True)
+    thread.start()
+    started.wait(timeout=5)
+    port = state['port']
+
+    try:
+        client = TaskClient("127.0.0.1", port)
+        task = client.call("add", title="Server task", priority="H", tags="work, api")
+        assert task['priority'] == "High"
+        assert task['tags'] == ["work", "api"]
+        print("[OK] Single operation works")
+
+        results = client.batch([
+            {"op": "add", "params": {"title": f"Batch task {i}"}} for i in range(5)
+        ] + [{"op": "bogus"}])
+        assert all(r['ok'] for r in results[:5])
+        assert results[5]['ok'] is False
+        print("[OK] Batch endpoint works and reports per-operation errors")
+
+        listing = client.list_tasks()
+        assert len(listing) == 6
+        assert len(client.list_tasks(op="search", keyword="batch")) == 5
+        client.call("add", title="R&D = fun #1")
+        assert [t['title'] for t in client.list_tasks(op="search", keyword="R&D = fun #")] == ["R&D = fun #1"]
+        import datetime
+        utc_task = client.call("add", title="UTC deadline", due_date="2026-01-01T10:00Z")
+        expected = datetime.datetime(2026, 1, 1, 10, tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+        assert utc_task['due_date'] == expected.isoformat(), "Zoned due dates are stored as naive local times"
+        assert [t['title'] for t in client.list_tasks(op="overdue")] == ["UTC deadline"]
+        assert client.list_tasks(sort_by="due_date")[0]['title'] == "UTC deadline"
+        import api
+        client.call("add", title="Weekly sync", recurring={"interval": "weekly", "every": 1})
+        assert [t['title'] for t in api.execute("filter", {"recurring": "true"})] == ["Weekly sync"]
+        assert "Weekly sync" not in [t['title'] for t in api.execute("filter", {"recurring": "false"})]
+        client.call("add", title="Prove it true", tags="true")
+        assert [t['title'] for t in client.list_tasks(op="search", keyword="true")] == ["Prove it true"]
+        assert [t['title'] for t in client.list_tasks(op="filter", tag="true")] == ["Prove it true"]
+        print("[OK] Streamed listing works over the same keep-alive connection")
+        client.close()
+
+        import socket
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as raw:
+            raw.sendall(b"GET /health HTTP/1.1\r\nX-Padding: " + b"x" * 100000 + b"\r\n\r\n")
+            reply = raw.recv(4096)
+        assert reply.startswith(b"HTTP/1.1 400"), "An oversized header line gets a 400 response"
+        assert client.call("get", id=task['id'])['title'] == "Server task"
+        print("[OK] Oversized request lines are rejected with 400")
+        client.close()
+
+        from client import run_load
+        before = len(client.list_tasks())
+        summary = run_load("127.0.0.1", port, None, "add", 3, 8, 1, "task")
+        assert summary['operations'] == 3 and summary['requests'] == 3 and summary['errors'] == []
+        summary = run_load("127.0.0.1", port, None, "add", 10, 4, 2, "task")
+        assert summary['operations'] == 10 and summary['errors'] == []
+        assert len(client.list_tasks()) == before + 13, "The remainder is spread across the workers"
+        summary = run_load("127.0.0.1", port, None, "bogus", 4, 2, 1, "task")
+        assert summary['operations'] == 0 and len(summary['errors']) == 2
+        assert "Unknown operation 'bogus'" in summary['errors'][0]
+        print("[OK] The load generator sends every operation and reports worker errors")
+        client.close()
+    finally:
+        state['loop'].call_soon_threadsafe(state['stop'].set_result, None)
+        thread.join(timeout=5)
+
+
+def test_parallel_scan():
+    """Test that the parallel scan matches the serial search and filter results."""
+    print("\nTesting parallel scan...")
+
+    import parallel
+    from parallel import parallel_search_tasks, parallel_filter_tasks, shutdown_parallel_scan
+    chunk_tasks = parallel.CHUNK_TASKS
+    parallel_threshold = parallel.PARALLEL_THRESHOLD
+
+    tasks_storage.clear()
+    for i in range(200):
+        add_task(create_task(
+            f"Meeting {i}" if i % 4 == 0 else f"Task {i}",
+            "Weekly sync" if i % 5 == 0 else "",
+            priority=["High", "Medium", "Low"][i % 3],
+            tags=[f"tag{i % 3}"],
+            recurring={'interval': 'daily', 'every': 1} if i % 7 == 0 else None
+        ))
+
+    try:
+        assert parallel_search_tasks("meeting", workers=2, threshold=0) == search_tasks("meeting")
+        assert parallel_search_tasks("sync", workers=2, threshold=0) == search_tasks("sync")
+        print("[OK] Parallel search matches serial search")
+
+        assert parallel_filter_tasks(priority="H", tag="tag0", workers=2, threshold=0) == filter_tasks(priority="H", tag="tag0")
+        toggle_task_status(3)
+        assert parallel_filter_tasks(status="completed", workers=2, threshold=0) == filter_tasks(status="completed")
+        print("[OK] Parallel filter matches serial filter and sees new mutations")
+
+        shutdown_parallel_scan()
+        parallel.CHUNK_TASKS = 50
+        assert parallel_search_tasks("meeting", workers=2, threshold=0) == search_tasks("meeting")
+        scanner = parallel.get_scanner()
+        blocks = [chunk.shm.name for chunk in scanner._chunks]
+        update_task(tasks_storage[60]['id'], title="Meeting moved")
+        delete_task(tasks_storage[120]['id'])
+        add_task(create_task("Late meeting"))
+        assert not any(chunk.dirty for chunk in scanner._chunks[:1]) and scanner._chunks[1].dirty
+        assert parallel_search_tasks("meeting", workers=2, threshold=0) == search_tasks("meeting")
+        assert [chunk.shm.name for chunk in scanner._chunks[:4]] == blocks, "Chunks are re-encoded in place"
+        print("[OK] Mutations only re-encode the chunks they touch")
+
+        import api
+        parallel.PARALLEL_THRESHOLD = 0
+        update_task(tasks_storage[0]['id'], title="Meeting via the API")
+        assert api.execute("search", {"keyword": "meeting"}) == search_tasks("meeting")
+        assert not scanner._chunks[0].dirty, "API searches of large stores use the parallel scan"
+        add_task(create_task("Late recurring", recurring={'interval': 'daily', 'every': 1}))
+        assert api.execute("filter", {"recurring": "true", "status": "incomplete"}) == \
+            filter_tasks(recurring=True, status="incomplete")
+        assert not scanner._chunks[-1].dirty
+        print("[OK] The API routes searches and filters of large stores through the parallel scan")
+    finally:
+        parallel.PARALLEL_THRESHOLD = parallel_threshold
+        parallel.CHUNK_TASKS = chunk_tasks
+        shutdown_parallel_scan()
+
+
+def test_sharded_storage():
+    """Test that the shard router matches a single store, including after resharding."""
+    print("\nTesting sharded storage...")
+
+    from api import OperationError
+    from sharding import ShardRouter
+
+    clear_tasks()
+    with ShardRouter(3) as router:
+        for i in range(60):
+            params = {"title": f"Task {i % 7}", "priority": ["High", "Medium", "Low"][i % 3], "tags": [f"tag{i % 4}"]}
+            if i % 10 == 0:
+                params["recurring"] = {'interval': 'daily', 'every': 1}
+                params["due_date"] = "2030-01-01"
+            router.execute("add", params)
+            add_task(create_task(params["title"], priority=params["priority"], tags=params["tags"],
+                                 due_date="2030-01-01T00:00:00" if i % 10 == 0 else None,
+                                 recurring=params.get("recurring")))
+
+        assert router.execute("list") == get_all_tasks()
+        assert router.execute("sort", {"sort_by": "title"}) == sort_tasks(sort_by="title")
+        print("[OK] Fan-out queries merge to the single-store order")
+
+        router.execute("toggle", {"id": 11})
+        toggle_task_status(11)
+        assert router.execute("filter", {"status": "completed"}) == filter_tasks(status="completed")
+        assert router.execute("list") == get_all_tasks()
+        print("[OK] Recurring toggles spawn tasks with globally unique IDs")
+
+        moved = router.resize(4)
+        assert 0 < moved < len(get_all_tasks())
+        assert sum(router.counts()) == len(get_all_tasks())
+        assert router.execute("sort", {"sort_by": "priority"}) == sort_tasks(sort_by="priority")
+        print("[OK] Resharding moves only some tasks and keeps results intact")
+
+        for op, params in (("add_dependency", {"id": 1, "depends_on": 2}), ("set_parent", {"id": 1, "parent_id": 2}),
+                           ("actionable", {}), ("subtasks", {"id": 1}), ("next", {"actionable": "true"})):
+            try:
+                router.execute(op, params)
+                assert False, f"'{op}' should be rejected when sharded"
+            except OperationError as e:
+                assert "not supported with sharding" in str(e)
+        for op in ("catch_up", "history", "as_of", "undo", "redo", "list_namespaces", "use_namespace",
+                   "unload_namespace", "delete_namespace"):
+            try:
+                router.execute(op, {"id": 1, "name": "work"})
+                assert False, f"'{op}' should be rejected when sharded"
+            except OperationError as e:
+                assert "not supported with sharding" in str(e)
+        assert len(router.execute("next", {"k": 3})) == 3
+        assert router.execute("next", {"k": "-1"}) == []
+        try:
+            router.execute("next", {"k": "lots"})
+            assert False, "A non-integer k should be rejected"
+        except OperationError as e:
+            assert "'k' must be an integer" in str(e)
+        print("[OK] Operations that need state across shards are rejected with a clear error")
+
+        try:
+            router.execute("search", {"keyword": "Task", "fuzzy": "maybe"})
+            assert False, "Invalid parameters should fail on every shard"
+        except OperationError:
+            pass
+        assert router.execute("get", {"id": 3}) == get_task_by_id(3)
+        assert router.execute("get", {"id": 4}) == get_task_by_id(4)
+        assert router.execute("list") == get_all_tasks()
+        print("[OK] A failed fan-out leaves no stale replies behind")
+
+
+def test_event_bus():
+    """Test that mutations publish sequenced events with field-level deltas."""
+    print("\nTesting mutation event bus...")
+
+    import tasks as tasks_module
+
+    clear_tasks()
+    received = []
+    callback = tasks_module.event_bus.subscribe(callback=received.append)
+    buffered = tasks_module.event_bus.subscribe(buffer_size=3)
+
+    try:
+        add_task(create_task("Daily standup", priority="High", due_date="2030-01-01T09:00:00",
+                             recurring={'interval': 'daily', 'every': 1}))
+        update_task(1, title="Daily standup", priority="Low")
+        toggle_task_status(1)
+        delete_task(2)
+
+        assert [e['type'] for e in received] == ["add", "update", "add", "toggle", "delete"]
+        assert [e['seq'] for e in received] == sorted(e['seq'] for e in received)
+        assert received[1]['changes'] == {"priority": ("High", "Low")}
+        assert received[2]['source_id'] == 1
+        assert received[3]['spawned_id'] == 2
+        assert received[3]['changes'] == {"completed": (False, True)}
+        print("[OK] Mutations publish sequenced events with field-level deltas")
+
+        assert buffered.lagged == 2
+        assert [e['type'] for e in buffered.poll()] == ["add", "toggle", "delete"]
+        print("[OK] Buffered subscribers are bounded and report lag")
+    finally:
+        callback.close()
+        buffered.close()
+
+
+def test_stats_counters():
+    """Test that the incremental counters match full filter passes."""
+    print("\nTesting aggregate stats...")
+
+    from datetime import datetime, timedelta
+    from stats import StatsTracker
+
+    clear_tasks()
+    tracker = StatsTracker()
+    try:
+        now = datetime.now()
+        add_task(create_task("Past", priority="High", tags=["work"], due_date=now - timedelta(hours=2)))
+        add_task(create_task("Soon", priority="High", tags=["work", "home"], due_date=now + timedelta(hours=1)))
+        add_task(create_task("Later", priority="Low", due_date=now + timedelta(days=3),
+                             recurring={'interval': 'daily', 'every': 1}))
+        add_task(create_task("No date", priority="Medium", tags=["home"]))
+        update_task(4, priority="High", tags=["home", "errands"])
+        toggle_task_status(3)
+        delete_task(1)
+
+        summary = tracker.stats()
+        assert summary['total'] == len(get_all_tasks())
+        assert summary['incomplete_by_priority']['High'] == len(filter_tasks(status='incomplete', priority='High'))
+        assert summary['by_tag'] == {"work": 1, "home": 2, "errands": 1}
+        assert summary['recurring'] == len(filter_recurring_tasks())
+        assert summary['overdue'] == len(filter_overdue_tasks())
+        print("[OK] Counters are maintained incrementally across mutations")
+
+        later = tracker.stats(now + timedelta(hours=2))
+        assert later['overdue'] == summary['overdue'] + 1
+        print("[OK] Overdue counts advance with time without rescans")
+
+        far = tracker.stats(now + timedelta(days=30))
+        assert far['overdue'] == far['with_due_date']
+        assert tracker.stats(now)['overdue'] == summary['overdue']
+        assert tracker.stats(now + timedelta(hours=2)) == later
+        print("[OK] Overdue counts follow the query time backwards too")
+    finally:
+        tracker.close()
+
+
+def test_workload_record_and_replay():
+    """Test that a recorded workload replays to the same store."""
+    print("\nTesting workload recorder and replay...")
+
+    import tempfile
+    import tasks as tasks_module
+    from recorder import start_recording, stop_recording
+    from replay import load_trace, replay
+
+    clear_tasks()
+    path = os.path.join(tempfile.mkdtemp(), "trace.jsonl")
+    start_recording(path)
+    try:
+        # Call through the tasks module, like the UI does after the hooks rebind its names
+        tasks_module.add_task(tasks_module.create_task("Daily review", priority="High",
+                                                       due_date="2030-01-01T09:00:00",
+                                                       recurring={'interval': 'daily', 'every': 1}))
+        tasks_module.add_task(tasks_module.create_task("Groceries", tags=["home"]))
+        tasks_module.toggle_task_status(1)
+        tasks_module.sort_tasks(tasks_module.get_all_tasks(), "due_date")
+    finally:
+        count = stop_recording()
+    expected = [dict(task) for task in get_all_tasks()]
+
+    header, entries = load_trace(path)
+    assert header['version'] == 1
+    # Nested calls (the recurrence spawned by toggle) are not recorded
+    assert count == len(entries) == 7
+    print("[OK] Top-level calls are recorded with arguments and timing")
+
+    clear_tasks()
+    report = replay(entries, tasks_module)
+    assert report['errors'] == 0
+    assert report['operations']['toggle_task_status']['count'] == 1
+    assert get_all_tasks() == expected
+    print("[OK] Replay reproduces the recorded store and reports per-operation latency")
+
+
+def test_metrics_instrumentation():
+    """Test per-operation metrics and that disabling restores the original functions."""
+    print("\nTesting metrics instrumentation...")
+
+    import json
+    import tasks as tasks_module
+    import metrics
+
+    clear_tasks()
+    original_filter = tasks_module.filter_tasks
+    metrics.reset()
+    metrics.enable()
+    try:
+        assert tasks_module.filter_tasks is not original_filter
+        for i in range(10):
+            tasks_module.add_task(tasks_module.create_task(f"Task {i}", priority="High" if i < 3 else "Low",
+                                                           due_date="12/25/2030" if i == 0 else None))
+        assert len(tasks_module.filter_tasks(priority="High")) == 3
+        tasks_module.is_task_overdue(get_task_by_id(1))
+        tasks_module.parse_datetime_input("tomorrow")
+        tasks_module.parse_datetime_input("not a date")
+
+        data = json.loads(metrics.export_json())
+        assert data['operations']['add_task']['calls'] == 10
+        assert data['operations']['filter_tasks']['rows_scanned'] == 10
+        assert data['operations']['filter_tasks']['rows_returned'] == 3
+        assert data['parse_datetime_input'] == {"format": 1, "relative": 1, "failed": 1, "iso_fallback": 1}
+        assert "filter_tasks" in metrics.report_text()
+        print("[OK] Call counts, rows scanned/returned and parse outcomes are collected")
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+    assert tasks_module.filter_tasks is original_filter
+    print("[OK] Disabling metrics restores the uninstrumented functions")
+
+
+def test_query_explain():
+    """Test explain reports for filter, search and sort queries."""
+    print("\nTesting query explain...")
+
+    from explain import explain, format_explain
+
+    clear_tasks()
+    for i in range(20):
+        add_task(create_task(f"Task {i}", description="quarterly report" if i % 4 == 0 else "",
+                             priority="High" if i < 5 else "Low", tags=["work"] if i % 2 else [],
+                             completed=i % 5 == 0))
+
+    report = explain("filter_tasks", status="incomplete", priority="High", tag="work")
+    assert report['access_path'].startswith("sequential scan")
+    assert [s['stage'] for s in report['stages']] == ["status = incomplete", "priority = High", "tag = work"]
+    assert [s['actual_rows'] for s in report['stages']] == [16, 4, 2]
+    assert [s['estimated_rows'] for s in report['stages']] == [16, 4, 2]
+    assert report['stages'][1]['input_rows'] == 16
+    assert report['result_rows'] == len(filter_tasks(status="incomplete", priority="High", tag="work"))
+    print("[OK] Filter stages report estimated and actual candidate counts")
+
+    report = explain("search_tasks", keyword="report")
+    assert report['result_rows'] == 5 and report['stages'][0]['estimated_rows'] is None
+    report = explain("sort_tasks", sort_by="title")
+    assert report['stages'][0]['input_rows'] == 20
+    assert "Access path" in format_explain(report)
+    report = explain("fuzzy_search", query="Tsk")
+    assert report['access_path'].startswith("title n-gram index")
+    assert report['result_rows'] == 20 and report['stages'][0]['actual_rows'] < report['stages'][0]['input_rows']
+    print("[OK] Search and sort queries are explained")
+
+    import stats
+    from datetime import datetime, timedelta
+    tracker = stats.get_stats_tracker()
+    add_task(create_task("Due soon", due_date=datetime.now() + timedelta(hours=1)))
+    before = tracker.stats()
+    report = explain("filter_tasks", overdue=True, now=datetime.now() + timedelta(days=1))
+    assert report['stages'][0]['estimated_rows'] == report['stages'][0]['actual_rows'] == 1
+    assert tracker.overdue == before['overdue'] == 0
+    print("[OK] Explain estimates don't move the shared stats tracker")
+
+
+def test_slow_operation_log():
+    """Test the slow-operation log thresholds, sampling and capture limit."""
+    print("\nTesting slow-operation log...")
+
+    import tasks as tasks_module
+    import slowlog
+
+    clear_tasks()
+    for i in range(5):
+        add_task(create_task(f"Task {i}"))
+
+    slowlog.enable(threshold_ms=60000, thresholds={"sort_tasks": 0}, sample_every=2)
+    try:
+        for _ in range(4):
+            tasks_module.sort_tasks(tasks_module.get_all_tasks(), "title")
+        tasks_module.filter_tasks(status="incomplete")
+        entries = slowlog.entries()
+        assert [e['op'] for e in entries] == ["sort_tasks", "sort_tasks"]
+        assert entries[0]['args'] == "<all 5 tasks>, 'title'"
+        assert entries[0]['store_size'] == 5
+        assert entries[0]['stack'] and "test_new_features.py" in entries[0]['stack'][-1]
+        assert slowlog._log.slow_calls == {"sort_tasks": 4}
+        assert "4 slow calls" in slowlog.report_text()
+        print("[OK] Slow calls are logged with arguments, store size and stack, one in every two sampled")
+
+        slowlog.enable(threshold_ms=0, max_per_second=3)
+        for _ in range(10):
+            tasks_module.get_task_by_id(1)
+        # The calls may straddle a second boundary, so allow one window reset
+        captured = len(slowlog.entries())
+        assert 3 <= captured <= 6
+        assert f"{10 - captured} suppressed" in slowlog.report_text()
+        print("[OK] Captures are limited per second")
+    finally:
+        slowlog.disable()
+        slowlog.clear()
+
+    assert not slowlog.is_enabled()
+
+    from main import parse_option_value
+    assert parse_option_value("--slow-log", "2.5", float) == 2.5
+    for bad in ("abc", "-1", "nan"):
+        try:
+            parse_option_value("--slow-log", bad, float)
+            assert False, "Should have exited"
+        except SystemExit as exc:
+            assert exc.code == 2
+    print("[OK] Invalid --slow-log values are rejected")
+
+
+def test_memory_report():
+    """Test the memory report breakdown and growth tracking."""
+    print("\nTesting memory report...")
+
+    import memory
+    from stats import get_stats_tracker
+
+    clear_tasks()
+    for i in range(50):
+        add_task(create_task(f"Task {i}", description=f"Details for task {i}", tags=[f"tag{i % 5}"],
+                             due_date="12/25/2030", recurring={'interval': 'daily', 'every': 1}))
+    get_stats_tracker()
+
+    report = memory.memory_report()
+    assert report['tasks'] == 50
+    for category in ("records", "descriptions", "tags", "recurrence"):
+        assert report['categories'][category] > 0
+        assert report['per_task'][category] == round(report['categories'][category] / 50, 1)
+    assert report['indexes']['stats'] > 0
+    assert not any(isinstance(value, int) for value in memory._stats_index()), "Counters are not sizes"
+    assert report['total'] == sum(report['categories'].values()) + sum(report['indexes'].values())
+    print("[OK] Bytes are broken down by category and index with per-task averages")
+
+    for i in range(10):
+        add_task(create_task(f"Extra {i}", description="More details"))
+    report = memory.memory_report()
+    assert report['growth']['tasks'] == 10
+    assert report['growth']['records'] > 0
+    assert "Since the last report: +10 tasks" in memory.report_text(report)
+    print("[OK] Growth since the last report is shown")
+
+
+def test_listing_renderer():
+    """Test the shared buffered row renderer used by the listing screens."""
+    print("\nTesting listing renderer...")
+
+    import io
+    import datetime
+    import ui
+
+    clear_tasks()
+    now = datetime.datetime.now()
+    add_task(create_task("Late", due_date=now - datetime.timedelta(days=2), tags=["a", "b"]))
+    add_task(create_task("Soon", description="Details", due_date=now + datetime.timedelta(days=2),
+                         recurring={'interval': 'weekly', 'every': 2, 'days': ['Monday']}))
+    add_task(create_task("Today", due_date=now.replace(hour=0, minute=0, second=0, microsecond=0)))
+
+    out = io.StringIO()
+    ui.render_task_listing(get_all_tasks(), out=out)
+    text = out.getvalue()
+    assert text.startswith(ui.LISTING_HEADER)
+    assert "[OVERDUE: " in text and "[UPCOMING: " in text and "[TODAY: " in text
+    assert "| a, b |" in text and "Every 2 weeks on Monday" in text
+    assert "       Description: Details\n" in text
+    assert due_state_of(now - datetime.timedelta(days=2)) == 'overdue'
+    print("[OK] Rows carry due state labels, tags, recurrence and descriptions")
+
+    out = io.StringIO()
+    ui.render_task_listing(get_all_tasks(), show_due_state=False, out=out)
+    assert "OVERDUE" not in out.getvalue()
+
+    writes = []
+    class Recorder(io.StringIO):
+        def write(self, text):
+            writes.append(text)
+            return super().write(text)
+    clear_tasks()
+    for i in range(ui.RENDER_CHUNK_ROWS * 2 + 5):
+        add_task(create_task(f"Task {i}"))
+    ui.render_task_listing(get_all_tasks(), out=Recorder())
+    assert len(writes) == 3
+    print("[OK] Rows are written in large chunks")
+
+    import contextlib
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        ui.display_invalid_input()
+    assert "1 and 13 or one of u, r, h, n, a, d, w" in out.getvalue()
+    print("[OK] The invalid input message lists every menu choice")
+
+
+def test_listing_pager():
+    """Test the pager navigation and the lazy filtered and sorted sources."""
+    print("\nTesting listing pager...")
+
+    import io
+    import contextlib
+    from unittest import mock
+    import ui
+
+    clear_tasks()
+    for i in range(45):
+        add_task(create_task(f"Task {i:02d}", priority=["High", "Medium", "Low"][i % 3],
+                             tags=["odd"] if i % 2 else [], due_date=f"2030-01-{i % 28 + 1:02d}"))
+
+    for sort_by in ("priority", "title", "id", "due_date"):
+        assert list(iter_sorted_tasks(get_all_tasks(), sort_by)) == sort_tasks(get_all_tasks(), sort_by)
+    assert list(iter_filter_tasks(priority="High", tag="odd")) == filter_tasks(priority="High", tag="odd")
+    assert list(iter_search_tasks("task 1")) == search_tasks("task 1")
+    print("[OK] Lazy sorted, filtered and search sources match sort_tasks, filter_tasks and search_tasks")
+
+    pulled = []
+    def source():
+        for task in get_all_tasks():
+            pulled.append(task["id"])
+            yield task
+
+    out = io.StringIO()
+    with mock.patch("builtins.input", side_effect=["n", "j3", "p", "j9", "q"]), contextlib.redirect_stdout(out):
+        assert ui.page_task_listing(source(), page_size=20, title="Tasks:")
+    text = out.getvalue()
+    assert "Page 1 - rows 1-20 of 21+" in text
+    assert "Page 2 - rows 21-40 of 41+" in text
+    assert "Page 3/3 - rows 41-45 of 45" in text
+    assert text.count("Page 3/3") == 2  # jumping past the end lands on the last page
+    print("[OK] Next, previous and jump navigation pull rows lazily")
+
+    pulled.clear()
+    with mock.patch("builtins.input", side_effect=["q"]), contextlib.redirect_stdout(io.StringIO()):
+        ui.page_task_listing(source(), page_size=20)
+    assert len(pulled) == 21
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert not ui.page_task_listing(iter([]))
+        assert ui.page_task_listing(get_all_tasks()[:5], page_size=20)  # one page, no prompt
+    print("[OK] Only the first page is pulled before the first screen")
+
+    saved_mode, ui.PAGER_MODE = ui.PAGER_MODE, "on"
+    try:
+        out = io.StringIO()
+        with mock.patch("builtins.input", side_effect=["task", "q"]), contextlib.redirect_stdout(out):
+            ui.handle_search_tasks()
+        assert ui.LISTING_HEADER in out.getvalue()
+        assert f"Page 1 - rows 1-{ui.PAGE_SIZE} of {ui.PAGE_SIZE + 1}+" in out.getvalue()
+        out = io.StringIO()
+        with mock.patch("builtins.input", side_effect=["tsk 07"]), contextlib.redirect_stdout(out):
+            ui.handle_search_tasks()
+        assert "No exact matches" in out.getvalue() and "Task 07" in out.getvalue()
+    finally:
+        ui.PAGER_MODE = saved_mode
+    print("[OK] Search results are paged lazily through the shared listing renderer")
+
+
+def test_render_cache():
+    """Test cached listing rows and their invalidation."""
+    print("\nTesting render cache...")
+
+    import datetime
+    import ui
+
+    now = datetime.datetime(2030, 6, 15, 12, 0)
+    for due in (datetime.datetime(2030, 6, 15), datetime.datetime(2030, 6, 15, 18, 30),
+                datetime.datetime(2030, 6, 14, 9, 0), datetime.datetime(2030, 6, 17)):
+        for hours in range(-60, 80, 3):
+            moment = now + datetime.timedelta(hours=hours)
+            state, start, end = due_state_window(due, moment)
+            assert state == due_state_of(due, moment) and start <= moment < end
+    print("[OK] Due state windows agree with due_state_of")
+
+    clear_tasks()
+    add_task(create_task("Report", tags=["work"], due_date="2030-06-15T18:30:00"))
+    add_task(create_task("Plain"))
+    cache = ui.RenderCache()
+    try:
+        for task in get_all_tasks():
+            cache.row(task, now)
+        first = cache.row(get_task_by_id(1), now)
+        assert "[TODAY: 2030-06-15]" in first and cache.hits == 1 and cache.misses == 2
+
+        # Crossing the due time flips the label
+        later = cache.row(get_task_by_id(1), datetime.datetime(2030, 6, 15, 19, 0))
+        assert "[OVERDUE: 2030-06-15]" in later and cache.misses == 3
+        print("[OK] Rows are reused until their due state changes")
+
+        update_task(1, title="Quarterly report")
+        assert "Quarterly report" in cache.row(get_task_by_id(1), now)
+        toggle_task_status(2)
+        assert "[x]" in cache.row(get_task_by_id(2), now)
+        assert cache.row(get_task_by_id(2), now, show_due_state=False) == ui.format_task_row(get_task_by_id(2), now, False)
+        clear_tasks()
+        assert not cache.rows
+        print("[OK] Mutations drop the cached rows of the changed task")
+    finally:
+        cache.close()
+
+
+def test_batch_commands():
+    """Test the non-interactive batch command mode."""
+    print("\nTesting batch commands...")
+
+    import io
+    import json
+    from batch import run_commands, parse_command
+
+    clear_tasks()
+    commands = [
+        'add title="Buy milk" priority=High tags=home,errands',
+        '{"op": "add", "params": {"title": "Standup", "recurring": {"interval": "daily", "every": 1}}}',
+        '# comments and blank lines are skipped',
+        '',
+        'update id=1 completed=true',
+        'filter status=completed',
+        'delete id=42',
+        'frobnicate id=1',
+        'sort sort_by=title',
+    ]
+    out = io.StringIO()
+    summary = run_commands(commands, out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert summary['commands'] == 7 and summary['errors'] == 1
+    assert results[0]['result']['tags'] == ["home", "errands"]
+    assert results[1]['result']['recurring'] == {"interval": "daily", "every": 1}
+    assert [task['id'] for task in results[3]['result']] == [1]
+    assert results[4]['result'] is False
+    assert results[5] == {"ok": False, "line": 8, "error": "Unknown operation 'frobnicate'"}
+    assert [task['title'] for task in results[6]['result']] == ["Buy milk", "Standup"]
+    assert parse_command("toggle id=3") == ("toggle", {"id": "3"})
+    print("[OK] Shell-style and JSON commands produce one JSON result line each")
+
+    out = io.StringIO()
+    summary = run_commands(["delete id=1", "bogus", "delete id=2"], out, stop_on_error=True)
+    assert summary['commands'] == 2 and get_task_by_id(2) is not None
+    print("[OK] Batches can stop at the first error")
+
+    from unittest import mock
+    import api
+    import batch
+
+    def broken(params):
+        raise RuntimeError("boom")
+
+    out = io.StringIO()
+    with mock.patch.dict(batch.BATCH_OPERATIONS, {"broken": broken}):
+        summary = run_commands(["update id=2 completed=yes", "filter overdue=maybe", "broken", "get id=2"], out)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert summary['commands'] == 4 and summary['errors'] == 2
+    assert results[0]['result'] is True and results[3]['result']['completed'] is True
+    assert results[1] == {"ok": False, "line": 2, "error": "Parameter 'overdue' must be true or false, got 'maybe'"}
+    assert results[2] == {"ok": False, "line": 3, "error": "Unexpected RuntimeError: boom"}
+    params = {"id": 2, "completed": "false"}
+    assert api.execute("update", params) and params['completed'] == "false"
+    assert get_task_by_id(2)['completed'] is False
+    print("[OK] Boolean parameters are parsed in one place and unexpected errors are reported per line")
+
+
+def test_streaming_export():
+    """Test streaming JSONL/CSV export from lazy sources in bounded memory."""
+    print("\nTesting streaming export...")
+
+    import io
+    import csv
+    import json
+    import tracemalloc
+    import export
+    from batch import run_commands
+
+    clear_tasks()
+    add_task(create_task("Report, final", description='Say "hi"', priority="High", tags=["work", "q3"],
+                         due_date="2030-01-15", recurring={'interval': 'weekly', 'every': 1}))
+    add_task(create_task("Groceries", priority="Low"))
+    add_task(create_task("Call bank", priority="High"))
+
+    out = io.StringIO()
+    assert export.export_tasks(out, "jsonl") == 3
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == get_all_tasks()
+
+    out = io.StringIO()
+    assert export.export_tasks(out, "csv", iter_filter_tasks(priority="High"), chunk_rows=1) == 2
+    rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+    assert [row['id'] for row in rows] == ["1", "3"]
+    assert rows[0]['title'] == "Report, final" and rows[0]['tags'] == "work,q3"
+    assert json.loads(rows[0]['recurring']) == {'interval': 'weekly', 'every': 1}
+    print("[OK] JSONL and CSV exports round-trip task fields and accept lazy filter results")
+
+    class CountingSink:
+        def __init__(self):
+            self.written = 0
+        def write(self, text):
+            self.written += len(text)
+
+    clear_tasks()
+    for i in range(10000):
+        add_task(create_task(f"Task {i}", description="x" * 40, tags=["work"]))
+    sink = CountingSink()
+    tracemalloc.start()
+    try:
+        export.export_tasks(sink, "jsonl", chunk_rows=100)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert sink.written > 1_000_000 and peak < sink.written / 10
+    print("[OK] Export memory stays bounded by the chunk size")
+
+    import os
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sorted.csv")
+        results = io.StringIO()
+        run_commands([f"export path={path} sort_by=title tag=work"], results)
+        assert json.loads(results.getvalue())['result'] == 10000
+        with open(path, newline="", encoding="utf-8") as f:
+            titles = [row['title'] for row in csv.DictReader(f)]
+        assert titles == sorted(titles, key=str.lower)
+
+        clear_tasks()
+        add_task(create_task("Late", due_date="2020-01-01T00:00:00", recurring={'interval': 'daily', 'every': 1}))
+        add_task(create_task("On time"))
+        for criteria in ("overdue=false", "recurring=false", '{"overdue": "no"}'):
+            line = (f'{{"op": "export", "params": {{"path": {json.dumps(path)}, {criteria[1:-1]}}}}}'
+                    if criteria.startswith("{") else f"export path={path} {criteria}")
+            results = io.StringIO()
+            run_commands([line], results)
+            assert json.loads(results.getvalue())['result'] == 1, criteria
+            with open(path, newline="", encoding="utf-8") as f:
+                assert [row['title'] for row in csv.DictReader(f)] == ["On time"]
+    print("[OK] Batch mode exports filtered, sorted results to a file")
+
+
+def test_chunked_import():
+    """Test chunked JSONL/CSV import with bad row reporting and the bulk insert path."""
+    print("\nTesting chunked import...")
+
+    import os
+    import csv
+    import json
+    import tempfile
+    import export
+    import importer
+
+    clear_tasks()
+    add_task(create_task("Report, final", description='Say "hi"', priority="High", tags=["work", "q3"],
+                         due_date="2030-01-15T00:00:00", recurring={'interval': 'weekly', 'every': 1}, completed=True))
+    add_task(create_task("Groceries", priority="Low"))
+    original = [dict(task, id=None) for task in get_all_tasks()]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("jsonl", "csv"):
+            path = os.path.join(tmp, f"tasks.{fmt}")
+            export.export_to_file(path)
+            clear_tasks()
+            report = importer.import_tasks(path)
+            assert report['imported'] == 2 and report['failed'] == 0
+            assert [dict(task, id=None) for task in get_all_tasks()] == original
+        print("[OK] Exported files import back unchanged")
+
+        path = os.path.join(tmp, "mixed.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"title": "Good", "priority": "h", "tags": "a, b", "due_date": "2030-02-01"}) + "\n")
+            f.write("{not json\n")
+            f.write(json.dumps({"title": "Bad priority", "priority": "urgent"}) + "\n")
+            f.write("\n")
+            f.write(json.dumps({"description": "no title"}) + "\n")
+            f.write(json.dumps({"title": "Also good", "completed": "yes"}) + "\n")
+        clear_tasks()
+        report = importer.import_tasks(path, chunk_rows=2)
+        assert report['imported'] == 2 and report['failed'] == 3
+        assert [e['line'] for e in report['errors']] == [2, 3, 5]
+        assert "Invalid priority" in report['errors'][1]['error']
+        good, also_good = get_all_tasks()
+        assert good['priority'] == "High" and good['tags'] == ["a", "b"] and good['due_date'] == "2030-02-01T00:00:00"
+        assert also_good['completed'] is True and also_good['id'] == 2
+        print("[OK] Bad rows are reported by line without aborting the import")
+
+        path = os.path.join(tmp, "unreadable.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write("title,priority\nFirst,High\n" + "x" * (csv.field_size_limit() + 1) + ",Low\nLast,Low\n")
+        clear_tasks()
+        report = importer.import_tasks(path)
+        assert report['imported'] == 2 and report['failed'] == 1
+        assert report['errors'][0]['line'] == 3 and report['errors'][0]['error'].startswith("Invalid CSV")
+        assert [task['title'] for task in get_all_tasks()] == ["First", "Last"]
+        print("[OK] Unreadable CSV rows are reported by line too")
+
+        clear_tasks()
+        for i in range(30):
+            add_task(create_task(f"Task {i}", tags=["bulk"]))
+        export.export_to_file(path)
+        report = importer.import_tasks(path, workers=2, chunk_rows=7)
+        assert report['imported'] == 30
+        assert [task['id'] for task in get_all_tasks()] == list(range(1, 61))
+        assert [task['title'] for task in get_all_tasks()[30:]] == [f"Task {i}" for i in range(30)]
+        print("[OK] Chunks parsed in a process pool are committed in file order")
+
+
+def test_recurrence_catch_up():
+    """Test closed-form catch-up of missed recurrences with each policy."""
+    print("\nTesting recurrence catch-up...")
+
+    from datetime import datetime
+    import tasks as tasks_module
+
+    now = datetime(2026, 3, 2, 12, 0)
+    weekdays = {'interval': 'weekly', 'every': 1, 'days': ['Monday', 'Thursday']}
+
+    # Closed-form occurrences match stepping with calculate_next_occurrence
+    for pattern in ({'interval': 'daily', 'every': 2}, weekdays, {'interval': 'monthly', 'every': 1}):
+        task = {'due_date': "2025-12-31T09:00:00", 'recurring': pattern}
+        steps = 0
+        while True:
+            next_date = calculate_next_occurrence(task)
+            if next_date > now:
+                break
+            steps += 1
+            task = dict(task, due_date=next_date.isoformat())
+        anchor = datetime(2025, 12, 31, 9, 0)
+        assert count_occurrences(anchor, pattern, now) == steps
+        if pattern['interval'] != 'monthly':
+            # Month steps are measured from the anchor, so only day-based series match step by step
+            assert occurrence_at(anchor, pattern, steps) == datetime.fromisoformat(task['due_date'])
+    print("[OK] Missed occurrences are counted in closed form")
+
+    def make_series():
+        clear_tasks()
+        add_task(create_task("Water plants", tags=["home"], due_date="2026-02-01T08:00:00",
+                             recurring={'interval': 'daily', 'every': 1}))
+        add_task(create_task("Standup", due_date="2026-02-26T09:00:00", recurring=weekdays))
+        add_task(create_task("Done", completed=True, due_date="2026-01-01T08:00:00",
+                             recurring={'interval': 'daily', 'every': 1}))
+        add_task(create_task("Future", due_date="2026-04-01T08:00:00", recurring={'interval': 'daily', 'every': 1}))
+
+    make_series()
+    assert [(task['title'], missed) for task, _due, missed in missed_recurrences(now)] == [
+        ("Water plants", 29), ("Standup", 1)]
+    events = []
+    subscription = tasks_module.event_bus.subscribe(callback=events.append)
+    summary = catch_up_recurrences("all", now)
+    subscription.close()
+    assert summary == {"series": 2, "missed": 30, "created": 30}
+    plants = [task for task in get_all_tasks() if task['title'] == "Water plants"]
+    assert len(plants) == 30 and plants[-1]['due_date'] == "2026-03-02T08:00:00"
+    assert [task['recurring'] for task in plants[:-1]] == [None] * 29 and plants[-1]['recurring']
+    assert all(task['tags'] == ["home"] and not task['completed'] for task in plants)
+    standups = [task['due_date'] for task in get_all_tasks() if task['title'] == "Standup"]
+    assert standups == ["2026-02-26T09:00:00", "2026-03-02T09:00:00"]
+    assert [task['id'] for task in get_all_tasks()][4:] == list(range(5, 35))
+    assert sum(1 for event in events if event['type'] == "add" and event.get('source_id') == 1) == 29
+    assert missed_recurrences(now) == []
+    print("[OK] 'all' adds every missed occurrence in one batch and moves the series forward")
+
+    make_series()
+    assert catch_up_recurrences("latest", now)["created"] == 0
+    assert get_task_by_id(1)['due_date'] == "2026-03-02T08:00:00" and len(get_all_tasks()) == 4
+    make_series()
+    catch_up_recurrences("skip", now)
+    assert get_task_by_id(1)['due_date'] == "2026-03-03T08:00:00"
+    assert get_task_by_id(2)['due_date'] == "2026-03-05T09:00:00"
+    assert get_task_by_id(4)['due_date'] == "2026-04-01T08:00:00"
+    try:
+        catch_up_recurrences("sometimes", now)
+        assert False, "Unknown policies should be rejected"
+    except ValueError:
+        pass
+    print("[OK] 'latest' and 'skip' move the current occurrence without adding tasks")
+
+
+def test_injectable_clock():
+    """Test freezing and fast-forwarding the clock used by due-date predicates and listings."""
+    print("\nTesting injectable clock...")
+
+    import io
+    from datetime import datetime, timedelta
+    import clock
+    import api
+    import ui
+
+    clear_tasks()
+    add_task(create_task("Pay rent", due_date="2026-05-01T00:00:00"))
+    add_task(create_task("Call bank", due_date="2026-04-30T17:00:00"))
+    add_task(create_task("No date"))
+
+    with clock.frozen(datetime(2026, 4, 30, 12, 0)) as frozen_at:
+        assert clock.now() == frozen_at and clock.is_frozen()
+        assert filter_overdue_tasks() == [] and len(filter_upcoming_tasks()) == 2
+        assert parse_datetime_input("tomorrow") == datetime(2026, 5, 1)
+        clock.advance(timedelta(hours=6))
+        assert [task['title'] for task in filter_overdue_tasks()] == ["Call bank"]
+        assert is_task_due_today(get_task_by_id(2)) and not is_task_due_today(get_task_by_id(1))
+        clock.advance(timedelta(days=1))
+        assert [task['title'] for task in filter_tasks(overdue=True)] == ["Call bank"]
+        assert [task['title'] for task in filter_tasks(overdue=False)] == ["Pay rent", "No date"]
+        out = io.StringIO()
+        ui.render_task_listing(get_all_tasks(), out=out)
+        assert "[TODAY: 2026-05-01]" in out.getvalue() and "[OVERDUE: 2026-04-30]" in out.getvalue()
+    assert not clock.is_frozen()
+    print("[OK] Frozen and fast-forwarded time drives predicates, filters and listings")
+
+    # An explicit per-query time is used for every task, whatever the clock says
+    reference = datetime(2026, 5, 2, 9, 0)
+    assert len(filter_overdue_tasks(reference)) == 2
+    assert is_task_upcoming(get_task_by_id(1), datetime(2026, 4, 1))
+    assert [task['id'] for task in api.execute("overdue", {"now": "2026-04-30T18:00:00"})] == [2]
+    assert [task['id'] for task in api.execute("filter", {"upcoming": True, "now": "2026-04-30T09:00:00"})] == [1, 2]
+    try:
+        api.execute("overdue", {"now": "someday"})
+        assert False, "Invalid times should be rejected"
+    except api.OperationError:
+        pass
+
+    # Predicates read the clock once per query, not once per task
+    reads = []
+    original_now = clock.now
+    clock.now = lambda: reads.append(1) or original_now()
+    try:
+        filter_tasks(overdue=True, upcoming=False)
+        filter_upcoming_tasks()
+    finally:
+        clock.now = original_now
+    assert len(reads) == 2
+    clock.advance(timedelta(minutes=5))
+    assert clock.now() - datetime.now() > timedelta(minutes=4)
+    clock.reset()
+    assert abs(clock.now() - datetime.now()) < timedelta(seconds=5)
+    print("[OK] One timestamp per query is threaded through the predicates")
+
+
+def test_undo_redo():
+    """Test undo/redo of deletes, toggles with spawned recurrences and bulk inserts."""
+    print("\nTesting undo/redo...")
+
+    import api
+    import stats
+    import undo
+
+    clear_tasks()
+    undo.enable(depth=3)
+    try:
+        add_task(create_task("Water plants", due_date="2030-01-01T08:00:00", recurring={'interval': 'daily', 'every': 1}))
+        add_task(create_task("Pay rent", priority="High"))
+        add_task(create_task("Call bank"))
+        before = [dict(task) for task in get_all_tasks()]
+
+        delete_task(2)
+        assert undo.undo() == "delete task 2"
+        assert get_all_tasks() == before
+        assert undo.redo() == "delete task 2" and get_task_by_id(2) is None
+        undo.undo()
+
+        toggle_task_status(1)
+        assert len(get_all_tasks()) == 4
+        assert undo.undo() == "toggle task 1 (+1 more change)"
+        assert get_all_tasks() == before
+        assert stats.stats()["total"] == 3 and stats.stats()["completed"] == 0
+        undo.redo()
+        assert get_task_by_id(1)['completed'] and get_task_by_id(4)['due_date'] == "2030-01-02T08:00:00"
+        undo.undo()
+        print("[OK] Deletes and toggles (with their spawned recurrence) are undone and redone")
+
+        update_task(3, title="Call the bank", priority="Low")
+        add_tasks([{"title": f"Imported {i}"} for i in range(5)])
+        assert undo.undo() == "add 5 tasks" and len(get_all_tasks()) == 3
+        assert undo.undo() == "update task 3" and get_all_tasks() == before
+        update_task(3, title="New edit")
+        assert undo.redo() is None, "A new change clears the redo stack"
+
+        results = api.execute_batch([{"op": "toggle", "params": {"id": 2}},
+                                     {"op": "toggle", "params": {"id": 3}},
+                                     {"op": "delete", "params": {"id": 99}}])
+        assert [r["ok"] for r in results] == [True, True, True]
+        assert api.execute("undo") == "toggle 2 tasks"
+        assert not get_task_by_id(2)['completed'] and not get_task_by_id(3)['completed']
+
+        clear_tasks()
+        assert undo.undo() == "clear (3 tasks)" and len(get_all_tasks()) == 3
+        # IDs issued before the clear (including undone adds) are not handed out again
+        add_task(create_task("After restore"))
+        assert get_all_tasks()[-1]['id'] == 10
+        print("[OK] Bulk inserts, API batches and clears are one step each")
+
+        # Only the configured number of steps is kept
+        for i in range(5):
+            update_task(1, title=f"Edit {i}")
+        steps = 0
+        while undo.undo():
+            steps += 1
+        assert steps == 3 and get_task_by_id(1)['title'] == "Edit 1"
+
+        # The held task changes are bounded too: the oldest steps go first, and a step over the budget isn't kept
+        undo.enable(depth=10, max_changes=6)
+        add_tasks([{"title": f"First batch {i}"} for i in range(3)])
+        update_task(1, title="Edit A")
+        update_task(1, title="Edit B")
+        add_tasks([{"title": f"Second batch {i}"} for i in range(4)])
+        assert [undo.undo() for _ in range(4)] == ["add 4 tasks", "update task 1", "update task 1", None]
+        assert len([task for task in get_all_tasks() if task['title'].startswith("First batch")]) == 3
+        undo.redo()
+        add_tasks([{"title": f"Huge import {i}"} for i in range(8)])
+        assert undo.undo() is None and len([t for t in get_all_tasks() if t['title'].startswith("Huge")]) == 8
+        assert undo._history._changes == 0
+        update_task(1, title="Edit C")
+        assert undo.undo() == "update task 1" and get_task_by_id(1)['title'] == "Edit A"
+        print("[OK] History depth and size are bounded")
+    finally:
+        undo.disable()
+    try:
+        api.execute("undo")
+        assert False, "Undo should be unavailable when disabled"
+    except api.OperationError:
+        pass
+
+    # Batch mode in a fresh process has undo enabled, with the depth given before the mode
+    import json
+    import subprocess
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "main.py")
+    commands = "add title=One\nadd title=Two\nadd title=Three\nundo\nundo\nundo\nlist\n"
+    for options, remaining in (([], 0), (["--undo-depth", "2"], 1)):
+        completed = subprocess.run([sys.executable, main_path, *options, "batch"], input=commands,
+                                   capture_output=True, text=True, timeout=60)
+        results = [json.loads(line) for line in completed.stdout.splitlines()]
+        assert [r["ok"] for r in results] == [True] * 7, completed.stdout + completed.stderr
+        assert [r["result"] for r in results[3:6]] == ["add task 3", "add task 2", "add task 1" if not remaining else None]
+        assert [task["title"] for task in results[6]["result"]] == ["One"][:remaining]
+    print("[OK] Undo works in batch mode and honors --undo-depth")
+
+
+def test_task_history():
+    """Test per-task change history: as-of queries, range queries and pruning."""
+    print("\nTesting task history...")
+
+    from datetime import datetime, timedelta
+    import api
+    import clock
+    import history
+
+    clear_tasks()
+    history.enable()
+    start = datetime(2026, 6, 1, 9, 0)
+    try:
+        with clock.frozen(start):
+            add_task(create_task("Draft report", priority="Low"))
+            add_task(create_task("Book flights"))
+            clock.advance(timedelta(hours=1))
+            update_task(1, title="Final report", priority="High")
+            update_task(1, priority="High")  # no change, nothing recorded
+            clock.advance(timedelta(hours=1))
+            toggle_task_status(1)
+            update_task(2, due_date="2026-06-10T00:00:00")
+            clock.advance(timedelta(hours=1))
+            delete_task(2)
+
+        task_history = history.get_history()
+        assert task_history.size() == 6
+        assert [change['type'] for change in task_history.versions(1)] == ["add", "update", "toggle"]
+        assert task_history.versions(1)[1]['changes'] == {"title": ("Draft report", "Final report"),
+                                                          "priority": ("Low", "High")}
+
+        assert task_history.as_of(1, start - timedelta(minutes=1)) is None
+        first = task_history.as_of(1, start + timedelta(minutes=30))
+        assert first['title'] == "Draft report" and first['priority'] == "Low" and not first['completed']
+        later = task_history.as_of(1, start + timedelta(hours=2))
+        assert later['title'] == "Final report" and later['completed']
+        assert task_history.as_of(2, start + timedelta(hours=2, minutes=30))['due_date'] == "2026-06-10T00:00:00"
+        assert task_history.as_of(2, start + timedelta(hours=4)) is None
+        assert get_task_by_id(1)['title'] == "Final report", "Queries don't touch the live task"
+        print("[OK] Tasks are reconstructed as of any recorded time")
+
+        window = task_history.changes(start + timedelta(hours=1), start + timedelta(hours=3))
+        assert [(change['task_id'], change['type']) for change in window] == [(1, "update"), (1, "toggle"), (2, "update")]
+        via_api = api.execute("history", {"id": 2, "start": "2026-06-01T09:30:00"})
+        assert [change['type'] for change in via_api] == ["update", "delete"]
+        assert via_api[0]['at'] == "2026-06-01T11:00:00"
+        assert api.execute("as_of", {"id": 1, "at": "2026-06-01T09:00:00"})['title'] == "Draft report"
+        print("[OK] Changes are queryable by time range, per task and through the API")
+
+        assert task_history.prune(start + timedelta(hours=1, minutes=30)) == 3
+        assert task_history.as_of(1, start + timedelta(hours=1, minutes=30))['title'] == "Final report"
+        assert [change['type'] for change in task_history.versions(1)] == ["toggle"]
+        try:
+            task_history.as_of(1, start)
+            assert False, "Pruned history should not be queryable"
+        except ValueError:
+            pass
+        assert task_history.prune(start + timedelta(days=1)) == 3
+        assert task_history.size() == 0 and task_history.as_of(2, start + timedelta(days=1)) is None
+        assert task_history.as_of(1, start + timedelta(days=1))['completed']
+        print("[OK] Pruning folds old changes into the base version")
+
+        history.enable()
+        task_history = history.get_history()
+        with clock.frozen(datetime(2026, 6, 2, 1, 50)):
+            update_task(1, title="At 01:50")
+            clock.advance(timedelta(minutes=-50))
+            update_task(1, title="At 01:00")
+        window = task_history.changes(datetime(2026, 6, 2, 1, 40), datetime(2026, 6, 2, 2, 0))
+        assert [change['changes']['title'][1] for change in window] == ["At 01:50", "At 01:00"]
+        assert [change['at'] for change in task_history.versions(1)] == [datetime(2026, 6, 2, 1, 50)] * 2
+        print("[OK] Changes recorded after the clock moved backwards keep the history in order")
+    finally:
+        history.disable()
+
+    # Batch mode in a fresh process records history too
+    import os
+    import json
+    import subprocess
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "main.py")
+    completed = subprocess.run([sys.executable, main_path, "batch"], input="add title=One\nhistory id=1\n",
+                               capture_output=True, text=True, timeout=60)
+    results = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert [change['type'] for change in results[1]['result']] == ["add"], completed.stdout + completed.stderr
+    completed = subprocess.run([sys.executable, main_path, "--history-retention", "0", "batch"],
+                               input="add title=One\nhistory id=1\n", capture_output=True, text=True, timeout=60)
+    results = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert results[1]['ok'] is False, "--history-retention 0 turns history off"
+    print("[OK] History is recorded in batch mode with a bounded retention")
+
+
+def test_namespaces():
+    """Test named task lists: separate storage and IDs, per-request selection and unloading."""
+    print("\nTesting task lists...")
+
+    import os
+    import tempfile
+    import api
+    import namespaces
+    import stats
+    import tasks
+
+    clear_tasks()
+    add_task(create_task("Default task"))
+    default_storage = tasks.tasks_storage
+    try:
+        namespaces.use_namespace("work")
+        assert namespaces.active_namespace() == "work"
+        assert get_all_tasks() == [] and tasks_storage is tasks.tasks_storage, "Imported storage follows the switch"
+        add_task(create_task("Ship release", priority="High"))
+        add_task(create_task("Review PR"))
+        assert [task['id'] for task in get_all_tasks()] == [1, 2], "Each list has its own ID space"
+        assert stats.stats()['total'] == 2
+
+        namespaces.use_namespace("default")
+        assert tasks.tasks_storage is default_storage
+        assert [task['title'] for task in get_all_tasks()] == ["Default task"]
+        assert stats.stats()['total'] == 1, "Stats counters are per list"
+        assert add_task(create_task("Second default")) and get_task_by_id(2)['title'] == "Second default"
+        print("[OK] Lists keep separate tasks, IDs and indexes")
+
+        result = api.execute("add", {"title": "Plan sprint", "namespace": "work"})
+        assert result['id'] == 3 and namespaces.active_namespace() == "default"
+        assert len(api.execute("list", {"namespace": "work"})) == 3
+        assert len(api.execute("list")) == 2
+        try:
+            api.execute("list", {"namespace": "missing"})
+            assert False, "Unknown namespaces should be rejected"
+        except api.OperationError:
+            pass
+        print("[OK] API operations can target a list per request")
+
+        namespaces.set_unload_dir(tempfile.mkdtemp())
+        try:
+            namespaces.unload_namespace("default")
+            assert False, "The active list cannot be unloaded"
+        except ValueError:
+            pass
+        assert namespaces.unload_idle(0) == ["work"]
+        work = next(info for info in namespaces.list_namespaces() if info['name'] == "work")
+        assert not work['loaded'] and work['tasks'] is None
+        with namespaces.using("work"):
+            assert [task['title'] for task in get_all_tasks()] == ["Ship release", "Review PR", "Plan sprint"]
+            assert add_task(create_task("After reload")) and get_all_tasks()[-1]['id'] == 4, "IDs survive unloading"
+        assert namespaces.active_namespace() == "default" and len(get_all_tasks()) == 2
+        print("[OK] Idle lists are unloaded to disk and reloaded on use")
+
+        import hashlib
+        assert os.path.basename(namespaces._unload_path("my list")) == \
+            f"my_list-{hashlib.sha1(b'my list').hexdigest()[:12]}.jsonl", "Unload file names are stable across processes"
+        try:
+            api.execute("use_namespace", {"name": "nowhere", "create": "false"})
+            assert False, "create=false must not create the list"
+        except api.OperationError:
+            pass
+        assert "nowhere" not in namespaces.list_names()
+
+        import ui
+        ui.aliased_storage = tasks.tasks_storage
+        try:
+            try:
+                namespaces.use_namespace("work")
+                assert False, "A module still holding the old storage should be reported"
+            except RuntimeError as e:
+                assert "ui.aliased_storage" in str(e)
+            try:
+                api.execute("use_namespace", {"name": "elsewhere"})
+                assert False, "The API should report the stale reference as an operation error"
+            except api.OperationError as e:
+                assert "ui.aliased_storage" in str(e)
+            import contextlib
+            import io
+            from unittest import mock
+            out = io.StringIO()
+            with mock.patch("builtins.input", side_effect=["s", "elsewhere"]), contextlib.redirect_stdout(out):
+                ui.handle_task_lists()
+            assert "❌ ui.aliased_storage" in out.getvalue()
+            assert "elsewhere" not in namespaces.list_names(), "A failed switch creates no list"
+        finally:
+            del ui.aliased_storage
+        assert namespaces.active_namespace() == "default" and tasks.tasks_storage is default_storage
+        print("[OK] Switches check for stale references and unload files have stable names")
+    finally:
+        namespaces.use_namespace("default")
+        for name in namespaces.list_names():
+            if name != "default":
+                namespaces.delete_namespace(name)
+        namespaces.set_unload_dir(None)
+        clear_tasks()
+
+
+def test_dependencies():
+    """Test task dependencies and subtasks: cycle detection and the incrementally kept actionable set."""
+    print("\nTesting dependencies and subtasks...")
+
+    import api
+    import dependencies
+    import undo
+
+    clear_tasks()
+    for title in ("Design", "Build", "Test", "Release", "Write notes"):
+        add_task(create_task(title))
+    graph = dependencies.get_dependency_graph()
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [1, 2, 3, 4, 5]
+
+    assert dependencies.add_dependency(2, 1) and dependencies.add_dependency(3, 2)
+    assert dependencies.set_parent(5, 4)
+    assert not dependencies.add_dependency(2, 99), "Missing tasks can't be depended on"
+    for task_id, prerequisite_id in ((1, 3), (1, 1)):
+        try:
+            dependencies.add_dependency(task_id, prerequisite_id)
+            assert False, "Cycles should be rejected"
+        except ValueError:
+            pass
+    try:
+        dependencies.set_parent(4, 5)
+        assert False, "A task can't be the parent of its parent"
+    except ValueError:
+        pass
+    assert get_task_by_id(1).get('depends_on') is None
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [1, 5]
+    assert graph.blockers(3) == [2] and graph.blockers(4) == [5]
+    print("[OK] Relations block tasks and cycles are rejected")
+
+    toggle_task_status(1)
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [2, 5]
+    toggle_task_status(2)
+    toggle_task_status(5)
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [3, 4]
+    update_task(1, completed=False)
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [1, 3, 4], "Only direct dependents are blocked"
+    update_task(2, completed=False)
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [1, 4]
+    delete_task(1)
+    assert [task['id'] for task in dependencies.actionable_tasks()] == [2, 4], "Deleted tasks no longer block"
+
+    rebuilt = dependencies.DependencyGraph()
+    assert rebuilt.ready == graph.ready and rebuilt._blockers == graph._blockers, "Incremental state matches a rebuild"
+    rebuilt.close()
+    print("[OK] The actionable set follows completions and deletes incrementally")
+
+    undo.enable()
+    try:
+        assert api.execute("add_dependency", {"id": 4, "depends_on": 2})
+        assert [task['id'] for task in api.execute("actionable")] == [2]
+        undo.undo()
+        assert [task['id'] for task in api.execute("actionable")] == [2, 4], "Relation changes can be undone"
+        assert [task['id'] for task in api.execute("subtasks", {"id": 4})] == [5]
+        try:
+            api.execute("set_parent", {"id": 4, "parent_id": 5})
+            assert False, "Cycles should be rejected through the API"
+        except api.OperationError:
+            pass
+    finally:
+        undo.disable()
+    print("[OK] Relations are available through the API and undo")
+    clear_tasks()
+
+
+def test_urgency_queue():
+    """Test the next-action queue: blended scores, lazy invalidation and configurable weights."""
+    print("\nTesting the next-action queue...")
+
+    from datetime import datetime
+    import api
+    import dependencies
+    import urgency
+
+    clear_tasks()
+    now = datetime(2026, 6, 10, 12, 0)
+    add_task(create_task("Taxes", priority="Low", due_date=datetime(2026, 6, 8, 9, 0)))      # 2 days overdue
+    add_task(create_task("Launch", priority="High", due_date=datetime(2026, 6, 12, 9, 0)))   # due in 2 days
+    add_task(create_task("Inbox zero", priority="High"))                                     # no due date
+    add_task(create_task("Renew passport", priority="Medium", due_date=datetime(2026, 7, 1, 9, 0)))
+    add_task(create_task("Done already", priority="High", completed=True))
+
+    queue = urgency.get_urgency_queue()
+    ranked = queue.next(10, now)
+    assert [task['id'] for task, _score in ranked] == [1, 2, 3, 4], "Overdue Low beats High due later"
+    scores = [score for _task, score in ranked]
+    assert scores == sorted(scores, reverse=True)
+    assert abs(scores[0] - queue.score(get_task_by_id(1), now)) < 1e-9
+    assert [task['id'] for task, _score in queue.next(2, now)] == [1, 2]
+    assert queue.size() == 4, "Reading the queue leaves it intact"
+    print("[OK] Tasks are ranked by priority and due-date urgency")
+
+    update_task(4, due_date="2026-06-09T09:00:00")
+    toggle_task_status(1)
+    update_task(3, title="Inbox zero!")  # doesn't affect the score
+    assert queue.size() == 5, "Stale entries stay until they surface"
+    assert [task['id'] for task, _score in queue.next(10, now)] == [4, 2, 3]
+    assert queue.size() == 3
+    delete_task(4)
+    assert [task['id'] for task, _score in queue.next(10, now)] == [2, 3] and queue.size() == 2
+
+    rebuilt = urgency.UrgencyQueue()
+    assert [task['id'] for task, _score in rebuilt.next(10, now)] == [2, 3], "Incremental order matches a rebuild"
+    rebuilt.close()
+    print("[OK] Updates, toggles and deletes invalidate entries lazily")
+
+    try:
+        urgency.set_weights(undated_days=0)
+        assert [task['id'] for task, _score in urgency.next_actions(2, now)] == [3, 2]
+        dependencies.add_dependency(3, 2)
+        assert [task['id'] for task, _score in urgency.next_actions(2, now, actionable_only=True)] == [2]
+        result = api.execute("next", {"k": 1, "now": "2026-06-10T12:00:00"})
+        assert result[0]['id'] == 3 and result[0]['score'] == 3.0
+        assert api.execute("next", {"k": 1, "now": "2026-06-10T12:00:00", "actionable": "false"})[0]['id'] == 3
+        assert api.execute("next", {"k": 1, "now": "2026-06-10T12:00:00", "actionable": "true"})[0]['id'] == 2
+        assert api.execute("urgency_weights", {"urgency": 2})['urgency'] == 2.0
+        try:
+            api.execute("urgency_weights", {"priority": -1})
+            assert False, "Negative weights should be rejected"
+        except api.OperationError:
+            pass
+    finally:
+        urgency.set_weights(**urgency.DEFAULT_WEIGHTS)
+    print("[OK] Weights are configurable and blocked tasks can be skipped")
+    clear_tasks()
+
+
+def test_fuzzy_search():
+    """Test typo-tolerant title search: ranking, index maintenance and candidate pruning."""
+    print("\nTesting fuzzy title search...")
+
+    import api
+    import fuzzy
+
+    clear_tasks()
+    for title in ("Team meeting", "Meet the new manager", "Résumé review", "Book meeting room", "Buy groceries"):
+        add_task(create_task(title))
+
+    assert search_tasks("meetng") == [], "Substring search misses typos"
+    results = fuzzy.fuzzy_search("meetng")
+    assert [(task['id'], distance) for task, distance in results] == [(1, 1), (4, 1), (2, 2)]
+    assert [task['id'] for task, _distance in fuzzy.fuzzy_search("meetng rom")] == [4], "Every word has to match"
+    assert [task['id'] for task, _distance in fuzzy.fuzzy_search("resume")] == [3], "Accents are ignored"
+    assert fuzzy.fuzzy_search("meetng", max_distance=0) == []
+    assert [task['id'] for task, _distance in fuzzy.fuzzy_search("meet", limit=1)] == [2]
+    assert fuzzy.edit_distance("kitten", "sitting") == 3 and fuzzy.edit_distance("kitten", "sitting", limit=1) == 2
+    print("[OK] Titles are matched despite typos and ranked by distance")
+
+    update_task(2, title="Quarterly meting")
+    delete_task(4)
+    assert [task['id'] for task, _distance in fuzzy.fuzzy_search("meetng")] == [1, 2]
+    index = fuzzy.get_title_index()
+    rebuilt = fuzzy.TitleIndex()
+    assert rebuilt._postings == index._postings and rebuilt._grams == index._grams, "Incremental index matches a rebuild"
+    assert rebuilt._bigrams == index._bigrams and rebuilt._lengths == index._lengths
+    rebuilt.close()
+    assert [task['title'] for task in api.execute("search", {"keyword": "grocereis", "fuzzy": True})] == ["Buy groceries"]
+    assert api.execute("search", {"keyword": "grocereis", "fuzzy": "false"}) == []
+    assert len(api.execute("search", {"keyword": "grocereis", "fuzzy": "yes"})) == 1
+    print("[OK] The index follows updates and deletes")
+
+    add_tasks([{"title": f"Task {i} {word}"} for i, word in
+               enumerate(["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel"] * 250)])
+    add_tasks([{"title": f"Item{i} note{i}"} for i in range(2000)])
+    assert [task['title'] for task, _distance in fuzzy.fuzzy_search("groseries")] == ["Buy groceries"]
+    assert index.last_checked < index.vocabulary_size() / 50, "Only a small part of the vocabulary is compared"
+    assert [task['title'] for task, _distance in fuzzy.fuzzy_search("meetng")] == ["Team meeting", "Quarterly meting"]
+    assert index.last_checked < index.vocabulary_size() / 50, "Words sharing no trigram are filtered on bigrams"
+    fuzzy.fuzzy_search("bug")
+    assert index.last_checked < index.vocabulary_size() / 50
+    print("[OK] Queries only compare words sharing trigrams or bigrams with the query")
+
+    add_task(create_task("Fix bag in parser"))
+    add_task(create_task("Feed the cat"))
+    assert [task['title'] for task, distance in fuzzy.fuzzy_search("bug")] == ["Buy groceries", "Fix bag in parser"]
+    assert [task['title'] for task, distance in fuzzy.fuzzy_search("cut")] == ["Feed the cat"]
+    assert index.similar_words("bug", 1) == {"bag": 1, "buy": 1}
+    add_task(create_task("abcdef"))
+    assert index.similar_words("axcdyf", 2) == {"abcdef": 2}, "Matches sharing no trigram are found"
+    print("[OK] Short words match even without a shared trigram")
+    clear_tasks()
+
+
 def run_tests():
     """Run all tests."""
     print("Running tests for advanced todo features...\n")
@@ -202,6 +1652,30 @@ def run_tests():
         test_due_dates()
         test_recurrence()
         test_filters_and_sorting()
+        test_server_mode()
+        test_parallel_scan()
+        test_sharded_storage()
+        test_event_bus()
+        test_stats_counters()
+        test_workload_record_and_replay()
+        test_metrics_instrumentation()
+        test_query_explain()
+        test_slow_operation_log()
+        test_memory_report()
+        test_listing_renderer()
+        test_listing_pager()
+        test_render_cache()
+        test_batch_commands()
+        test_streaming_export()
+        test_chunked_import()
+        test_recurrence_catch_up()
+        test_injectable_clock()
+        test_undo_redo()
+        test_task_history()
+        test_namespaces()
+        test_dependencies()
+        test_urgency_queue()
+        test_fuzzy_search()
         
         print("\nSUCCESS: All tests passed! The advanced features are working correctly.")
         return True